@@ -0,0 +1,158 @@
+"""Cascading schedulability analysis.
+
+Cheap sufficient tests decide most task-sets before an exact test is run. The stages are:
+    hb_accept -- the utilization test with hyperbolic bound accepts the task-set
+    utilization_reject -- the total utilization U = sum(C_i / T_i) is greater than 1
+Only the task-sets that are still undecided are analyzed with the exact test. A stage only decides
+a task-set if its verdict is guaranteed to be the verdict of the exact test:
+    hb_accept: the hyperbolic bound holds for RM, so the tasks must have different priorities in
+               the range of the simulation (0 ... EDF_PRIORITY), the periods must not decrease
+               with decreasing priority (RM) and D_i >= T_i for all tasks. The HET reuses
+               workload values that were computed for greater deadlines, so for the HET the
+               deadlines must be implicit (D_i = T_i).
+    utilization_reject: the tasks must be different with C_i > 0 and D_i <= T_i. The stage is
+                        skipped for the simulation, as the tasks only have a limited number of
+                        jobs, so a task-set with U > 1 can be schedulable.
+Both stages use a small margin, so rounding errors of the floating point calculation can't
+decide a task-set wrongly.
+"""
+import logging
+import time
+
+import simulation
+import utilization
+import workload
+
+# names of the stages of the cascade
+STAGE_HB_ACCEPT = "hb_accept"
+STAGE_UTILIZATION_REJECT = "utilization_reject"
+
+# margin of the utilization bounds against rounding errors
+MARGIN = 1e-9
+
+# analysis methods that are not tested in a cascade: the utilization tests are cheap themselves
+NOT_CASCADED = [utilization.basic_utilization_test, utilization.rm_utilization_test,
+                utilization.hb_utilization_test]
+
+# simulations: task-sets with U > 1 can be schedulable because of the limited number of jobs
+SIMULATIONS = [simulation.simulate, simulation.simulate_simso]
+
+# analysis methods that only match the hyperbolic bound for implicit deadlines (D_i = T_i)
+IMPLICIT_DEADLINES = [workload.het_workload_test]
+
+
+def is_cascaded(function):
+    """Check if an analysis method is tested in a cascade.
+
+    Args:
+        function -- the schedulability analysis method
+    Return:
+        True/False -- whether the cheap tests should be run before the method
+    """
+    return function not in NOT_CASCADED
+
+
+def filter_undecided(dataset, function, decide, stages):
+    """Filter the task-sets that are not decided by the stages of the cascade.
+
+    This method is a generator over the undecided task-sets of the data-set. For each decided
+    task-set decide(taskset, schedulability) is called. The number of decided task-sets, the
+    number of task-sets that are still undecided after the stage and the time elapsed are counted
+    per stage in stages.
+
+    Args:
+        dataset -- the data-set, a list or an iterable of task-sets
+        function -- the exact schedulability analysis method
+        decide -- function that is called with every decided task-set and its verdict
+        stages -- dictionary that is filled with the statistics of the stages (key = name of the
+                  stage, value = dictionary with 'decided', 'undecided' and 'time')
+    Yield:
+        taskset -- the next undecided task-set
+    """
+    # create logger
+    logger = logging.getLogger('traditional-SA.cascade.filter_undecided')
+
+    for stage in [STAGE_HB_ACCEPT, STAGE_UTILIZATION_REJECT]:
+        stages.setdefault(stage, {'decided': 0, 'undecided': 0, 'time': 0})
+    reject = function not in SIMULATIONS  # whether the reject stage is sound for the method
+    implicit_deadlines = function in IMPLICIT_DEADLINES
+
+    for taskset in dataset:  # iterate over all task-sets
+        # stage 1: accept with the hyperbolic bound
+        start_time = time.perf_counter()
+        accepted = hb_accepts(taskset, implicit_deadlines)
+        stages[STAGE_HB_ACCEPT]['time'] += time.perf_counter() - start_time
+        if accepted:  # task-set is schedulable
+            stages[STAGE_HB_ACCEPT]['decided'] += 1
+            decide(taskset, True)
+            continue
+        stages[STAGE_HB_ACCEPT]['undecided'] += 1
+
+        # stage 2: reject with the total utilization
+        if reject:
+            start_time = time.perf_counter()
+            rejected = utilization_rejects(taskset)
+            stages[STAGE_UTILIZATION_REJECT]['time'] += time.perf_counter() - start_time
+            if rejected:  # task-set is not schedulable
+                stages[STAGE_UTILIZATION_REJECT]['decided'] += 1
+                decide(taskset, False)
+                continue
+
+        # task-set is undecided
+        stages[STAGE_UTILIZATION_REJECT]['undecided'] += 1
+        logger.debug("Task-set %d is undecided", taskset.taskset_id)
+        yield taskset
+
+
+def hb_accepts(taskset, implicit_deadlines=False):
+    """Check if a task-set is accepted by the utilization test with hyperbolic bound.
+
+    The task-set is only accepted if the exact tests are guaranteed to accept it too, see the
+    description of the module.
+
+    Args:
+        taskset -- the task-set that should be checked
+        implicit_deadlines -- whether only task-sets with D_i = T_i should be accepted
+    Return:
+        True/False -- whether the task-set is accepted
+    """
+    total_utilization = 1
+    last_task = None
+    for task in taskset:  # iterate over all tasks in order of increasing priority values
+        # check that the hyperbolic bound holds for the exact tests
+        if not 0 <= task.priority <= simulation.EDF_PRIORITY or task.deadline < task.period:
+            return False
+        if implicit_deadlines and task.deadline != task.period:
+            return False
+        if last_task is not None and (task.priority == last_task.priority or
+                                      task.period < last_task.period):  # not RM
+            return False
+        last_task = task
+
+        total_utilization *= (task.execution_time / task.period) + 1
+
+    return total_utilization <= 2 - MARGIN
+
+
+def utilization_rejects(taskset):
+    """Check if a task-set is rejected because its total utilization is greater than 1.
+
+    The task-set is only rejected if the exact tests (except the simulation) are guaranteed to
+    reject it too, see the description of the module.
+
+    Args:
+        taskset -- the task-set that should be checked
+    Return:
+        True/False -- whether the task-set is rejected
+    """
+    total_utilization = 0
+    task_ids = set()
+    for task in taskset:  # iterate over all tasks
+        # check that the exact tests reject the task-set
+        if task.task_id in task_ids or task.execution_time <= 0 or task.deadline > task.period:
+            return False
+        task_ids.add(task.task_id)
+
+        total_utilization += task.execution_time / task.period
+
+    return total_utilization > 1 + MARGIN
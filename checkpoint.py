@@ -0,0 +1,155 @@
+"""Checkpoints of the progress of the schedulability analysis.
+
+A long analysis (e.g. the simulation of a large data-set) only produces its results at the end.
+The progress of each test is saved periodically in a JSON file next to the database
+(*_checkpoint.json): the ID of the last tested task-set, the partial results and the time elapsed.
+The task-sets are tested in order of their ID, so a resumed test skips all task-sets up to the
+last tested one and continues with the saved results. Tests that were finished are not run again.
+The checkpoint is only used if the database and the settings of the analysis didn't change.
+"""
+import json
+import logging
+import os
+import time
+
+# default time between two checkpoints in seconds, 0 = no checkpoints
+CHECKPOINT_INTERVAL = 0
+
+# version of the checkpoint format, increase to invalidate all checkpoints
+CHECKPOINT_VERSION = 1
+
+
+class Checkpoint:
+    """Class representing the checkpoint of an analysis.
+
+    The checkpoint is defined by the following attributes:
+        checkpoint_path -- path to the checkpoint file
+        key -- key of the database and the settings of the analysis
+        interval -- minimal time between two saves of the checkpoint in seconds
+    Additional attributes of a Checkpoint object are:
+        tests -- saved state of each test (key = name of the test, value = dictionary with the
+                 (partial) results, 'last_taskset_id' and 'finished')
+        last_save -- time of the last save
+    """
+
+    def __init__(self, db_dir, db_name, settings, resume=False, interval=CHECKPOINT_INTERVAL,
+                 suffix=""):
+        """Constructor of class Checkpoint.
+
+        If resume is True, the saved states of the tests are read from the checkpoint file.
+
+        Args:
+            db_dir -- directory of the database
+            db_name -- name of the database
+            settings -- dictionary with the settings of the analysis that change the order or the
+                        results of the tested task-sets
+            resume -- whether the analysis continues from the checkpoint file
+            interval -- minimal time between two saves of the checkpoint in seconds
+            suffix -- suffix of the name of the checkpoint file, e.g. of a shard (see shard.py)
+        """
+        # create logger
+        logger = logging.getLogger('traditional-SA.checkpoint.__init__')
+
+        db_path = os.path.join(db_dir, db_name)
+        db_stat = os.stat(db_path)
+        db_name = os.path.splitext(db_name)[0]  # remove file extension from the database name
+        self.checkpoint_path = os.path.join(db_dir, db_name + suffix + "_checkpoint.json")
+        self.key = {'version': CHECKPOINT_VERSION, 'mtime': db_stat.st_mtime_ns,
+                    'size': db_stat.st_size, 'settings': settings}
+        self.interval = interval
+        self.tests = dict()
+        self.last_save = time.time()
+
+        if resume:  # read the saved states of the tests
+            try:
+                with open(self.checkpoint_path) as checkpoint_file:
+                    checkpoint = json.load(checkpoint_file)
+            except (OSError, ValueError):  # no checkpoint or corrupt checkpoint file
+                logger.warning("No valid checkpoint found, starting from the beginning!")
+                return
+
+            if checkpoint.get('key') != self.key:  # database or settings changed
+                logger.warning("The database or the settings changed since the checkpoint, "
+                               "starting from the beginning!")
+                return
+
+            self.tests = checkpoint['tests']
+            logger.info("Resuming from checkpoint: %s", ", ".join(
+                "%s (%s)" % (test_name, "finished" if state['finished'] else
+                             "until task-set %d" % state['last_taskset_id'])
+                for test_name, state in self.tests.items()))
+
+    def get_state(self, test_name):
+        """Get the saved state of a test.
+
+        Args:
+            test_name -- name of the test
+        Return:
+            state -- dictionary with the partial results of the test, the ID of the last tested
+                     task-set ('last_taskset_id') and whether the test is finished ('finished')
+            None -- no state saved
+        """
+        return self.tests.get(test_name)
+
+    def update(self, test_name, result_dict, last_taskset_id):
+        """Update the state of a test.
+
+        The checkpoint is saved if the last save is older than the interval.
+
+        Args:
+            test_name -- name of the test
+            result_dict -- dictionary with the partial results of the test
+            last_taskset_id -- ID of the last tested task-set, all task-sets with a lower ID are
+                               tested too
+        """
+        self.tests[test_name] = _create_state(result_dict, last_taskset_id, False)
+        if time.time() - self.last_save >= self.interval:  # save the checkpoint
+            self.save()
+
+    def finish(self, test_name, result_dict):
+        """Mark a test as finished and save the checkpoint.
+
+        Args:
+            test_name -- name of the test
+            result_dict -- dictionary with the results of the test
+        """
+        self.tests[test_name] = _create_state(result_dict, None, True)
+        self.save()
+
+    def save(self):
+        """Save the checkpoint.
+
+        The checkpoint is written to a temporary file first, so an interrupted save doesn't
+        destroy the last checkpoint.
+        """
+        temporary_path = self.checkpoint_path + ".tmp"
+        with open(temporary_path, 'w') as checkpoint_file:
+            json.dump({'key': self.key, 'tests': self.tests}, checkpoint_file)
+        os.replace(temporary_path, self.checkpoint_path)
+        self.last_save = time.time()
+
+    def remove(self):
+        """Remove the checkpoint file after the analysis is completed."""
+        if os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+
+def _create_state(result_dict, last_taskset_id, finished):
+    """Create the state of a test.
+
+    Args:
+        result_dict -- dictionary with the (partial) results of the test
+        last_taskset_id -- ID of the last tested task-set
+        finished -- whether the test is finished
+    Return:
+        state -- dictionary with the state of the test
+    """
+    state = {key: result_dict[key] for key in ['tp', 'fp', 'tn', 'fn', 'time', 'chunk_times']}
+    if 'stages' in result_dict:  # statistics of the stages of a cascade
+        state['stages'] = result_dict['stages']
+    if 'dedup' in result_dict:  # statistics of the deduplication
+        state['dedup'] = result_dict['dedup']
+    state['last_taskset_id'] = last_taskset_id
+    state['finished'] = finished
+
+    return state
@@ -6,21 +6,42 @@ Additional there are optional arguments:
     -h, --help                          show a help message and exit
     --test_all                          run all available schedulability analysis methods
     -s, --simulate                      run simulation
+    --simso                             run simulation with SimSo (reference for the simulation)
     -u, --utilization                   run all utilization based schedulability analysis methods
     -rta, --response_time_analysis      run all response time analyses
     -w, --workload                      run all workload based schedulability analysis methods
+    -j JOBS, --jobs JOBS                number of worker processes for the analysis
+    --cache                             use the persistent cache of verdicts
+    --stream                            stream the task-sets from the database
+    --dataset_cache                     use the memory-mapped cache of the data-set
+    --prepare_db                        create the missing indexes of the database
+    --batch                             use the batch variants of the analysis methods
+    --cascade                           decide task-sets with cheap tests before exact tests
+    --fused                             run all tests in a single pass over the data-set
+    --dedup                             test identical task-sets only once
+    --prefix_cache_size SIZE            maximal number of nodes of the prefix cache, 0 = disabled
+    --incremental                       analyze only task-sets with changed execution times
+    --checkpoint_interval SECONDS       time between two checkpoints, 0 = no checkpoints
+    --resume                            continue the analysis from the last checkpoint
+    --pipeline                          read and test the task-sets in a streaming pipeline
+    --shard I/N                         analyze only the I-th of N shards of the task-sets
+    --merge                             merge the results of all shards
 The full call looks like the following:
-    main.py [-h] [--test_all] [-s] [-u] [-rta] [-w] db_path
+    main.py [-h] [--test_all] [-s] [--simso] [-u] [-rta] [-w] [-j JOBS] [--cache] [--stream]
+            [--dataset_cache] [--prepare_db] [--batch] [--cascade] [--fused] [--dedup]
+            [--prefix_cache_size SIZE] [--incremental] [--checkpoint_interval SECONDS]
+            [--resume] [--pipeline] [--shard I/N] [--merge] db_path
 """
 import argparse
 import logging
 import os
 
+import checkpoint
+import prefix_cache
 import rta
 import simulation
 import utilization
 import workload
-from main import VALID_SA
 
 
 def read_input():
@@ -31,7 +52,25 @@ def read_input():
     Return:
         db_dir -- directory of the database file
         db_name -- name of the database file
-        tests_todo -- list with schedulability tests that should be done
+        tests_todo -- list with schedulability tests that should be done, None = no test selected
+        options -- further options of the analysis:
+            jobs -- number of worker processes
+            cache -- whether the verdict cache should be used
+            stream -- whether the task-sets should be streamed from the database
+            dataset_cache -- whether the dataset cache should be used
+            prepare_db -- whether the missing indexes of the database should be created
+            batch -- whether the batch variants of the analysis methods should be used
+            cascade -- whether the task-sets should be decided by cheap tests first
+            fused -- whether all tests should be run in a single pass over the data-set
+            dedup -- whether identical task-sets should be tested only once
+            prefix_cache_size -- maximal number of nodes of the prefix cache, 0 = no cache
+            incremental -- whether only the task-sets with changed execution times should be
+                           analyzed
+            checkpoint_interval -- time between two checkpoints in seconds, 0 = no checkpoints
+            resume -- whether the analysis should continue from the last checkpoint
+            pipeline -- whether the task-sets should be read and tested in a streaming pipeline
+            shard -- tuple (I, N): analyze only the I-th of N shards, None = all task-sets
+            merge -- whether the results of the shards should be merged
     """
     # create logger
     logger = logging.getLogger('traditional-SA.command_line_interface.read_input')
@@ -51,11 +90,15 @@ def read_input():
     # add the selected test to the to-do list
     if args.test_all:  # run all available schedulability analysis methods
         logger.info("Doing all available schedulability tests...\n")
+        from main import VALID_SA  # imported here, main imports this module
         tests_todo = VALID_SA
     else:
         if args.simulation:  # run simulation
             tests_todo.append(simulation.simulate)
 
+        if args.simso:  # run simulation with SimSo
+            tests_todo.append(simulation.simulate_simso)
+
         if args.utilization:  # run all utilization based schedulability analysis methods
             tests_todo.append(utilization.basic_utilization_test)
             tests_todo.append(utilization.rm_utilization_test)
@@ -70,10 +113,28 @@ def read_input():
             tests_todo.append(workload.het_workload_test)
 
     if not tests_todo:  # no schedulability method selected
-        logger.info("No schedulability test selected! Doing nothing...\n")
-        return None
-
-    return db_dir, db_name, tests_todo
+        logger.info("No schedulability test selected!\n")
+        tests_todo = None
+
+    # check the further options
+    if args.jobs < 1:  # invalid number of worker processes
+        parser.error("number of jobs must be at least 1")
+    if args.prefix_cache_size < 0:  # invalid size of the prefix cache
+        parser.error("size of the prefix cache must not be negative")
+    if args.checkpoint_interval < 0:  # invalid checkpoint interval
+        parser.error("checkpoint interval must not be negative")
+    if args.resume and args.checkpoint_interval == 0:  # resume without checkpoints
+        parser.error("--resume needs checkpoints, the checkpoint interval must not be 0")
+    if args.checkpoint_interval > 0 and (args.cache or args.cascade):
+        # the progress of a test with verdict cache or cascade can't be saved
+        parser.error("checkpoints can't be combined with --cache or --cascade")
+    if args.shard is not None and (args.cache or args.dataset_cache or args.incremental):
+        # the files next to the database would be written by all shards at the same time
+        parser.error("--shard can't be combined with --cache, --dataset_cache or --incremental")
+    if args.shard is not None and args.merge:  # merge is a separate step
+        parser.error("--shard and --merge can't be combined, merge after all shards finished")
+
+    return db_dir, db_name, tests_todo, args
 
 
 def _create_argparser():
@@ -95,6 +156,8 @@ def _create_argparser():
     parser.add_argument("--test_all", help="run all available schedulability analysis methods",
                         action="store_true")
     parser.add_argument("-s", "--simulation", help="run simulation", action="store_true")
+    parser.add_argument("--simso", help="run simulation with SimSo (reference for the simulation)",
+                        action="store_true")
     parser.add_argument("-u", "--utilization",
                         help="run all utilization based schedulability analysis methods",
                         action="store_true")
@@ -103,6 +166,65 @@ def _create_argparser():
     parser.add_argument("-w", "--workload",
                         help="run all workload based schedulability analysis methods",
                         action="store_true")
+    parser.add_argument("-j", "--jobs", help="number of worker processes for the analysis",
+                        type=int, default=1)
+    parser.add_argument("--cache", help="use the persistent cache of verdicts",
+                        action="store_true")
+    parser.add_argument("--stream", help="stream the task-sets from the database instead of "
+                                         "reading all task-sets at once", action="store_true")
+    parser.add_argument("--dataset_cache", help="use the memory-mapped cache of the data-set",
+                        action="store_true")
+    parser.add_argument("--prepare_db", help="create the missing indexes of the database",
+                        action="store_true")
+    parser.add_argument("--batch", help="use the vectorized batch variants of the analysis "
+                                        "methods where available", action="store_true")
+    parser.add_argument("--cascade", help="decide task-sets with cheap utilization tests before "
+                                          "running exact tests", action="store_true")
+    parser.add_argument("--fused", help="run all selected tests in a single pass over the "
+                                        "data-set", action="store_true")
+    parser.add_argument("--dedup", help="group identical task-sets and test each group only once",
+                        action="store_true")
+    parser.add_argument("--prefix_cache_size", help="maximal number of nodes of the cache of "
+                                                    "task-set prefixes for the exact tests, "
+                                                    "0 = don't use the cache (default)",
+                        type=int, default=prefix_cache.MAX_NODES)
+    parser.add_argument("--incremental", help="analyze only the task-sets whose execution times "
+                                              "changed since the last analysis, the verdicts are "
+                                              "stored next to the database",
+                        action="store_true")
+    parser.add_argument("--checkpoint_interval", help="time between two checkpoints of the "
+                                                      "progress in seconds, 0 = no checkpoints "
+                                                      "(default)",
+                        type=float, default=checkpoint.CHECKPOINT_INTERVAL)
+    parser.add_argument("--resume", help="continue the analysis from the last checkpoint",
+                        action="store_true")
+    parser.add_argument("--pipeline", help="read and test the task-sets in a streaming pipeline "
+                                           "of reader, workers and aggregator",
+                        action="store_true")
+    parser.add_argument("--shard", help="analyze only the I-th of N ranges of Set_IDs (1 <= I <= "
+                                        "N) and save the results next to the database",
+                        type=_parse_shard, metavar="I/N")
+    parser.add_argument("--merge", help="merge the results of all shards and log the final "
+                                        "results", action="store_true")
 
     # return argument parser
     return parser
+
+
+def _parse_shard(shard_string):
+    """Parse the argument of --shard.
+
+    Args:
+        shard_string -- the argument in the form I/N
+    Return:
+        shard -- number of the shard I
+        shards -- number of shards N
+    """
+    try:
+        shard, shards = (int(number) for number in shard_string.split("/"))
+    except ValueError:  # not of the form I/N
+        raise argparse.ArgumentTypeError("shard must be of the form I/N, e.g. 1/4")
+    if not 1 <= shard <= shards:  # invalid shard
+        raise argparse.ArgumentTypeError("shard I/N must satisfy 1 <= I <= N")
+
+    return shard, shards
@@ -1,12 +1,44 @@
 """Class and methods for database connectivity."""
 
+import bisect
+import collections
 import logging
 import operator
 import os
 import sqlite3
+import urllib.parse
+
+import numpy as np
 
 import benchmark
 
+# settings of the database connections
+MMAP_SIZE = 1073741824  # maximal size of memory-mapped I/O in bytes
+CACHE_SIZE = -262144  # size of the page cache, negative values are in KiB
+CACHED_STATEMENTS = 128  # number of prepared statements that are reused by a connection
+
+# number of rows that are fetched at once when iterating over the table TaskSet
+BATCH_SIZE = 10000
+
+# maximal number of parameters of a query, SQLite allows at most 999 in older versions
+MAX_QUERY_PARAMETERS = 500
+
+# queries of the lookups that rely on an index
+JOB_QUERY = "SELECT * FROM Job WHERE Set_ID = ? AND Task_ID = ?"
+SINGLE_TASK_QUERY = "SELECT * FROM TaskSet WHERE TASK1_ID = ? AND TASK2_ID = ? AND " \
+                    "TASK3_ID = ? AND TASK4_ID = ?"
+JOB_EXECUTION_TIME_QUERY = "SELECT Job.Task_ID, SUM(Job.End_Date - Job.Start_Date), COUNT(*) " \
+                           "FROM TaskSet JOIN Job ON Job.Set_ID = TaskSet.Set_ID " \
+                           "AND Job.Task_ID = TaskSet.TASK1_ID " \
+                           "WHERE TaskSet.TASK2_ID = -1 AND TaskSet.TASK3_ID = -1 " \
+                           "AND TaskSet.TASK4_ID = -1 AND Job.End_Date - Job.Start_Date > 0 " \
+                           "GROUP BY Job.Task_ID ORDER BY Job.Task_ID ASC"
+
+# indexes for the lookups (name, table, columns): both indexes cover the benchmark of the
+# execution times, the index on TaskSet starts with the slots that are -1 for single-task sets
+INDEXES = [("Job_Set_Task_Index", "Job", ("Set_ID", "Task_ID", "Start_Date", "End_Date")),
+           ("TaskSet_Task_Index", "TaskSet", ("TASK2_ID", "TASK3_ID", "TASK4_ID", "TASK1_ID"))]
+
 
 class Task:
     """Representation of a task.
@@ -20,8 +52,12 @@ class Task:
         period -- period of the task
         number_of_jobs -- number of jobs, defines how often the task is executed
         execution_time -- time needed to execute the task
+    The attributes are stored in slots, so a task needs no attribute dictionary.
     """
 
+    __slots__ = ('task_id', 'priority', 'pkg', 'arg', 'deadline', 'period', 'number_of_jobs',
+                 'execution_time')
+
     def __init__(self, task_id=-1, priority=-1, pkg=None, arg=None, deadline=-1, period=-1,
                  number_of_jobs=-1, execution_time=-1):
         """Constructor"""
@@ -51,20 +87,29 @@ class Taskset:
         taskset_id -- ID of the task-set, corresponds to column 'Set_ID'
         result -- 1 if task-set could be successfully scheduled, otherwise 0, corresponds to column
                   'Sucessful'
-        tasks -- list of tasks (of type Task)
+        tasks -- list of tasks (of type Task) sorted according to priorities, a tuple if the
+                 task-set is frozen
+    A frozen task-set is built once and can't be changed, i.e. add_task() is not possible.
     """
 
-    def __init__(self, taskset_id=-1, result=-1, tasks=None):
+    __slots__ = ('taskset_id', 'result', 'tasks', '_priorities')
+
+    def __init__(self, taskset_id=-1, result=-1, tasks=None, frozen=False):
         """Constructor."""
         self.taskset_id = taskset_id
         self.result = result
         if tasks is None:
-            self.tasks = []
-        else:
-            self.tasks = tasks
+            tasks = []
 
         # Sort tasks according to priorities
-        self.tasks.sort(key=operator.attrgetter('priority'))
+        tasks = sorted(tasks, key=operator.attrgetter('priority'))
+
+        if frozen:  # store the tasks in a tuple
+            self.tasks = tuple(tasks)
+            self._priorities = None
+        else:  # store the tasks and their priorities for add_task()
+            self.tasks = tasks
+            self._priorities = [task.priority for task in tasks]
 
     def __str__(self):
         """Represent Taskset object as String."""
@@ -87,8 +132,8 @@ class Taskset:
     def add_task(self, task):
         """Add a new task to the task-set.
 
-        Check the input argument. If a correct input is given, add the task to the task-set and
-        sort it according to priorities.
+        Check the input argument. If a correct input is given, insert the task into the task-set
+        according to its priority (after all tasks with the same priority).
 
         Args:
             task -- the task that should be added, must be of type 'Task'
@@ -96,10 +141,139 @@ class Taskset:
         # check input arguments
         if not isinstance(task, Task):  # wrong input argument
             raise ValueError("task must be of type Task")
+        if self._priorities is None:  # task-set is frozen
+            raise ValueError("task-set is frozen")
+
+        # insert task into the task-set sorted according to increasing priorities
+        index = bisect.bisect_right(self._priorities, task.priority)
+        self._priorities.insert(index, task.priority)
+        self.tasks.insert(index, task)
+
+
+class TasksetGroup(Taskset):
+    """Representation of a group of identical task-sets.
+
+    The task-sets of a group have the same tasks in the same order, so every schedulability
+    analysis method gives the same verdict for all of them. The group is analyzed like its first
+    task-set, whose ID and result it takes. In addition to the attributes of a Taskset it has:
+        labels -- Counter with the real results of the task-sets of the group (key = result,
+                  value = number of task-sets)
+    """
+
+    __slots__ = ('labels',)
+
+    def __init__(self, taskset):
+        """Constructor, creates a group with the tasks of taskset but without members."""
+        super().__init__(taskset_id=taskset.taskset_id, result=taskset.result,
+                         tasks=taskset.tasks, frozen=True)
+        self.labels = collections.Counter()
+
+
+class TasksetBatch:
+    """Representation of a batch of task-sets as padded NumPy arrays.
+
+    The batch holds N task-sets with up to K tasks each. The tasks of a task-set are sorted
+    according to priorities like in a Taskset, invalid task slots (task ID -1) are at the end.
+    The batch is defined by the following attributes:
+        taskset_ids -- IDs of the task-sets, shape (N,)
+        results -- labels of the task-sets, shape (N,)
+        task_ids -- IDs of the tasks, shape (N, K)
+        mask -- whether a task slot is valid, shape (N, K)
+        execution_time, period, deadline, priority, number_of_jobs -- task attributes, shape (N, K)
+    Invalid task slots have C = 0, T = D = 1, priority = PADDING_PRIORITY and no jobs, so they
+    don't contribute to the load of a task-set. A TasksetBatch can be sliced, e.g. batch[a:b].
+    """
+
+    # priority of invalid task slots: lower than every valid priority
+    PADDING_PRIORITY = np.iinfo(np.int64).max
 
-        self.tasks.append(task)  # add task to task-set
-        self.tasks.sort(
-            key=operator.attrgetter('priority'))  # sort tasks according to increasing priorities
+    # names of the arrays with the task attributes
+    TASK_ATTRIBUTES = ('execution_time', 'period', 'deadline', 'priority', 'number_of_jobs')
+
+    def __init__(self, taskset_ids, results, task_ids, mask, execution_time, period, deadline,
+                 priority, number_of_jobs):
+        """Constructor of class TasksetBatch.
+
+        The arrays must already be padded and sorted, see create_taskset_batch().
+        """
+        self.taskset_ids = taskset_ids
+        self.results = results
+        self.task_ids = task_ids
+        self.mask = mask
+        self.execution_time = execution_time
+        self.period = period
+        self.deadline = deadline
+        self.priority = priority
+        self.number_of_jobs = number_of_jobs
+
+    def __len__(self):
+        """Get length of the batch = number of task-sets."""
+        return len(self.taskset_ids)
+
+    def __getitem__(self, index):
+        """Get the task-sets at index (a slice or an array of indices) as TasksetBatch."""
+        if isinstance(index, (int, np.integer)):  # keep the dimension of the task-sets
+            index = slice(index, index + 1)
+
+        return TasksetBatch(self.taskset_ids[index], self.results[index], self.task_ids[index],
+                            self.mask[index], self.execution_time[index], self.period[index],
+                            self.deadline[index], self.priority[index],
+                            self.number_of_jobs[index])
+
+    def chunks(self, chunk_size):
+        """Split the batch into chunks.
+
+        Args:
+            chunk_size -- number of task-sets per chunk, the last chunk may be smaller
+        Yield:
+            chunk -- TasksetBatch with the task-sets of the next chunk
+        """
+        for start in range(0, len(self), chunk_size):  # iterate over all chunks
+            yield self[start:start + chunk_size]
+
+
+def create_taskset_batch(taskset_ids, results, task_ids, task_dict):
+    """Create a TasksetBatch.
+
+    The attributes of the tasks are looked up for all task slots at once and the task slots of each
+    task-set are sorted according to priorities (stable, i.e. in slot order for equal priorities).
+
+    Args:
+        taskset_ids -- IDs of the task-sets, shape (N,)
+        results -- labels of the task-sets, shape (N,)
+        task_ids -- IDs of the tasks (-1 = no task), shape (N, K)
+        task_dict -- dictionary with Task-objects (key = task ID, value = Task-object)
+    Return:
+        batch -- the TasksetBatch
+    """
+    task_ids = np.asarray(task_ids, dtype=np.int64)
+    if task_ids.ndim != 2:  # no task-sets
+        task_ids = task_ids.reshape(len(taskset_ids), 0)
+    mask = task_ids != -1  # valid task slots
+    if np.any(mask) and not set(np.unique(task_ids[mask]).tolist()) <= set(task_dict):
+        raise ValueError("task-sets contain unknown tasks")
+
+    # create lookup tables for the task attributes (index = task ID), the last entry is padding
+    max_task_id = max(task_dict) if task_dict else 0
+    lookup_index = np.where(mask, task_ids, max_task_id + 1)
+    padding = {'execution_time': 0, 'period': 1, 'deadline': 1,
+               'priority': TasksetBatch.PADDING_PRIORITY, 'number_of_jobs': 0}
+    attributes = dict()
+    for attribute in TasksetBatch.TASK_ATTRIBUTES:
+        lookup = np.full(max_task_id + 2, padding[attribute], dtype=np.int64)
+        for task_id, task in task_dict.items():
+            lookup[task_id] = getattr(task, attribute)
+        attributes[attribute] = lookup[lookup_index]
+
+    # sort task slots according to priorities, invalid slots have the lowest priority
+    order = np.argsort(attributes['priority'], axis=1, kind='stable')
+    for attribute in TasksetBatch.TASK_ATTRIBUTES:
+        attributes[attribute] = np.take_along_axis(attributes[attribute], order, axis=1)
+
+    return TasksetBatch(np.asarray(taskset_ids, dtype=np.int64),
+                        np.asarray(results, dtype=np.int64),
+                        np.take_along_axis(task_ids, order, axis=1),
+                        np.take_along_axis(mask, order, axis=1), **attributes)
 
 
 class Database:
@@ -108,24 +282,47 @@ class Database:
     The database is defined by following attributes:
         db_dir -- path to the database file (*.db)
         db_name -- name of the database file (incl. .db)
+        read_only -- whether the database is opened in read-only mode
+        create_indexes -- whether missing indexes are created when the database is checked
+        set_id_range -- range (first Set_ID, last Set_ID) of the task-sets that are read from the
+                        table TaskSet, None = all task-sets, see get_shard_range()
     Additional attributes of a Database object are:
         db_connection -- connection to the database
         db_cursor -- cursor for working with the database
+        persistent_connection -- connection that is kept open, see open()
+    A Database object can be used as context manager: a persistent connection is opened, which is
+    used by all methods until the end of the with-block. Otherwise each method opens and closes its
+    own connection.
     """
 
-    def __init__(self, db_dir, db_name):
+    def __init__(self, db_dir, db_name, read_only=False, create_indexes=False,
+                 set_id_range=None):
         """Constructor of class Database."""
 
         self.db_dir = db_dir  # path to the database
         self.db_name = db_name  # name of the database
+        self.read_only = read_only  # whether the database is opened in read-only mode
+        self.create_indexes = create_indexes  # whether missing indexes are created
+        self.set_id_range = set_id_range  # range of the task-sets that are read
         self.db_connection = None  # connection to the database
         self.db_cursor = None  # cursor for working with the database
+        self.persistent_connection = None  # connection that is kept open
 
         # check that database exists
         self._check_if_database_exists()
 
         # check the database: check if all necessary tables exist
-        self._check_database()
+        with self:
+            self._check_database()
+
+    def __enter__(self):
+        """Enter the runtime context: open a persistent connection."""
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Exit the runtime context: close the persistent connection."""
+        self.close()
 
     #############################
     # check database and tables #
@@ -153,8 +350,12 @@ class Database:
             TaskSet
             ExecutionTime.
         If a table does not exist in the database, it is created (if possible) or an Exception is
-        raised.
+        raised. Missing indexes (see INDEXES) are created if self.create_indexes is True,
+        otherwise a warning is logged.
         """
+        # create logger
+        logger = logging.getLogger('traditional-SA.database._check_database')
+
         # check table Job
         if not self._check_if_table_exists('Job'):  # table Job does not exist
             raise Exception("no such table: %s" % ('Job',))
@@ -167,6 +368,14 @@ class Database:
         if not self._check_if_table_exists('TaskSet'):  # table TaskSet does not exist
             raise Exception("no such table: %s" % ('TaskSet',))
 
+        # check indexes: create them before the benchmark, which relies on them
+        missing_indexes = self.get_missing_indexes()
+        if missing_indexes and self.create_indexes:  # create the missing indexes
+            self._create_indexes(missing_indexes)
+        elif missing_indexes:  # lookups scan the whole table
+            logger.warning("Missing indexes %s: lookups scan the whole table, create the indexes "
+                           "with --prepare_db", [index[0] for index in missing_indexes])
+
         # check table ExecutionTime
         if not self._check_if_table_exists('ExecutionTime'):
             # table ExecutionTime does not exist: create it through benchmark
@@ -190,9 +399,8 @@ class Database:
         self._open_db()  # open database
 
         # execute the following query to determine if the table exists
-        sql_query = "SELECT * from sqlite_master " \
-                    "WHERE type = 'table' AND name = '{}'".format(table_name)
-        self.db_cursor.execute(sql_query)
+        sql_query = "SELECT * from sqlite_master WHERE type = 'table' AND name = ?"
+        self.db_cursor.execute(sql_query, (table_name,))
 
         rows = self.db_cursor.fetchall()  # fetch all rows
         self._close_db()  # close database
@@ -203,32 +411,159 @@ class Database:
         # at least one row was fetched - table exists
         return True
 
+    def get_missing_indexes(self):
+        """Get the missing indexes of the database.
+
+        An index of INDEXES is missing if no index of its table starts with its columns.
+
+        Return:
+            missing_indexes -- list with the missing indexes (name, table, columns)
+        """
+        self._open_db()  # open database
+
+        missing_indexes = []  # create empty list for the missing indexes
+
+        for index in INDEXES:  # iterate over all indexes
+            index_found = False
+
+            # iterate over all indexes of the table and compare the columns
+            self.db_cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND "
+                                   "tbl_name = ?", (index[1],))
+            for (index_name,) in self.db_cursor.fetchall():
+                self.db_cursor.execute("SELECT name FROM pragma_index_info(?) ORDER BY seqno",
+                                       (index_name,))
+                columns = tuple(row[0] for row in self.db_cursor.fetchall())
+                if columns[:len(index[2])] == index[2]:  # index covers the columns
+                    index_found = True
+
+            if not index_found:  # no index found
+                missing_indexes.append(index)
+
+        self._close_db()  # close database
+
+        return missing_indexes
+
+    def _create_indexes(self, indexes):
+        """Create indexes in the database.
+
+        Args:
+            indexes -- list with the indexes that should be created (name, table, columns)
+        """
+        # create logger
+        logger = logging.getLogger('traditional-SA.database._create_indexes')
+
+        self._open_db(write=True)  # open database
+
+        for index in indexes:  # iterate over all indexes
+            logger.info("Creating index %s on %s(%s)...", index[0], index[1], ", ".join(index[2]))
+            self.db_cursor.execute("CREATE INDEX IF NOT EXISTS %s ON %s (%s)"
+                                   % (index[0], index[1], ", ".join(index[2])))
+
+        self._close_db()  # close database
+
+    def explain_query_plans(self):
+        """Get the query plans of the lookups that rely on an index.
+
+        Return:
+            query_plans -- dictionary with the query plans (key = name of the query, value = list
+                           with the steps of the query plan)
+        """
+        self._open_db()  # open database
+
+        query_plans = dict()  # create empty dictionary for the query plans
+
+        # explain the lookups with arbitrary parameters
+        queries = {'read_table_job': (JOB_QUERY, (0, 0)),
+                   'read_table_taskset': (SINGLE_TASK_QUERY, (0, -1, -1, -1)),
+                   'read_job_execution_times': (JOB_EXECUTION_TIME_QUERY, ())}
+        for query_name, (query, parameters) in queries.items():
+            self.db_cursor.execute("EXPLAIN QUERY PLAN " + query, parameters)
+            query_plans[query_name] = [row[-1] for row in self.db_cursor.fetchall()]
+
+        self._close_db()  # close database
+
+        return query_plans
+
     #########################
     # open / close database #
     #########################
 
-    def _open_db(self):
-        """Open the database.
+    def open(self):
+        """Open a persistent connection to the database.
 
-        This methods opens the database defined by self.db_dir and self.db_name by creating a
-        database connection and a cursor.
+        The persistent connection is used by all methods until close() is called, so the
+        connection and its prepared statements are reused.
+        """
+        if self.persistent_connection is None:  # no persistent connection open
+            self.persistent_connection = self._connect(self.read_only)
+
+    def close(self):
+        """Close the persistent connection to the database.
+
+        The changes are committed before the connection is closed.
+        """
+        if self.persistent_connection is not None:  # persistent connection open
+            self.persistent_connection.commit()
+            self.persistent_connection.close()
+            self.persistent_connection = None
+
+    def _connect(self, read_only):
+        """Create a connection to the database.
+
+        This method creates a connection to the database defined by self.db_dir and self.db_name.
+        A read-only connection is opened with the URI mode 'ro'. The pragmas for memory-mapped
+        I/O and the page cache are set.
+
+        Args:
+            read_only -- whether the connection should be read-only
+        Return:
+            db_connection -- the connection to the database
         """
         # create full path to the database
         db_path = os.path.join(self.db_dir, self.db_name)
 
-        # create database connection and a cursor
-        self.db_connection = sqlite3.connect(db_path)
+        # create database connection
+        if read_only:  # open database in read-only mode
+            db_uri = "file:" + urllib.parse.quote(os.path.abspath(db_path)) + "?mode=ro"
+            db_connection = sqlite3.connect(db_uri, uri=True, cached_statements=CACHED_STATEMENTS)
+        else:  # open database in read-write mode
+            db_connection = sqlite3.connect(db_path, cached_statements=CACHED_STATEMENTS)
+
+        # set the pragmas for reading the database
+        db_connection.execute("PRAGMA mmap_size = %d" % (MMAP_SIZE,))
+        db_connection.execute("PRAGMA cache_size = %d" % (CACHE_SIZE,))
+
+        return db_connection
+
+    def _open_db(self, write=False):
+        """Open the database.
+
+        This methods opens the database defined by self.db_dir and self.db_name by creating a
+        database connection and a cursor. If a persistent connection is open, it is used instead
+        of a new connection (unless the persistent connection is read-only and write is True).
+
+        Args:
+            write -- whether the connection is used to write to the database
+        """
+        if self.persistent_connection is not None and not (write and self.read_only):
+            # use the persistent connection
+            self.db_connection = self.persistent_connection
+        else:  # create database connection
+            self.db_connection = self._connect(self.read_only and not write)
+
+        # create a cursor
         self.db_cursor = self.db_connection.cursor()
 
     def _close_db(self):
         """Close the database.
 
         This method commits the changes to the database and closes it by closing and deleting the
-        database connection and the cursor.
+        database connection and the cursor. The persistent connection is not closed.
         """
         # commit changes and close connection to the database
         self.db_connection.commit()
-        self.db_connection.close()
+        if self.db_connection is not self.persistent_connection:
+            self.db_connection.close()
 
         # delete database connection and cursor
         self.db_connection = None
@@ -255,8 +590,7 @@ class Database:
 
         if set_id is not None and task_id is not None:
             # read all jobs of set_id and task_id
-            self.db_cursor.execute("SELECT * FROM Job WHERE Set_ID = ? AND Task_ID = ?",
-                                   (set_id, task_id))
+            self.db_cursor.execute(JOB_QUERY, (set_id, task_id))
         else:  # read all jobs
             self.db_cursor.execute("SELECT * FROM Job")
 
@@ -303,7 +637,7 @@ class Database:
         This method reads the table TaskSet of the database. If taskset_id is specified, only the
         task-set of taskset_id is read. If task_id is specified, only the task-sets where the task
         task_id is the only task are read. If neither taskset_id nor task_id is specified, the hole
-        table is read.
+        table (or the task-sets of self.set_id_range) is read.
 
         Args:
             taskset_id -- ID of the task-set which should be read
@@ -317,10 +651,9 @@ class Database:
         if taskset_id is not None:  # read task-set with taskset_id
             self.db_cursor.execute("SELECT * FROM TaskSet WHERE Set_ID = ?", (taskset_id,))
         elif task_id is not None:  # read task-set where task_id is only task
-            self.db_cursor.execute("SELECT * FROM TaskSet WHERE TASK1_ID = ? AND TASK2_ID = ? AND "
-                                   "TASK3_ID = ? AND TASK4_ID = ?", (task_id, -1, -1, -1))
+            self.db_cursor.execute(SINGLE_TASK_QUERY, (task_id, -1, -1, -1))
         else:  # read all tasks-sets
-            self.db_cursor.execute("SELECT * FROM TaskSet")
+            self._select_tasksets(self.db_cursor)
 
         rows = self.db_cursor.fetchall()
         self._close_db()  # close database
@@ -331,6 +664,176 @@ class Database:
 
         return rows
 
+    def read_tasksets(self, taskset_ids):
+        """Read the task-sets with the given IDs from the table TaskSet.
+
+        The task-sets are read with queries of at most MAX_QUERY_PARAMETERS IDs.
+
+        Args:
+            taskset_ids -- list with the IDs of the task-sets
+        Return:
+            dataset -- list with the task-sets (of type Taskset) in order of their ID
+        """
+        # read table 'Task': get dictionary with task attributes
+        # (key = task ID, value = Task-object)
+        task_attributes = self.read_table_task()
+
+        self._open_db()  # open database
+
+        rows = []
+        taskset_ids = sorted(taskset_ids)
+        for start in range(0, len(taskset_ids), MAX_QUERY_PARAMETERS):  # iterate over all parts
+            part = taskset_ids[start:start + MAX_QUERY_PARAMETERS]
+            self.db_cursor.execute("SELECT * FROM TaskSet WHERE Set_ID IN (%s) ORDER BY Set_ID ASC"
+                                   % ", ".join("?" * len(part)), part)
+            rows.extend(self.db_cursor.fetchall())
+        self._close_db()  # close database
+
+        return self._convert_to_taskset(rows, task_attributes)
+
+    def get_taskset_summary(self):
+        """Get a summary of the table TaskSet.
+
+        The summary changes if task-sets are added or removed.
+
+        Return:
+            number_of_tasksets -- number of rows of the table TaskSet
+            max_taskset_id -- greatest Set_ID, None = table is empty
+        """
+        self._open_db()  # open database
+
+        self.db_cursor.execute("SELECT COUNT(*), MAX(Set_ID) FROM TaskSet")
+        number_of_tasksets, max_taskset_id = self.db_cursor.fetchone()
+        self._close_db()  # close database
+
+        return number_of_tasksets, max_taskset_id
+
+    def get_shard_range(self, shard, shards):
+        """Get the range of Set_IDs of a shard of the table TaskSet.
+
+        The task-sets are split in order of their ID into shards of nearly the same size, so every
+        task-set belongs to exactly one shard. The range only depends on the table TaskSet, so
+        all processes that analyze the shards of a database get disjoint ranges.
+
+        Args:
+            shard -- number of the shard, 1 <= shard <= shards
+            shards -- number of shards
+        Return:
+            first_taskset_id -- first Set_ID of the shard
+            last_taskset_id -- last Set_ID of the shard, smaller than first_taskset_id if the
+                               shard contains no task-sets
+        """
+        self._open_db()  # open database
+
+        self.db_cursor.execute("SELECT COUNT(*) FROM TaskSet")
+        number_of_tasksets = self.db_cursor.fetchone()[0]
+        first_offset = (shard - 1) * number_of_tasksets // shards
+        last_offset = shard * number_of_tasksets // shards - 1
+
+        set_id_range = (1, 0)  # empty range
+        if first_offset <= last_offset:  # shard contains task-sets
+            set_id_range = tuple(
+                self.db_cursor.execute("SELECT Set_ID FROM TaskSet ORDER BY Set_ID ASC "
+                                       "LIMIT 1 OFFSET ?", (offset,)).fetchone()[0]
+                for offset in (first_offset, last_offset))
+        self._close_db()  # close database
+
+        return set_id_range
+
+    def read_job_execution_times(self):
+        """Read the summed execution times of the jobs of single-task task-sets.
+
+        This method determines for each task the jobs of the task-sets that consist only of this
+        task in one set-based query. The execution time of a job is calculated from its start- and
+        end-date, only jobs with a positive execution time are considered.
+
+        Return:
+            rows -- list with the task ID, the sum of the execution times and the number of jobs
+                    of each task that has at least one valid job
+        """
+        self._open_db()  # open database
+
+        # join the jobs with the single-task task-sets and sum the execution times per task
+        self.db_cursor.execute(JOB_EXECUTION_TIME_QUERY)
+
+        rows = self.db_cursor.fetchall()
+        self._close_db()  # close database
+
+        return rows
+
+    def iter_tasksets(self, batch_size=BATCH_SIZE):
+        """Iterate over the table TaskSet.
+
+        This method is a generator over all task-sets of the table TaskSet (or the task-sets of
+        self.set_id_range) in order of their ID.
+        In contrast to read_table_taskset(), the rows are fetched in batches of batch_size rows and
+        converted to objects of type Taskset lazily, so only one batch is held in memory.
+
+        Args:
+            batch_size -- number of rows that are fetched at once
+        Yield:
+            taskset -- the next task-set as object of type Taskset
+        """
+        # read table 'Task': get dictionary with task attributes
+        # (key = task ID, value = Task-object)
+        task_attributes = self.read_table_task()
+
+        # use an own cursor: other methods may be called while the generator is suspended
+        if self.persistent_connection is not None:  # use the persistent connection
+            db_connection = self.persistent_connection
+        else:  # create database connection
+            db_connection = self._connect(self.read_only)
+        db_cursor = db_connection.cursor()
+
+        try:
+            self._select_tasksets(db_cursor)
+            rows = db_cursor.fetchmany(batch_size)
+            while rows:  # iterate over all batches
+                for taskset in self._convert_to_taskset(rows, task_attributes):
+                    yield taskset
+                rows = db_cursor.fetchmany(batch_size)
+        finally:  # close cursor and connection
+            db_cursor.close()
+            if db_connection is not self.persistent_connection:
+                db_connection.close()
+
+    def read_taskset_batch(self):
+        """Read the table TaskSet as TasksetBatch.
+
+        Return:
+            batch -- TasksetBatch with all task-sets (or the task-sets of self.set_id_range) in
+                     order of their ID
+        """
+        # read table 'Task': get dictionary with task attributes
+        # (key = task ID, value = Task-object)
+        task_attributes = self.read_table_task()
+
+        self._open_db()  # open database
+
+        # read all task-sets
+        self._select_tasksets(self.db_cursor)
+        rows = self.db_cursor.fetchall()
+        self._close_db()  # close database
+
+        # split taskset IDs, labels and task IDs
+        taskset_ids = [row[0] for row in rows]
+        labels = [row[1] for row in rows]
+        task_ids = [row[2:] for row in rows]
+
+        return create_taskset_batch(taskset_ids, labels, task_ids, task_attributes)
+
+    def _select_tasksets(self, db_cursor):
+        """Select the task-sets of self.set_id_range in order of their ID.
+
+        Args:
+            db_cursor -- the cursor that executes the query
+        """
+        if self.set_id_range is None:  # select all task-sets
+            db_cursor.execute("SELECT * FROM TaskSet ORDER BY Set_ID ASC")
+        else:  # select the task-sets of the range
+            db_cursor.execute("SELECT * FROM TaskSet WHERE Set_ID BETWEEN ? AND ? "
+                              "ORDER BY Set_ID ASC", self.set_id_range)
+
     def read_table_executiontime(self, convert_to_dict=True):
         """Read the table ExecutionTime.
 
@@ -367,7 +870,7 @@ class Database:
         # create logger
         logger = logging.getLogger('traditional-SA.database._write_execution_time')
 
-        self._open_db()  # open database
+        self._open_db(write=True)  # open database
 
         # create table ExecutionTime if it does not exist
         create_table_sql = "CREATE TABLE IF NOT EXISTS ExecutionTime (" \
@@ -384,10 +887,8 @@ class Database:
         insert_or_replace_sql = "INSERT OR REPLACE INTO ExecutionTime" \
                                 "(TASK_ID, Average_C) VALUES(?, ?)"
 
-        # iterate over all keys
-        for key in c_dict:
-            # insert or replace task-set
-            self.db_cursor.execute(insert_or_replace_sql, (key, c_dict[key]))
+        # insert or replace the execution times of all tasks at once
+        self.db_cursor.executemany(insert_or_replace_sql, c_dict.items())
 
         self._close_db()  # close database
 
@@ -427,7 +928,7 @@ class Database:
 
         return task_dict
 
-    def _convert_to_taskset(self, rows):
+    def _convert_to_taskset(self, rows, task_attributes=None):
         """Convert a list of task-sets to objects of type Taskset.
 
         This function converts a list of task-sets from the table TaskSet to a list of Taskset
@@ -435,12 +936,14 @@ class Database:
 
         Args:
             rows -- the rows read from the table TaskSet
+            task_attributes -- dictionary with Task-objects, None = read the table Task
         Return:
             dataset -- list of Taskset objects
         """
-        # read table 'Task': get dictionary with task attributes
-        # (key = task ID, value = Task-object)
-        task_attributes = self.read_table_task()
+        if task_attributes is None:
+            # read table 'Task': get dictionary with task attributes
+            # (key = task ID, value = Task-object)
+            task_attributes = self.read_table_task()
 
         dataset = []  # create empty list
 
@@ -451,14 +954,11 @@ class Database:
             label = row[1]
             task_ids = row[2:]
 
-            # create empty task-set
-            new_taskset = Taskset(taskset_id=taskset_id, result=label, tasks=[])
+            # get all tasks of the valid task-ids
+            tasks = [task_attributes[task_id] for task_id in task_ids if task_id != -1]
 
-            # iterate over all tasks and add them to the task-set
-            for task_id in task_ids:
-                if task_id != -1:  # valid task-id
-                    new_task = task_attributes[task_id]  # get task
-                    new_taskset.add_task(new_task)  # add task to task-set
+            # create frozen task-set
+            new_taskset = Taskset(taskset_id=taskset_id, result=label, tasks=tasks, frozen=True)
 
             # add task-set to dataset
             dataset.append(new_taskset)
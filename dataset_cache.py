@@ -0,0 +1,252 @@
+"""Memory-mapped columnar cache of the data-set.
+
+Converting the tables of the database to Task- and Taskset-objects is slow, although the data
+never changes between runs. The cache stores the data-set column by column as NumPy arrays in a
+directory next to the database (*_dataset), which are reopened with memory-mapping:
+    set_id, result, task_ids -- ID, label and task-ID slots (-1 = no task) of the task-sets
+    task_id, priority, deadline, period, number_of_jobs, execution_time, pkg, arg
+        -- attributes of the tasks in order of their ID
+    pkg_null, arg_null -- whether PKG/Arg of a task is NULL (stored as "" and 0 in pkg and arg)
+The cache always holds the whole data-set, it can't be used for a range of Set_IDs.
+The cache is invalidated if the modification time or the size of the database or the content of
+the table ExecutionTime changes.
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+
+import numpy as np
+
+from database_interface import BATCH_SIZE, Task, Taskset, create_taskset_batch
+
+# version of the cache format, increase to invalidate all cached data-sets
+CACHE_VERSION = 2
+
+# name of the file with the key of the cached data-set
+KEY_FILE_NAME = "cache_key.json"
+
+# columns of the tables TaskSet and Task that are cached
+TASKSET_COLUMNS = ['set_id', 'result', 'task_ids']
+TASK_COLUMNS = ['task_id', 'priority', 'deadline', 'period', 'number_of_jobs', 'execution_time',
+                'pkg', 'arg']
+
+# task columns that can be NULL, their NULL values are stored in a mask column (name + "_null")
+NULLABLE_COLUMNS = {'pkg': "", 'arg': 0}  # key = column, value = value stored for NULL
+NULL_COLUMNS = [column + "_null" for column in NULLABLE_COLUMNS]
+
+
+class DatasetCache:
+    """Class representing a dataset cache.
+
+    The dataset cache is defined by the following attributes:
+        db_path -- path to the database
+        cache_dir -- path to the directory of the cache
+    """
+
+    def __init__(self, db_dir, db_name):
+        """Constructor of class DatasetCache.
+
+        The cache directory is created in the directory of the database, its name is derived from
+        the name of the database.
+        """
+        self.db_path = os.path.join(db_dir, db_name)
+        db_name = os.path.splitext(db_name)[0]  # remove file extension from the database name
+        self.cache_dir = os.path.join(db_dir, db_name + "_dataset")
+
+    def read_columns(self, database):
+        """Read the columns of the data-set.
+
+        If the cache is valid, the columns are memory-mapped from the cache files. Otherwise the
+        columns are read from the database and the cache is rebuilt. The database must not be
+        restricted to a range of Set_IDs, the cache always holds the whole data-set.
+
+        Args:
+            database -- the Database-object of the data-set
+        Return:
+            columns -- dictionary with the NumPy arrays (key = column name, value = array)
+        """
+        # create logger
+        logger = logging.getLogger('traditional-SA.dataset_cache.read_columns')
+
+        # Check input argument: the cache is keyed by the whole database
+        if database.set_id_range is not None:  # range of Set_IDs
+            raise ValueError("the dataset cache can't be used for a range of Set_IDs")
+
+        key = self._get_key(database)  # key of the current database
+
+        if self._read_key() == key:  # cache is valid: memory-map the columns
+            columns = dict()
+            for column in TASKSET_COLUMNS + TASK_COLUMNS + NULL_COLUMNS:
+                columns[column] = np.load(self._get_column_path(column), mmap_mode='r')
+            return columns
+
+        # cache is invalid: rebuild it
+        logger.info("Dataset cache is outdated, rebuilding it...")
+        start_time = time.time()
+        columns = self._write(database, key)
+        logger.info("Time elapsed: %f s", time.time() - start_time)
+
+        return columns
+
+    def read_dataset(self, database):
+        """Read the data-set as list of Taskset-objects.
+
+        Args:
+            database -- the Database-object of the data-set
+        Return:
+            dataset -- list of Taskset-objects
+        """
+        return list(self.iter_tasksets(database))
+
+    def read_batch(self, database):
+        """Read the data-set as TasksetBatch.
+
+        Args:
+            database -- the Database-object of the data-set
+        Return:
+            batch -- TasksetBatch with all task-sets in order of their ID
+        """
+        columns = self.read_columns(database)
+
+        return create_taskset_batch(columns['set_id'], columns['result'], columns['task_ids'],
+                                    convert_to_task_dict(columns))
+
+    def iter_tasksets(self, database, batch_size=BATCH_SIZE):
+        """Iterate over the task-sets of the data-set.
+
+        This method is a generator over all task-sets in order of their ID. The rows of the
+        memory-mapped columns are converted to Taskset-objects in batches of batch_size rows.
+
+        Args:
+            database -- the Database-object of the data-set
+            batch_size -- number of task-sets that are converted at once
+        Yield:
+            taskset -- the next task-set as object of type Taskset
+        """
+        columns = self.read_columns(database)
+        task_dict = convert_to_task_dict(columns)  # create all tasks only once
+
+        for start in range(0, len(columns['set_id']), batch_size):  # iterate over all batches
+            batch = slice(start, start + batch_size)
+            rows = zip(columns['set_id'][batch].tolist(), columns['result'][batch].tolist(),
+                       columns['task_ids'][batch].tolist())
+            for taskset_id, label, task_ids in rows:  # iterate over all task-sets of the batch
+                tasks = [task_dict[task_id] for task_id in task_ids if task_id != -1]
+                yield Taskset(taskset_id=taskset_id, result=label, tasks=tasks, frozen=True)
+
+    def _write(self, database, key):
+        """Read the data-set from the database and write it to the cache.
+
+        The key is written last, so an interrupted write leaves an invalid cache.
+
+        Args:
+            database -- the Database-object of the data-set
+            key -- key of the database, see _get_key()
+        Return:
+            columns -- dictionary with the NumPy arrays (key = column name, value = array)
+        """
+        # read tables 'TaskSet' and 'Task'
+        taskset_rows = database.read_table_taskset(convert=False)
+        task_dict = database.read_table_task()
+        tasks = [task_dict[task_id] for task_id in sorted(task_dict)]
+
+        # convert the tables to columns
+        columns = dict()
+        columns['set_id'] = np.array([row[0] for row in taskset_rows], dtype=np.int64)
+        columns['result'] = np.array([row[1] for row in taskset_rows], dtype=np.int64)
+        columns['task_ids'] = np.array([row[2:] for row in taskset_rows], dtype=np.int64)
+        if len(taskset_rows) == 0:  # no task-sets: keep shape of the task-ID slots
+            columns['task_ids'] = columns['task_ids'].reshape(0, 0)
+        for column in TASK_COLUMNS:
+            values = [getattr(task, column) for task in tasks]
+            if column in NULLABLE_COLUMNS:  # store the NULL values in the mask column
+                columns[column + "_null"] = np.array([value is None for value in values],
+                                                     dtype=bool)
+                values = [NULLABLE_COLUMNS[column] if value is None else value
+                          for value in values]
+            if column == 'pkg':  # name of the tasks
+                columns[column] = np.array(values, dtype=np.str_)
+            else:  # integer attribute of the tasks
+                columns[column] = np.array(values, dtype=np.int64)
+
+        # write the columns and the key
+        os.makedirs(self.cache_dir, exist_ok=True)
+        key_path = os.path.join(self.cache_dir, KEY_FILE_NAME)
+        if os.path.exists(key_path):  # invalidate the old cache
+            os.remove(key_path)
+        for column in columns:
+            np.save(self._get_column_path(column), columns[column])
+        with open(key_path, 'w') as key_file:
+            json.dump(key, key_file)
+
+        return columns
+
+    def _read_key(self):
+        """Read the key of the cached data-set.
+
+        Return:
+            key -- key of the cached data-set
+            None -- no valid cache found
+        """
+        key_path = os.path.join(self.cache_dir, KEY_FILE_NAME)
+        try:
+            with open(key_path) as key_file:
+                return json.load(key_file)
+        except (OSError, ValueError):  # no cache or corrupt key file
+            return None
+
+    def _get_key(self, database):
+        """Get the key of the database.
+
+        The key consists of the version of the cache, the modification time and size of the
+        database and a hash of the table ExecutionTime.
+
+        Args:
+            database -- the Database-object of the data-set
+        Return:
+            key -- dictionary with the key of the database
+        """
+        db_stat = os.stat(self.db_path)
+        execution_times = sorted(database.read_table_executiontime(convert_to_dict=False))
+        execution_time_hash = hashlib.sha1(repr(execution_times).encode()).hexdigest()
+
+        return {'version': CACHE_VERSION, 'mtime': db_stat.st_mtime_ns, 'size': db_stat.st_size,
+                'execution_time': execution_time_hash}
+
+    def _get_column_path(self, column):
+        """Get the path to the cache file of a column.
+
+        Args:
+            column -- name of the column
+        Return:
+            path to the cache file
+        """
+        return os.path.join(self.cache_dir, column + ".npy")
+
+
+def convert_to_task_dict(columns):
+    """Convert the task columns to a dictionary of Task-objects.
+
+    Args:
+        columns -- dictionary with the NumPy arrays, see DatasetCache.read_columns()
+    Return:
+        task_dict -- dictionary with Task-objects (key = task ID, value = Task-object)
+    """
+    task_dict = dict()  # create empty dictionary for tasks
+
+    values = {column: columns[column].tolist() for column in TASK_COLUMNS}
+    for column in NULLABLE_COLUMNS:  # restore the NULL values
+        values[column] = [None if is_null else value for value, is_null
+                          in zip(values[column], columns[column + "_null"].tolist())]
+
+    rows = zip(*[values[column] for column in TASK_COLUMNS])
+    for task_id, priority, deadline, period, number_of_jobs, execution_time, pkg, arg in rows:
+        # create new task and add it to the dictionary
+        task_dict[task_id] = Task(task_id=task_id, priority=priority, pkg=pkg, arg=arg,
+                                  deadline=deadline, period=period,
+                                  number_of_jobs=number_of_jobs, execution_time=execution_time)
+
+    return task_dict
+
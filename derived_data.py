@@ -0,0 +1,75 @@
+"""Data derived from a task-set that is shared by the schedulability analysis methods.
+
+In a fused pass (see main.test_fused()) all selected analysis methods test a task-set one after
+another. The quantities that several methods need are calculated only once per task-set:
+    utilizations -- U_i = C_i / T_i (utilization tests)
+    hp prefixes and prefix sums of C -- the tasks with higher or same priority and the sum of their
+                                        execution times (RTA, workload test)
+    hyperperiod -- least common multiple of the periods (simulation)
+"""
+import bisect
+
+import simulation
+
+
+class DerivedData:
+    """Class representing the derived data of a task-set.
+
+    The derived data is defined by the following attributes:
+        taskset -- the task-set the data is derived from
+        utilizations -- list with the utilization U_i = C_i / T_i of each task
+        hp_ends -- list with the end of the hp-prefix of each task: taskset[:hp_ends[i]] are all
+                   tasks with higher or same priority than task i (including task i)
+        prefix_execution_times -- prefix sums of the execution times: prefix_execution_times[j] is
+                                  the sum of C of taskset[:j]
+    The hyperperiod is calculated on first use, see get_hyperperiod().
+    """
+
+    __slots__ = ('taskset', 'utilizations', 'hp_ends', 'prefix_execution_times', '_hyperperiod')
+
+    def __init__(self, taskset):
+        """Constructor of class DerivedData."""
+        self.taskset = taskset
+        self.utilizations = [task.execution_time / task.period for task in taskset]
+
+        # the tasks are sorted according to priorities, so hp(i) is a prefix of the task-set
+        priorities = [task.priority for task in taskset]
+        self.hp_ends = [bisect.bisect_right(priorities, priority) for priority in priorities]
+
+        self.prefix_execution_times = [0]
+        for task in taskset:  # iterate over all tasks
+            self.prefix_execution_times.append(self.prefix_execution_times[-1] +
+                                               task.execution_time)
+
+        self._hyperperiod = None
+
+    def get_hp_tasks(self, index):
+        """Get the tasks with higher or same priority than a task.
+
+        Args:
+            index -- index of the task in the task-set
+        Return:
+            tuple with the tasks of the hp-prefix of the task (including the task itself)
+        """
+        return tuple(self.taskset[:self.hp_ends[index]])
+
+    def get_hp_execution_time(self, index):
+        """Get the sum of the execution times of the tasks with higher or same priority.
+
+        Args:
+            index -- index of the task in the task-set
+        Return:
+            sum of C of the hp-prefix of the task (including the task itself)
+        """
+        return self.prefix_execution_times[self.hp_ends[index]]
+
+    def get_hyperperiod(self):
+        """Get the hyperperiod of the task-set.
+
+        Return:
+            hyperperiod -- least common multiple of the periods of the tasks
+        """
+        if self._hyperperiod is None:  # calculate the hyperperiod on first use
+            self._hyperperiod = simulation.get_hyperperiod(self.taskset)
+
+        return self._hyperperiod
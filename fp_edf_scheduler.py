@@ -1,8 +1,8 @@
 """Defines the scheduling policy of the Fiasco.OS scheduler.
 
-    The algorithm is the following: a list of ready jobs is kept up-to-date using the on_activate
-    and on_terminated methods. When the schedule method is called, the ready job is chosen according
-    to the priorities:
+    The algorithm is the following: the ready jobs are kept up-to-date in two heaps using the
+    on_activate and on_terminated methods. When the schedule method is called, the ready job is
+    chosen according to the priorities:
     - Tasks can have priority values from 0 ... 127.
     - A priority from 0 ... 126 means, that the task is scheduled according to the fixed priority
       (FP) algorithm.
@@ -15,6 +15,8 @@
     http://projects.laas.fr/simso/doc/write_scheduler.html
 """
 
+import heapq  # import heapq for the heaps of ready jobs
+import itertools  # import itertools for the activation counter
 import logging  # import logging for logging messages
 
 from simso.core import Scheduler  # import scheduler class
@@ -41,8 +43,17 @@ class fp_edf_scheduler(Scheduler):  # define fp_edf_scheduler as subclass of sch
         This method is guaranteed to be called when the simulation starts, after the tasks are
         instantiated.
         The scheduler logic should be initialized here.
+        The ready jobs are kept in two heaps: one for the FP-algorithm (priorities 0 ... 126),
+        ordered by priority, and one for the EDF-algorithm (priority 127), ordered by absolute
+        deadline. Jobs with the same priority or deadline are ordered by their activation.
+        Terminated jobs are only marked as removed and discarded when they reach the top of their
+        heap.
         """
-        self.ready_list = []  # define a empty ready list
+        self.fp_heap = []  # ready FP jobs: [priority, activation number, job]
+        self.edf_heap = []  # ready EDF jobs: [absolute deadline, activation number, job]
+        self.ready_jobs = {}  # heap entries of the ready jobs (key = job, value = heap entry)
+        self.invalid_jobs = []  # ready jobs with an invalid priority-attribute-value
+        self.activation_counter = itertools.count()  # activation number of the jobs
 
     def on_activate(self, job):
         """On_activate method.
@@ -52,7 +63,19 @@ class fp_edf_scheduler(Scheduler):  # define fp_edf_scheduler as subclass of sch
         Args:
             job -   the activated job
         """
-        self.ready_list.append(job)  # append the job to the ready list
+        priority = job.data['priority']
+
+        if 0 <= priority < 127:  # job is scheduled according to FP-algorithm
+            entry = [priority, next(self.activation_counter), job]
+            heapq.heappush(self.fp_heap, entry)  # add the job to the FP heap
+            self.ready_jobs[job] = entry
+        elif priority == 127:  # job is scheduled according to EDF-algorithm
+            entry = [job.absolute_deadline, next(self.activation_counter), job]
+            heapq.heappush(self.edf_heap, entry)  # add the job to the EDF heap
+            self.ready_jobs[job] = entry
+        else:  # not a valid priority-attribute-value
+            self.invalid_jobs.append(job)
+
         job.cpu.resched()  # indirectly call the scheduler
 
     def on_terminated(self, job):
@@ -63,8 +86,27 @@ class fp_edf_scheduler(Scheduler):  # define fp_edf_scheduler as subclass of sch
         Args:
             job - the job that terminates
         """
-        self.ready_list.remove(job)  # remove the job from the ready list
-        job.cpu.resched()  # indirectly call the scheduler
+        if job in self.ready_jobs:  # mark the job as removed
+            self.ready_jobs.pop(job)[-1] = None
+        else:  # job with an invalid priority-attribute-value
+            self.invalid_jobs.remove(job)
+
+        if job.aborted:  # job missed its deadline
+            self.on_deadline_miss(job)
+        else:
+            job.cpu.resched()  # indirectly call the scheduler
+
+    def on_deadline_miss(self, job):
+        """On_deadline_miss method.
+
+        Monitor hook, this method is called when a job is aborted because it missed its deadline.
+        The task-set is not schedulable, so the simulation is stopped immediately: all simulated
+        time after the first deadline miss would be wasted.
+
+        Args:
+            job - the job that missed its deadline
+        """
+        self.sim.stopSimulation()  # stop the simulation
 
     def schedule(self, cpu):
         """Schedule method.
@@ -81,31 +123,31 @@ class fp_edf_scheduler(Scheduler):  # define fp_edf_scheduler as subclass of sch
         # create logger
         logger = logging.getLogger('traditional-SA.fp_edf_scheduler.schedule')
 
-        if self.ready_list:  # at least one job is ready
-
-            # Get the lowest priority-attribute-value (i.e. the highest priority) of all ready jobs
-            prio_low = min(self.ready_list, key=lambda x: x.data['priority']).data['priority']
-
-            if 0 <= prio_low < 127:  # Lowest priority-attribute-value is less than 127
-                # Schedule according to FP-algorithm
-                # logging.debug("FP-algorithm!")
-
-                # Get the job with the lowest priority-attribute-value
-                # (i.e. the job with the highest priority)
-                job = min(self.ready_list, key=lambda x: x.data['priority'])
+        if self.invalid_jobs:  # at least one ready job has an invalid priority-attribute-value
+            # Get the lowest invalid priority-attribute-value
+            prio_low = min(job.data['priority'] for job in self.invalid_jobs)
 
-            elif prio_low == 127:  # Lowest priority-attribute-value is 127
-                # Schedule according to EDF-algorithm
-                # logging.debug("EDF-algorithm!")
-
-                # Get the job with the lowest deadline-attribute-value
-                # (i.e. the job with the next deadline)
-                job = min(self.ready_list, key=lambda x: x.absolute_deadline)
-
-            else:  # Error: not a valid priority-attribute-value!
+            if prio_low < 0 or not self.ready_jobs:  # the invalid value is the lowest value
                 logger.error("%d is not a valid priority value!", prio_low)
                 return None
 
+        # Discard removed jobs from the top of the heaps
+        for heap in (self.fp_heap, self.edf_heap):
+            while heap and heap[0][-1] is None:
+                heapq.heappop(heap)
+
+        if self.fp_heap:  # Lowest priority-attribute-value is less than 127
+            # Schedule according to FP-algorithm
+            # Get the job with the lowest priority-attribute-value
+            # (i.e. the job with the highest priority)
+            job = self.fp_heap[0][-1]
+
+        elif self.edf_heap:  # Lowest priority-attribute-value is 127
+            # Schedule according to EDF-algorithm
+            # Get the job with the lowest deadline-attribute-value
+            # (i.e. the job with the next deadline)
+            job = self.edf_heap[0][-1]
+
         else:  # no job is ready
             job = None
 
@@ -60,6 +60,11 @@ def log_results(test_name, results):
             tn -- true negative results
             fn -- false negative results
             time -- time elapsed for test
+            chunk_times -- time elapsed for each chunk of the data-set (optional)
+            stages -- statistics of the stages of a cascade (optional): dictionary with the number
+                      of decided and undecided task-sets and the time per stage
+            dedup -- statistics of the deduplication (optional): dictionary with the number of
+                     task-sets, the number of groups of identical task-sets and the time saved
     """
     # create logger
     logger = logging.getLogger('traditional-SA.logging_config.print_results')
@@ -100,6 +105,21 @@ def log_results(test_name, results):
         log_file.write("Recall = {0:.2f}% \n".format(results['recall'] * 100))
         log_file.write("-" * len(result_title_string) + "\n")
         log_file.write("Time elapsed: {0:f}s \n".format(results['time']))
+        if len(results.get('chunk_times', [])) > 1:  # data-set was tested in chunks
+            log_file.write("Time elapsed in {0:d} chunks: {1:f}s (longest chunk: {2:f}s) \n"
+                           .format(len(results['chunk_times']), sum(results['chunk_times']),
+                                   max(results['chunk_times'])))
+        for stage, stage_results in results.get('stages', dict()).items():  # cascade
+            log_file.write("Stage {0}: {1:d} decided, {2:d} undecided, {3:f}s \n"
+                           .format(stage, stage_results['decided'], stage_results['undecided'],
+                                   stage_results['time']))
+        if 'dedup' in results:  # identical task-sets were tested once
+            log_file.write("Dedup: {0:d} of {1:d} task-sets tested (ratio {2:.2f}), time saved: "
+                           "{3:f}s \n".format(results['dedup']['groups'],
+                                               results['dedup']['tasksets'],
+                                               results['dedup']['tasksets'] /
+                                               max(results['dedup']['groups'], 1),
+                                               results['dedup']['time_saved']))
         log_file.write("-" * len(result_title_string) + "\n")
 
     # log results to the console
@@ -120,4 +140,16 @@ def log_results(test_name, results):
     logger.info("Recall = %.2f%%", results['recall'] * 100)
     logger.info("%s", "-" * len(result_title_string))
     logger.info("Time elapsed: %fs", results['time'])
+    if len(results.get('chunk_times', [])) > 1:  # data-set was tested in chunks
+        logger.info("Time elapsed in %d chunks: %fs (longest chunk: %fs)",
+                    len(results['chunk_times']), sum(results['chunk_times']),
+                    max(results['chunk_times']))
+    for stage, stage_results in results.get('stages', dict()).items():  # cascade
+        logger.info("Stage %s: %d decided, %d undecided, %fs", stage, stage_results['decided'],
+                    stage_results['undecided'], stage_results['time'])
+    if 'dedup' in results:  # identical task-sets were tested once
+        logger.info("Dedup: %d of %d task-sets tested (ratio %.2f), time saved: %fs",
+                    results['dedup']['groups'], results['dedup']['tasksets'],
+                    results['dedup']['tasksets'] / max(results['dedup']['groups'], 1),
+                    results['dedup']['time_saved'])
     logger.info("%s \n", "-" * len(result_title_string))
@@ -3,16 +3,30 @@
 Run the main method of this file for traditional schedulability analysis.
 """
 
+import collections
+import itertools
+import multiprocessing
 import time
 
+import numpy as np
+
+import cascade
+import checkpoint as checkpoint_module
 import command_line_interface
 import logging_config
 import logging
+import pipeline
+import prefix_cache
 import rta
+import shard
 import simulation
 import utilization
 import workload
-from database_interface import Database
+from database_interface import Database, TasksetGroup
+from dataset_cache import DatasetCache
+from derived_data import DerivedData
+from result_store import ResultStore
+from verdict_cache import VerdictCache, get_taskset_key
 
 # valid schedulability analysis methods, that are currently implemented
 VALID_SA = [simulation.simulate,  # simulation
@@ -25,32 +39,224 @@ VALID_SA = [simulation.simulate,  # simulation
             workload.het_workload_test  # hyperplanes exact test based on workload
             ]
 
+# batch variants of the schedulability analysis methods (key = method, value = batch variant)
+BATCH_SA = {utilization.basic_utilization_test: utilization.basic_utilization_test_batch,
+            utilization.rm_utilization_test: utilization.rm_utilization_test_batch,
+            utilization.hb_utilization_test: utilization.hb_utilization_test_batch,
+            rta.rta_audsley: rta.rta_audsley_batch,
+            rta.rta_buttazzo: rta.rta_buttazzo_batch,
+            workload.rm_workload_test: workload.rm_workload_test_batch}
+
+# methods that use the shared DerivedData of a task-set in a fused pass
+DERIVED_SA = [simulation.simulate, simulation.simulate_simso, utilization.rm_utilization_test,
+              utilization.hb_utilization_test, rta.rta_audsley, rta.rta_buttazzo,
+              workload.rm_workload_test]
+
+# number of task-sets that are tested at once by a batch variant, bounds the temporary arrays
+BATCH_CHUNK_SIZE = 100000
+
+# number of chunks per worker process, more chunks balance the load between the processes
+CHUNKS_PER_JOB = 4
+
+# number of task-sets per chunk if the data-set is streamed
+STREAM_CHUNK_SIZE = 10000
+
 
 def main():
     """Main function of project 'traditional-SA'."""
     # read and process command line arguments
-    db_dir, db_name, tests_todo = command_line_interface.read_input()
+    db_dir, db_name, tests_todo, options = command_line_interface.read_input()
 
     # create and initialize logger
     logger = logging_config.init_logging(db_dir, db_name)
 
+    if options.prepare_db:  # create the missing indexes of the database
+        prepare_database(db_dir, db_name)
+
+    if options.merge:  # combine the results of the shards
+        merge_shards(db_dir, db_name)
+        return
+
+    # create the cache of the task-set prefixes for the exact tests
+    prefix_cache.configure(options.prefix_cache_size)
+
     if tests_todo is not None:  # at least one test should be done
         logger.info("Tests to do: %s \n", [test.__name__ for test in tests_todo])
 
+        # get the range of the task-sets of the shard
+        set_id_range = None
+        suffix = ""
+        if options.shard is not None:  # analyze only one shard of the data-set
+            shard_database = Database(db_dir=db_dir, db_name=db_name, read_only=True)
+            with shard_database:  # use one connection for reading the summary and the range
+                summary = shard_database.get_taskset_summary()
+                set_id_range = shard_database.get_shard_range(*options.shard)
+            suffix = shard.get_suffix(*options.shard)
+            logger.info("Shard %d of %d: task-sets %d to %d \n", *options.shard, *set_id_range)
+
+        # create the checkpoint of the analysis, the task-sets of the data-set are ordered by ID
+        checkpoint = None
+        if options.checkpoint_interval > 0:
+            checkpoint = checkpoint_module.Checkpoint(
+                db_dir, db_name, {'dedup': options.dedup, 'shard': options.shard},
+                resume=options.resume, interval=options.checkpoint_interval, suffix=suffix)
+
+        # tests that were finished before the analysis was interrupted are not run again
+        finished_results = dict()
+        for test in tests_todo:
+            state = checkpoint.get_state(test.__name__) if checkpoint is not None else None
+            if state is not None and state['finished']:
+                finished_results[test] = state
+        tests_to_run = [test for test in tests_todo if test not in finished_results]
+
+        # tests with a batch variant are done on a TasksetBatch
+        batch_tests = [test for test in tests_to_run if options.batch and test in BATCH_SA]
+
+        # tests without batch variant are done in a single pass over the data-set, unless only the
+        # changed task-sets are analyzed or the tests are run in the pipeline
+        fused_tests = [test for test in tests_to_run if options.fused and not options.incremental
+                       and not options.pipeline and test not in batch_tests]
+        if fused_tests and (options.cache or options.cascade):
+            logger.warning("The verdict cache and the cascade are not used in the fused pass!")
+        if options.pipeline and (options.cache or options.cascade or options.dedup):
+            logger.warning("The verdict cache, the cascade and the deduplication are not used in "
+                           "the pipeline!")
+
         # load the dataset
-        dataset = load_dataset(db_dir, db_name)
+        if options.incremental:  # the changed task-sets are read per test
+            store = ResultStore(db_dir, db_name)
+        elif options.pipeline:  # the data-set is streamed by the pipeline of each test
+            pass
+        elif not options.stream and len(batch_tests) < len(tests_to_run):  # read the data-set
+            dataset = load_dataset(db_dir, db_name, use_cache=options.dataset_cache,
+                                   set_id_range=set_id_range)
+            if options.dedup:  # group identical task-sets
+                dataset = deduplicate_dataset(dataset)
+        if batch_tests:  # read the hole data-set as TasksetBatch
+            batch = load_batch(db_dir, db_name, use_cache=options.dataset_cache,
+                               set_id_range=set_id_range)
+
+        # open the verdict cache
+        cache = VerdictCache(db_dir, db_name) if options.cache else None
 
+        # test the data-set with all tests of the fused pass at once
+        fused_results = dict()
+        if fused_tests:
+            if options.stream:  # stream the data-set once for all tests
+                dataset = stream_dataset(db_dir, db_name, use_cache=options.dataset_cache,
+                                         set_id_range=set_id_range)
+                if options.dedup:  # group identical task-sets
+                    dataset = deduplicate_dataset(dataset)
+            fused_results = test_fused(dataset, fused_tests, jobs=options.jobs)
+
+        shard_results = []  # results of the tests of the shard
         for test in tests_todo:  # iterate through the to-do list
-            results = test_dataset(dataset, test)  # perform test
-            logging_config.log_results(test.__name__, results)  # log results
+            if test in finished_results:  # use the results of the checkpoint
+                results = dict(finished_results[test])
+            elif test in batch_tests:  # perform batch variant of the test
+                results = test_batch(batch, BATCH_SA[test])
+            elif test in fused_tests:  # test was done in the fused pass
+                results = fused_results[test]
+            elif options.incremental:  # analyze only the changed task-sets
+                results = test_incremental(db_dir, db_name, test, store, jobs=options.jobs)
+            elif options.pipeline:  # read and test the data-set in a pipeline
+                results = test_pipeline(db_dir, db_name, test, jobs=options.jobs,
+                                        use_cache=options.dataset_cache,
+                                        set_id_range=set_id_range)
+            else:  # perform test
+                if options.stream:  # stream the data-set for each test
+                    dataset = stream_dataset(db_dir, db_name, use_cache=options.dataset_cache,
+                                             set_id_range=set_id_range)
+                    if options.dedup:  # group identical task-sets
+                        dataset = deduplicate_dataset(dataset)
+                if options.cascade and cascade.is_cascaded(test):  # run cheap tests first
+                    results = test_cascade(dataset, test, jobs=options.jobs, cache=cache)
+                else:  # test all task-sets with the test
+                    results = test_dataset(dataset, test, jobs=options.jobs, cache=cache,
+                                           checkpoint=checkpoint)
+            if (options.dedup and not options.incremental and not options.pipeline
+                    and test not in batch_tests and test not in finished_results):
+                # report the effect of the groups, finished tests keep their saved statistics
+                _add_dedup_stats(results, dataset)
+            if checkpoint is not None and test not in finished_results:  # save the results
+                checkpoint.finish(test.__name__, results)
+            if options.shard is not None:  # results are logged after the merge of the shards
+                shard_results.append((test.__name__, results))
+                logger.info("Shard %d of %d: %s finished (tp = %d, fp = %d, tn = %d, fn = %d)",
+                            *options.shard, test.__name__, results['tp'], results['fp'],
+                            results['tn'], results['fn'])
+            else:  # log results
+                logging_config.log_results(test.__name__, results)
+
+        if options.shard is not None:  # save the results of the shard for the merge
+            shard.write_results(db_dir, db_name, *options.shard, set_id_range, summary,
+                                shard_results)
+            logger.info("Results of the shard saved, merge the shards with --merge \n")
 
+        if cache is not None:  # save the new verdicts
+            cache.close()
+        if options.incremental:  # close the result store
+            store.close()
+        if checkpoint is not None:  # analysis is completed
+            checkpoint.remove()
 
-def load_dataset(db_dir, db_name):
+
+def prepare_database(db_dir, db_name):
+    """Prepare the database for the analysis.
+
+    The missing indexes of the database are created and the query plans of the lookups that rely
+    on them are logged.
+
+    Args:
+        db_dir -- directory of the database
+        db_name -- name of the database
+    """
+    logger = logging.getLogger('traditional-SA.main.prepare_database')
+
+    # try to create a Database-object, this creates the missing indexes
+    try:
+        my_database = Database(db_dir=db_dir, db_name=db_name, create_indexes=True)
+    except ValueError as val_err:
+        logger.error("Could not create Database-object: %s", val_err)
+        return
+
+    # log the query plans
+    with my_database:
+        for query_name, query_plan in my_database.explain_query_plans().items():
+            logger.info("Query plan of %s: %s", query_name, "; ".join(query_plan))
+    logger.info("Database prepared!\n")
+
+
+def merge_shards(db_dir, db_name):
+    """Merge the results of the shards of the database and log the results of each test.
+
+    Args:
+        db_dir -- directory of the database
+        db_name -- name of the database
+    """
+    logger = logging.getLogger('traditional-SA.main.merge_shards')
+
+    # read and merge the results files of the shards
+    try:
+        results = shard.merge_results(db_dir, db_name)
+    except ValueError as val_err:
+        logger.error("Could not merge the results of the shards: %s", val_err)
+        return
+
+    logger.info("Merged the results of %d tests \n", len(results))
+    for test_name, result_dict in results:  # log results
+        logging_config.log_results(test_name, result_dict)
+
+
+def load_dataset(db_dir, db_name, use_cache=False, set_id_range=None):
     """Load the dataset from the database.
 
     Args:
         db_dir -- directory of the database
         db_name -- name of the database
+        use_cache -- whether the memory-mapped dataset cache should be used
+        set_id_range -- range of the Set_IDs of the task-sets, None = all task-sets, can't be
+                        combined with the dataset cache
     Return:
         dataset --- list of Taskset-objects
     """
@@ -58,7 +264,8 @@ def load_dataset(db_dir, db_name):
 
     # try to create a Database-object
     try:
-        my_database = Database(db_dir=db_dir, db_name=db_name)
+        my_database = Database(db_dir=db_dir, db_name=db_name, read_only=True,
+                               set_id_range=set_id_range)
     except ValueError as val_err:
         logger.error("Could not create Database-object: %s", val_err)
         return None
@@ -66,7 +273,11 @@ def load_dataset(db_dir, db_name):
     # read the data-set from the database
     logger.info("Reading task-sets from the database...")
     start_time = time.time()
-    dataset = my_database.read_table_taskset()  # read table 'TaskSet'
+    with my_database:  # use one connection for reading all tables
+        if use_cache:  # read the data-set from the dataset cache
+            dataset = DatasetCache(db_dir, db_name).read_dataset(my_database)
+        else:  # read table 'TaskSet'
+            dataset = my_database.read_table_taskset()
     end_time = time.time()
     logger.info("Read %d task-sets from the database.", len(dataset))
     logger.info("Time elapsed: %f \n", end_time - start_time)
@@ -74,41 +285,663 @@ def load_dataset(db_dir, db_name):
     return dataset
 
 
-def test_dataset(dataset, function):
+def load_batch(db_dir, db_name, use_cache=False, set_id_range=None):
+    """Load the dataset from the database as TasksetBatch.
+
+    Args:
+        db_dir -- directory of the database
+        db_name -- name of the database
+        use_cache -- whether the memory-mapped dataset cache should be used
+        set_id_range -- range of the Set_IDs of the task-sets, None = all task-sets, can't be
+                        combined with the dataset cache
+    Return:
+        batch -- TasksetBatch with all task-sets
+    """
+    logger = logging.getLogger('traditional-SA.main.load_batch')
+
+    # try to create a Database-object
+    try:
+        my_database = Database(db_dir=db_dir, db_name=db_name, read_only=True,
+                               set_id_range=set_id_range)
+    except ValueError as val_err:
+        logger.error("Could not create Database-object: %s", val_err)
+        return None
+
+    # read the data-set from the database
+    logger.info("Reading task-sets from the database as batch...")
+    start_time = time.time()
+    with my_database:  # use one connection for reading all tables
+        if use_cache:  # read the data-set from the dataset cache
+            batch = DatasetCache(db_dir, db_name).read_batch(my_database)
+        else:  # read table 'TaskSet'
+            batch = my_database.read_taskset_batch()
+    end_time = time.time()
+    logger.info("Read %d task-sets from the database.", len(batch))
+    logger.info("Time elapsed: %f \n", end_time - start_time)
+
+    return batch
+
+
+def deduplicate_dataset(dataset):
+    """Group the identical task-sets of the data-set.
+
+    Task-sets with the same tasks in the same (priority) order are identical, as they get the same
+    verdict from every schedulability analysis method. Task-sets with the same tasks in different
+    task slots are identical too, because the tasks of a Taskset are sorted according to their
+    priorities. Each group is analyzed once, its verdict is counted for the real result of every
+    member, see _add_taskset_result(). All groups are held in memory, also if the data-set is
+    streamed.
+
+    Args:
+        dataset -- the data-set, a list or an iterable of task-sets
+    Return:
+        groups -- list with the groups (of type TasksetGroup) in order of their first task-set
+    """
+    # create logger
+    logger = logging.getLogger('traditional-SA.main.deduplicate_dataset')
+
+    start_time = time.time()
+
+    groups = dict()  # groups of the task-sets (key = IDs of the tasks in priority order)
+    number_of_tasksets = 0
+    for taskset in dataset:  # iterate over all task-sets
+        group_key = tuple(task.task_id for task in taskset)
+        group = groups.get(group_key)
+        if group is None:  # first task-set of the group
+            group = groups[group_key] = TasksetGroup(taskset)
+        group.labels[taskset.result] += 1
+        number_of_tasksets += 1
+
+    end_time = time.time()
+    logger.info("Grouped %d task-sets into %d groups of identical task-sets (dedup ratio %.2f)",
+                number_of_tasksets, len(groups), number_of_tasksets / max(len(groups), 1))
+    logger.info("Time elapsed: %f \n", end_time - start_time)
+
+    return list(groups.values())
+
+
+def test_batch(batch, function):
+    """Test a batch of task-sets with the batch variant of a schedulability analysis method.
+
+    The batch is tested in chunks of BATCH_CHUNK_SIZE task-sets.
+
+    Args:
+        batch -- the TasksetBatch that should be analyzed
+        function -- the batch variant of the schedulability analysis method
+    Return:
+        result_dict -- dictionary with the result of the schedulability analysis method
+    """
+    start_time = time.time()
+
+    # test all task-sets of each chunk at once
+    verdicts = np.concatenate([function(chunk) for chunk in batch.chunks(BATCH_CHUNK_SIZE)] +
+                              [np.zeros(0, dtype=bool)])
+
+    # compare the verdicts with the real results
+    schedulable = batch.results == 1
+    unschedulable = batch.results == 0
+    result_dict = {'tp': int(np.count_nonzero(verdicts & schedulable)),
+                   'fp': int(np.count_nonzero(verdicts & unschedulable)),
+                   'tn': int(np.count_nonzero(~verdicts & unschedulable)),
+                   'fn': int(np.count_nonzero(~verdicts & schedulable)),
+                   'chunk_times': []}
+
+    end_time = time.time()
+    result_dict['time'] = end_time - start_time
+
+    return result_dict
+
+
+def test_dataset(dataset, function, jobs=1, cache=None, checkpoint=None):
     """Test the data-set with the given schedulability analysis method.
 
+    The data-set can be a list of task-sets or an iterable that yields the task-sets lazily (e.g.
+    stream_dataset()). An iterable is tested in chunks of STREAM_CHUNK_SIZE task-sets, so only a
+    bounded number of task-sets is held in memory.
+    If more than one job is given, the data-set is split into chunks that are tested in parallel
+    by a pool of worker processes. The results of the chunks are merged afterwards.
+    If a verdict cache is given, only the task-sets without a cached verdict are tested, task-sets
+    with identical tasks are tested only once. The new verdicts are added to the cache.
+    If a checkpoint is given, the progress is saved after each chunk and a test that was
+    interrupted continues after the last tested task-set. The data-set must be ordered by the IDs
+    of the task-sets and is tested in chunks of at most STREAM_CHUNK_SIZE task-sets.
+
     Args:
         dataset -- the data-set that should be analyzed
         function -- the schedulability analysis method
+        jobs -- number of worker processes, 1 = test the data-set sequentially
+        cache -- the VerdictCache that should be used, None = don't use a cache
+        checkpoint -- the Checkpoint of the analysis, None = don't save the progress
     Return:
         result_dict -- dictionary with the result of the schedulability analysis method
     """
-    # variables for results of schedulability analysis
-    true_positive, false_positive, true_negative, false_negative = 0, 0, 0, 0
+    # create logger
+    logger = logging.getLogger('traditional-SA.main.test_dataset')
+
+    # create dictionary for the result of the test
+    result_dict = {'tp': 0, 'fp': 0, 'tn': 0, 'fn': 0, 'time': 0, 'chunk_times': []}
+    previous_time = 0  # time elapsed before the test was interrupted
 
-    # test the data-set with the schedulability analysis method
     start_time = time.time()
-    for taskset in dataset:  # iterate over all task-sets
-        schedulability = function(taskset)  # check schedulability of task-set
-        real_result = taskset.result  # real result of the task-set
-
-        # compare test result with real result
-        if schedulability is True and real_result == 1:  # true positive
-            true_positive += 1
-        elif schedulability is True and real_result == 0:  # false positive
-            false_positive += 1
-        elif schedulability is False and real_result == 1:  # false negative
-            false_negative += 1
-        elif schedulability is False and real_result == 0:  # true negative
-            true_negative += 1
+
+    # continue the test from the checkpoint
+    state = checkpoint.get_state(function.__name__) if checkpoint is not None else None
+    if state is not None:
+        for key in ['tp', 'fp', 'tn', 'fn']:
+            result_dict[key] = state[key]
+        result_dict['chunk_times'] = list(state['chunk_times'])
+        previous_time = state['time']
+        dataset = _skip_tested(dataset, state['last_taskset_id'])
+        logger.info("Continuing %s after task-set %d", function.__name__,
+                    state['last_taskset_id'])
+
+    # split the data-set into chunks
+    if isinstance(dataset, list) and jobs > 1:  # chunks for the worker processes
+        chunk_size = max(1, -(-len(dataset) // (jobs * CHUNKS_PER_JOB)))  # round up
+        if checkpoint is not None:  # save the progress at least every STREAM_CHUNK_SIZE
+            chunk_size = min(chunk_size, STREAM_CHUNK_SIZE)
+        chunks = _split_dataset(dataset, chunk_size)
+    elif isinstance(dataset, list) and checkpoint is None:  # test the hole data-set at once
+        chunks = [dataset]
+    else:  # data-set is streamed or progress is saved: chunks of fixed size
+        chunks = _split_dataset(dataset, STREAM_CHUNK_SIZE)
+
+    # filter the task-sets with cached verdicts
+    cache_stats = {'tasksets': 0, 'tested': 0, 'duplicates': collections.Counter()}
+    if cache is not None:
+        chunks = _filter_cached_chunks(chunks, function, cache, result_dict, cache_stats)
+
+    # test the chunks and merge the results of the chunks
+    for chunk, chunk_result in _test_chunks(chunks, jobs, _test_chunk,
+                                            (function, cache is not None)):
+        for key in ['tp', 'fp', 'tn', 'fn']:
+            result_dict[key] += chunk_result[key]
+        result_dict['chunk_times'].append(chunk_result['time'])
+
+        if cache is not None:  # add the new verdicts to the cache
+            for taskset, schedulability in zip(chunk, chunk_result['verdicts']):
+                cache.put(function, taskset, schedulability)
+
+        if checkpoint is not None and chunk:  # save the progress
+            result_dict['time'] = previous_time + time.time() - start_time
+            checkpoint.update(function.__name__, result_dict, chunk[-1].taskset_id)
+
+    if cache is not None:
+        # add the verdicts of the duplicate task-sets to the results
+        for (taskset_key, real_result), number in cache_stats['duplicates'].items():
+            schedulability = cache.get_by_key(function, taskset_key)
+            _add_result(result_dict, schedulability, real_result, number)
+        logger.info("Verdict cache: %d of %d task-sets must be tested",
+                    cache_stats['tested'], cache_stats['tasksets'])
+
+    end_time = time.time()
+    result_dict['time'] = previous_time + end_time - start_time
+
+    return result_dict
+
+
+def test_cascade(dataset, function, jobs=1, cache=None):
+    """Test the data-set in a cascade of cheap tests and the given schedulability analysis method.
+
+    The cheap tests of the cascade decide the task-sets they can decide soundly, only the undecided
+    task-sets are tested with the schedulability analysis method, see cascade.py. The number of
+    decided task-sets and the time of each stage are added to the result.
+
+    Args:
+        dataset -- the data-set that should be analyzed
+        function -- the (exact) schedulability analysis method
+        jobs -- number of worker processes, 1 = test the data-set sequentially
+        cache -- the VerdictCache that should be used, None = don't use a cache
+    Return:
+        result_dict -- dictionary with the result of the schedulability analysis method
+    """
+    start_time = time.time()
+
+    # filter the task-sets that are decided by the stages of the cascade
+    stage_results = {'tp': 0, 'fp': 0, 'tn': 0, 'fn': 0}
+    stages = dict()
+    undecided = cascade.filter_undecided(
+        dataset, function, lambda taskset, schedulability: _add_taskset_result(
+            stage_results, schedulability, taskset), stages)
+    if isinstance(dataset, list):  # keep the undecided task-sets as list for the chunks
+        undecided = list(undecided)
+
+    # test the undecided task-sets
+    result_dict = test_dataset(undecided, function, jobs=jobs, cache=cache)
+    for key in ['tp', 'fp', 'tn', 'fn']:
+        result_dict[key] += stage_results[key]
+    stages[function.__name__] = {
+        'decided': stages[cascade.STAGE_UTILIZATION_REJECT]['undecided'],
+        'undecided': 0, 'time': result_dict['time']}
+
+    end_time = time.time()
+    result_dict['time'] = end_time - start_time
+    result_dict['stages'] = stages  # statistics of the stages are logged with the results
+
+    return result_dict
+
+
+def test_fused(dataset, functions, jobs=1):
+    """Test the data-set with several schedulability analysis methods in a single pass.
+
+    Every task-set is visited only once: its DerivedData is calculated and all methods test it one
+    after another, the methods in DERIVED_SA reuse the derived data. The results and the time of
+    each method are recorded separately, the time for the derived data is logged.
+    The data-set is split into chunks like in test_dataset().
+
+    Args:
+        dataset -- the data-set that should be analyzed
+        functions -- list with the schedulability analysis methods
+        jobs -- number of worker processes, 1 = test the data-set sequentially
+    Return:
+        results -- dictionary with the result of each method (key = method, value = dictionary
+                   with the result of the method like test_dataset())
+    """
+    # create logger
+    logger = logging.getLogger('traditional-SA.main.test_fused')
+
+    # create dictionaries for the results of the tests
+    results = {function: {'tp': 0, 'fp': 0, 'tn': 0, 'fn': 0, 'time': 0, 'chunk_times': []}
+               for function in functions}
+    derived_time = 0
+
+    start_time = time.time()
+
+    # split the data-set into chunks
+    if isinstance(dataset, list) and jobs > 1:  # chunks for the worker processes
+        chunk_size = max(1, -(-len(dataset) // (jobs * CHUNKS_PER_JOB)))  # round up
+        chunks = _split_dataset(dataset, chunk_size)
+    elif isinstance(dataset, list):  # test the hole data-set at once
+        chunks = [dataset]
+    else:  # data-set is streamed: chunks of fixed size
+        chunks = _split_dataset(dataset, STREAM_CHUNK_SIZE)
+
+    # test the chunks and merge the results of the chunks
+    for _, chunk_result in _test_chunks(chunks, jobs, _test_chunk_fused, (functions,)):
+        for function, function_result in zip(functions, chunk_result['results']):
+            for key in ['tp', 'fp', 'tn', 'fn']:
+                results[function][key] += function_result[key]
+            results[function]['time'] += function_result['time']
+            results[function]['chunk_times'].append(function_result['time'])
+        derived_time += chunk_result['derived_time']
+
     end_time = time.time()
+    logger.info("Fused pass of %d tests finished, time elapsed: %f s", len(functions),
+                end_time - start_time)
+    logger.info("Time elapsed for the derived data: %f s \n", derived_time)
+
+    return results
+
+
+def test_incremental(db_dir, db_name, function, store, jobs=1):
+    """Test the changed task-sets of the data-set with the given schedulability analysis method.
+
+    Only the task-sets that contain a task whose execution time changed since the last analysis
+    and the task-sets without a stored verdict are analyzed, see result_store.py. The new verdicts
+    are saved in the result store, the result is calculated from all stored verdicts.
+
+    Args:
+        db_dir -- directory of the database
+        db_name -- name of the database
+        function -- the schedulability analysis method
+        store -- the ResultStore of the database
+        jobs -- number of worker processes, 1 = test the task-sets sequentially
+    Return:
+        result_dict -- dictionary with the result of the schedulability analysis method
+    """
+    # create logger
+    logger = logging.getLogger('traditional-SA.main.test_incremental')
+
+    start_time = time.time()
+
+    # read the changed task-sets
+    my_database = Database(db_dir=db_dir, db_name=db_name, read_only=True)
+    with my_database:  # use one connection for reading all tables
+        store.update_index(my_database)
+        c_dict = my_database.read_table_executiontime()
+        changed_tasks = store.get_changed_tasks(function, c_dict)
+        taskset_ids = store.get_tasksets_to_analyze(function, changed_tasks)
+        dataset = my_database.read_tasksets(taskset_ids)
+    logger.info("Incremental analysis: %d tasks changed, %d task-sets must be analyzed",
+                len(changed_tasks), len(dataset))
+
+    # test the changed task-sets
+    if jobs > 1:  # chunks for the worker processes
+        chunk_size = max(1, -(-len(dataset) // (jobs * CHUNKS_PER_JOB)))  # round up
+        chunks = _split_dataset(dataset, chunk_size)
+    else:  # test the task-sets at once
+        chunks = [dataset]
+    verdicts = []
+    chunk_times = []
+    for chunk, chunk_result in _test_chunks(chunks, jobs, _test_chunk, (function, True)):
+        verdicts.extend((taskset.taskset_id, schedulability, taskset.result)
+                        for taskset, schedulability in zip(chunk, chunk_result['verdicts']))
+        chunk_times.append(chunk_result['time'])
+
+    # save the new verdicts and read the result of all task-sets
+    store.write_results(function, verdicts, c_dict, changed_tasks)
+    result_dict = store.read_results(function)
+    result_dict['chunk_times'] = chunk_times
+
+    end_time = time.time()
+    result_dict['time'] = end_time - start_time
+
+    return result_dict
+
+
+def test_pipeline(db_dir, db_name, function, jobs=1, use_cache=False, set_id_range=None):
+    """Test the data-set with the given schedulability analysis method in a streaming pipeline.
+
+    A reader thread streams chunks of STREAM_CHUNK_SIZE task-sets from the database, the worker
+    threads of the pipeline test them and this thread merges the results of the chunks, see
+    pipeline.py. With more than one job, the chunks are tested in a pool of worker processes
+    (each with its own prefix cache), so reading and testing overlap. The metrics of the stages
+    and queues of the pipeline are logged.
+
+    Args:
+        db_dir -- directory of the database
+        db_name -- name of the database
+        function -- the schedulability analysis method
+        jobs -- number of workers of the pipeline
+        use_cache -- whether the memory-mapped dataset cache should be used
+        set_id_range -- range of the Set_IDs of the task-sets, None = all task-sets, can't be
+                        combined with the dataset cache
+    Return:
+        result_dict -- dictionary with the result of the schedulability analysis method
+    """
+    # create dictionary for the result of the test
+    result_dict = {'tp': 0, 'fp': 0, 'tn': 0, 'fn': 0, 'time': 0, 'chunk_times': []}
+
+    start_time = time.time()
+
+    # create the pipeline, the data-set is read lazily by the reader thread
+    chunks = _split_dataset(stream_dataset(db_dir, db_name, use_cache=use_cache,
+                                           set_id_range=set_id_range), STREAM_CHUNK_SIZE)
+    cache = prefix_cache.PREFIX_CACHE
+    max_nodes = cache.max_nodes if cache is not None else 0
+    analysis_pipeline = pipeline.Pipeline(chunks, _test_chunk, (function,), workers=jobs,
+                                          initializer=prefix_cache.configure,
+                                          initargs=(max_nodes,))
+
+    # merge the results of the chunks
+    for _, chunk_result in analysis_pipeline.run():
+        for key in ['tp', 'fp', 'tn', 'fn']:
+            result_dict[key] += chunk_result[key]
+        result_dict['chunk_times'].append(chunk_result['time'])
+
+    end_time = time.time()
+    result_dict['time'] = end_time - start_time
+    analysis_pipeline.log_metrics(result_dict['time'])
+
+    return result_dict
+
+
+def stream_dataset(db_dir, db_name, batch_size=STREAM_CHUNK_SIZE, use_cache=False,
+                   set_id_range=None):
+    """Stream the dataset from the database.
+
+    In contrast to load_dataset(), the task-sets are read lazily in batches of batch_size rows.
+
+    Args:
+        db_dir -- directory of the database
+        db_name -- name of the database
+        batch_size -- number of rows that are read at once
+        use_cache -- whether the memory-mapped dataset cache should be used
+        set_id_range -- range of the Set_IDs of the task-sets, None = all task-sets, can't be
+                        combined with the dataset cache
+    Yield:
+        taskset -- the next task-set
+    """
+    my_database = Database(db_dir=db_dir, db_name=db_name, read_only=True,
+                           set_id_range=set_id_range)
+    with my_database:  # use one connection for reading all tables
+        if use_cache:  # stream the data-set from the dataset cache
+            tasksets = DatasetCache(db_dir, db_name).iter_tasksets(my_database, batch_size)
+        else:  # stream table 'TaskSet'
+            tasksets = my_database.iter_tasksets(batch_size=batch_size)
+        for taskset in tasksets:
+            yield taskset
+
+
+def _filter_cached_chunks(chunks, function, cache, result_dict, cache_stats):
+    """Filter the task-sets with a cached verdict from the chunks.
+
+    The cached verdicts are added to the result dictionary. Of task-sets with identical tasks only
+    the first one is kept, the other ones are counted as duplicates in cache_stats.
+
+    Args:
+        chunks -- iterable of chunks of the data-set
+        function -- the schedulability analysis method
+        cache -- the VerdictCache
+        result_dict -- dictionary with the result of the schedulability analysis method
+        cache_stats -- dictionary with the number of task-sets, the number of tested task-sets and
+                       the duplicates (key = (task-set key, real result), value = number)
+    Yield:
+        uncached_chunk -- list with the task-sets of the chunk that must be tested
+    """
+    uncached_keys = set()  # keys of the task-sets that are tested
+    for chunk in chunks:  # iterate over all chunks
+        uncached_chunk = []
+        for taskset in chunk:  # iterate over all task-sets
+            taskset_key = get_taskset_key(taskset)
+            schedulability = cache.get_by_key(function, taskset_key)
+            if schedulability is not None:  # add cached verdict to the results
+                _add_taskset_result(result_dict, schedulability, taskset)
+            elif taskset_key in uncached_keys:  # identical task-set is tested
+                for real_result, number in _get_labels(taskset):
+                    cache_stats['duplicates'][(taskset_key, real_result)] += number
+            else:  # no verdict cached: task-set must be tested
+                uncached_keys.add(taskset_key)
+                uncached_chunk.append(taskset)
+            cache_stats['tasksets'] += 1
+        cache_stats['tested'] += len(uncached_chunk)
+
+        yield uncached_chunk
+
 
-    # create dictionary with the result of the test
-    result_dict = {'tp': true_positive, 'fp': false_positive, 'tn': true_negative,
-                   'fn': false_negative, 'time': end_time - start_time}
+def _test_chunks(chunks, jobs, chunk_function, args):
+    """Test chunks of the data-set.
+
+    Each chunk is tested by chunk_function(chunk, *args). If more than one job is given, the
+    chunks are tested in parallel by a pool of worker processes, each with its own prefix cache of
+    the size of the cache of this process. At most jobs * CHUNKS_PER_JOB chunks are submitted to
+    the pool at the same time.
+
+    Args:
+        chunks -- iterable of chunks of the data-set
+        jobs -- number of worker processes, 1 = test the chunks sequentially
+        chunk_function -- function that tests a chunk, e.g. _test_chunk()
+        args -- tuple with the further arguments of chunk_function
+    Yield:
+        chunk -- the tested chunk
+        chunk_result -- the result of chunk_function for the chunk
+    """
+    if jobs > 1:  # test the chunks in parallel
+        cache = prefix_cache.PREFIX_CACHE
+        max_nodes = cache.max_nodes if cache is not None else 0
+        with multiprocessing.Pool(processes=jobs, initializer=prefix_cache.configure,
+                                  initargs=(max_nodes,)) as pool:
+            pending = collections.deque()  # submitted chunks
+            for chunk in chunks:
+                pending.append((chunk, pool.apply_async(chunk_function, (chunk,) + args)))
+                if len(pending) >= jobs * CHUNKS_PER_JOB:  # wait for the oldest chunk
+                    chunk, async_result = pending.popleft()
+                    yield chunk, async_result.get()
+            while pending:  # wait for the remaining chunks
+                chunk, async_result = pending.popleft()
+                yield chunk, async_result.get()
+    else:  # test the chunks sequentially
+        for chunk in chunks:
+            yield chunk, chunk_function(chunk, *args)
+
+
+def _test_chunk(chunk, function, keep_verdicts=False):
+    """Test a chunk of the data-set with the given schedulability analysis method.
+
+    Args:
+        chunk -- list of task-sets that should be analyzed
+        function -- the schedulability analysis method
+        keep_verdicts -- whether the verdicts of the task-sets should be returned
+    Return:
+        result_dict -- dictionary with the result of the schedulability analysis method and the
+                       list of verdicts (if keep_verdicts is True)
+    """
+    # create dictionary for the result of the test
+    result_dict = {'tp': 0, 'fp': 0, 'tn': 0, 'fn': 0, 'verdicts': []}
+
+    # test the chunk with the schedulability analysis method
+    start_time = time.time()
+    for taskset in chunk:  # iterate over all task-sets
+        schedulability = function(taskset)  # check schedulability of task-set
+        _add_taskset_result(result_dict, schedulability, taskset)
+        if keep_verdicts:  # save the verdict
+            result_dict['verdicts'].append(schedulability)
+    end_time = time.time()
+    result_dict['time'] = end_time - start_time
 
     return result_dict
 
 
+def _test_chunk_fused(chunk, functions):
+    """Test a chunk of the data-set with several schedulability analysis methods.
+
+    The DerivedData of each task-set is calculated once and passed to the methods in DERIVED_SA.
+
+    Args:
+        chunk -- list of task-sets that should be analyzed
+        functions -- list with the schedulability analysis methods
+    Return:
+        result_dict -- dictionary with the list of the results of the methods (same order as
+                       functions, each with the counters and the time of the method) and the time
+                       for the derived data
+    """
+    # create dictionary for the results of the tests
+    results = [{'tp': 0, 'fp': 0, 'tn': 0, 'fn': 0, 'time': 0} for _ in functions]
+    uses_derived = [function in DERIVED_SA for function in functions]
+    derived_time = 0
+
+    for taskset in chunk:  # iterate over all task-sets
+        # calculate the derived data of the task-set once
+        start_time = time.perf_counter()
+        derived = DerivedData(taskset)
+        end_time = time.perf_counter()
+        derived_time += end_time - start_time
+
+        # test the task-set with all methods
+        for function, use_derived, result_dict in zip(functions, uses_derived, results):
+            start_time = end_time
+            if use_derived:  # method uses the derived data
+                schedulability = function(taskset, derived=derived)
+            else:
+                schedulability = function(taskset)
+            _add_taskset_result(result_dict, schedulability, taskset)
+            end_time = time.perf_counter()
+            result_dict['time'] += end_time - start_time
+
+    return {'results': results, 'derived_time': derived_time}
+
+
+def _add_taskset_result(result_dict, schedulability, taskset):
+    """Add the result of a schedulability analysis method for a task-set to the result dictionary.
+
+    If the task-set is a TasksetGroup, the result is added for every task-set of the group.
+
+    Args:
+        result_dict -- dictionary with the counters 'tp', 'fp', 'tn' and 'fn'
+        schedulability -- result of the schedulability analysis method
+        taskset -- the analyzed task-set
+    """
+    for real_result, number in _get_labels(taskset):
+        _add_result(result_dict, schedulability, real_result, number)
+
+
+def _get_labels(taskset):
+    """Get the real results of the task-sets represented by a task-set.
+
+    Args:
+        taskset -- a task-set or a TasksetGroup
+    Return:
+        iterable of the real results and the number of task-sets with this result
+    """
+    if isinstance(taskset, TasksetGroup):  # real results of all task-sets of the group
+        return taskset.labels.items()
+
+    return ((taskset.result, 1),)
+
+
+def _add_result(result_dict, schedulability, real_result, number=1):
+    """Add the result of a schedulability analysis method to the result dictionary.
+
+    The result of the schedulability analysis method is compared with the real result of the
+    task-set and the corresponding counter of the result dictionary is incremented.
+
+    Args:
+        result_dict -- dictionary with the counters 'tp', 'fp', 'tn' and 'fn'
+        schedulability -- result of the schedulability analysis method
+        real_result -- real result of the task-set
+        number -- number of task-sets with this result and real result
+    """
+    # compare test result with real result
+    if schedulability is True and real_result == 1:  # true positive
+        result_dict['tp'] += number
+    elif schedulability is True and real_result == 0:  # false positive
+        result_dict['fp'] += number
+    elif schedulability is False and real_result == 1:  # false negative
+        result_dict['fn'] += number
+    elif schedulability is False and real_result == 0:  # true negative
+        result_dict['tn'] += number
+
+
+def _add_dedup_stats(result_dict, groups):
+    """Add the statistics of the deduplication to the result dictionary.
+
+    The time saved is estimated with the average time per group.
+
+    Args:
+        result_dict -- dictionary with the result of the schedulability analysis method
+        groups -- list with the tested groups of identical task-sets, see deduplicate_dataset()
+    """
+    number_of_tasksets = sum(sum(group.labels.values()) for group in groups)
+    time_saved = 0
+    if groups:  # estimate the time for testing the duplicates
+        time_saved = result_dict['time'] / len(groups) * (number_of_tasksets - len(groups))
+
+    result_dict['dedup'] = {'tasksets': number_of_tasksets, 'groups': len(groups),
+                            'time_saved': time_saved}
+
+
+def _skip_tested(dataset, last_taskset_id):
+    """Skip the task-sets that were tested before the test was interrupted.
+
+    Args:
+        dataset -- the data-set ordered by the IDs of the task-sets, a list or an iterable
+        last_taskset_id -- ID of the last tested task-set
+    Return:
+        dataset -- the task-sets with a greater ID, a list if the data-set is a list
+    """
+    if isinstance(dataset, list):  # keep the data-set as list
+        return [taskset for taskset in dataset if taskset.taskset_id > last_taskset_id]
+
+    return (taskset for taskset in dataset if taskset.taskset_id > last_taskset_id)
+
+
+def _split_dataset(dataset, chunk_size):
+    """Split the data-set into chunks.
+
+    The data-set is split into chunks of chunk_size task-sets, the last chunk may be smaller.
+
+    Args:
+        dataset -- the data-set that should be split, a list or an iterable
+        chunk_size -- number of task-sets per chunk
+    Yield:
+        chunk -- list with the task-sets of the next chunk
+    """
+    iterator = iter(dataset)
+    chunk = list(itertools.islice(iterator, chunk_size))
+    while chunk:  # iterate over all chunks
+        yield chunk
+        chunk = list(itertools.islice(iterator, chunk_size))
+
+
 if __name__ == "__main__":
     main()
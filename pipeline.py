@@ -0,0 +1,261 @@
+"""Streaming pipeline for the schedulability analysis.
+
+Reading and analyzing the task-sets overlap in a pipeline of three stages, connected by bounded
+queues, so only a bounded number of chunks is held in memory:
+    reader -- a thread that reads the chunks of the data-set (e.g. from SQLite)
+    workers -- threads that test the chunks, either directly or in a pool of worker processes
+    aggregator -- the calling thread, which merges the results of the chunks
+The throughput and the busy and waiting times of each stage and the depth of the queues are
+measured. A reader that waits for free space in the queue indicates that the analysis (CPU) is the
+bottleneck, workers that wait for chunks indicate that reading (I/O) is the bottleneck.
+"""
+import logging
+import multiprocessing
+import queue
+import threading
+import time
+
+# number of chunks per worker in each queue
+QUEUE_CHUNKS_PER_WORKER = 2
+
+# marker for the end of the data-set
+_DONE = object()
+
+
+class StageMetrics:
+    """Class representing the metrics of a stage of the pipeline.
+
+    The metrics are defined by the following attributes:
+        name -- name of the stage
+        chunks -- number of processed chunks
+        tasksets -- number of processed task-sets
+        busy_time -- time spent processing the chunks in seconds (summed over all threads)
+        wait_time -- time spent waiting for input in seconds (summed over all threads)
+        blocked_time -- time spent waiting for free space in the output queue in seconds
+    """
+
+    __slots__ = ('name', 'chunks', 'tasksets', 'busy_time', 'wait_time', 'blocked_time')
+
+    def __init__(self, name):
+        """Constructor of class StageMetrics."""
+        self.name = name
+        self.chunks = 0
+        self.tasksets = 0
+        self.busy_time = 0
+        self.wait_time = 0
+        self.blocked_time = 0
+
+
+class QueueMetrics:
+    """Class representing the metrics of a queue of the pipeline.
+
+    The depth of the queue is sampled each time a chunk is taken from it. The metrics are defined
+    by the following attributes:
+        name -- name of the queue
+        max_size -- maximal number of chunks in the queue
+        samples -- number of samples
+        total_depth -- sum of the sampled depths
+        max_depth -- greatest sampled depth
+    """
+
+    __slots__ = ('name', 'max_size', 'samples', 'total_depth', 'max_depth')
+
+    def __init__(self, name, max_size):
+        """Constructor of class QueueMetrics."""
+        self.name = name
+        self.max_size = max_size
+        self.samples = 0
+        self.total_depth = 0
+        self.max_depth = 0
+
+    def sample(self, depth):
+        """Add a sample of the depth of the queue.
+
+        Args:
+            depth -- current number of chunks in the queue
+        """
+        self.samples += 1
+        self.total_depth += depth
+        self.max_depth = max(self.max_depth, depth)
+
+
+class Pipeline:
+    """Class representing a pipeline of reader, workers and aggregator.
+
+    The pipeline is defined by the following attributes:
+        chunks -- iterable of chunks (lists of task-sets), it is consumed by the reader thread
+        chunk_function -- function that tests a chunk: chunk_function(chunk, *args)
+        args -- tuple with the further arguments of chunk_function
+        workers -- number of worker threads, with more than one worker the chunks are tested in
+                   a pool of as many worker processes
+        initializer, initargs -- initializer of the worker processes and its arguments
+    Additional attributes of a Pipeline object are:
+        input_queue, output_queue -- the bounded queues between the stages
+        stages -- dictionary with the StageMetrics of the stages (key = name)
+        queues -- dictionary with the QueueMetrics of the queues (key = name)
+        lock -- lock of the metrics of the workers
+        stop_event -- event that stops the reader, set if the pipeline is left or a thread failed
+        errors -- exceptions raised in the threads
+    """
+
+    def __init__(self, chunks, chunk_function, args, workers=1, initializer=None, initargs=()):
+        """Constructor of class Pipeline."""
+        self.chunks = chunks
+        self.chunk_function = chunk_function
+        self.args = args
+        self.workers = workers
+        self.initializer = initializer
+        self.initargs = initargs
+
+        queue_size = workers * QUEUE_CHUNKS_PER_WORKER
+        self.input_queue = queue.Queue(maxsize=queue_size)
+        self.output_queue = queue.Queue(maxsize=queue_size)
+        self.stages = {name: StageMetrics(name) for name in ['reader', 'workers', 'aggregator']}
+        self.queues = {'input': QueueMetrics('input', queue_size),
+                       'output': QueueMetrics('output', queue_size)}
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.errors = []
+
+    def run(self):
+        """Run the pipeline.
+
+        This method is a generator over the results of the chunks in order of their completion.
+        The time between two results is counted as busy time of the aggregator.
+
+        Yield:
+            chunk -- the tested chunk
+            chunk_result -- the result of chunk_function for the chunk
+        """
+        pool = None
+        if self.workers > 1:  # test the chunks in worker processes
+            pool = multiprocessing.Pool(processes=self.workers, initializer=self.initializer,
+                                        initargs=self.initargs)
+        threads = [threading.Thread(target=self._read, name="pipeline-reader", daemon=True)]
+        threads.extend(threading.Thread(target=self._work, args=(pool,),
+                                        name="pipeline-worker-%d" % number, daemon=True)
+                       for number in range(self.workers))
+        for thread in threads:
+            thread.start()
+
+        metrics = self.stages['aggregator']
+        running_workers = self.workers
+        try:
+            while running_workers > 0:  # until all workers are done
+                start_time = time.perf_counter()
+                self.queues['output'].sample(self.output_queue.qsize())
+                item = self.output_queue.get()
+                end_time = time.perf_counter()
+                metrics.wait_time += end_time - start_time
+
+                if item is _DONE:  # a worker is done
+                    running_workers -= 1
+                    continue
+
+                chunk, chunk_result = item
+                yield chunk, chunk_result
+                metrics.busy_time += time.perf_counter() - end_time
+                metrics.chunks += 1
+                metrics.tasksets += len(chunk)
+        finally:  # stop the threads and the pool
+            self.stop_event.set()  # stop the reader if the aggregator is left early
+            self._drain(self.input_queue)
+            self._drain(self.output_queue)
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+
+        if self.errors:  # an exception was raised in a thread
+            raise self.errors[0]
+
+    def log_metrics(self, elapsed_time):
+        """Log the metrics of the stages and queues.
+
+        Args:
+            elapsed_time -- time elapsed for the whole pipeline in seconds
+        """
+        # create logger
+        logger = logging.getLogger('traditional-SA.pipeline.log_metrics')
+
+        for metrics in self.stages.values():  # iterate over all stages
+            logger.info("Stage %s: %d chunks, %d task-sets (%.1f task-sets/s), busy %f s, "
+                        "waiting for input %f s, waiting for output %f s", metrics.name,
+                        metrics.chunks, metrics.tasksets,
+                        metrics.tasksets / elapsed_time if elapsed_time > 0 else 0,
+                        metrics.busy_time, metrics.wait_time, metrics.blocked_time)
+        for metrics in self.queues.values():  # iterate over all queues
+            logger.info("Queue %s: average depth %.2f, maximal depth %d of %d", metrics.name,
+                        metrics.total_depth / metrics.samples if metrics.samples else 0,
+                        metrics.max_depth, metrics.max_size)
+
+    def _read(self):
+        """Read the chunks and put them into the input queue (reader thread)."""
+        metrics = self.stages['reader']
+        try:
+            iterator = iter(self.chunks)
+            while not self.stop_event.is_set():  # stop if the pipeline is left or a thread failed
+                start_time = time.perf_counter()
+                chunk = next(iterator, _DONE)
+                end_time = time.perf_counter()
+                metrics.busy_time += end_time - start_time
+                if chunk is _DONE:  # all chunks are read
+                    break
+
+                self.input_queue.put(chunk)
+                metrics.blocked_time += time.perf_counter() - end_time
+                metrics.chunks += 1
+                metrics.tasksets += len(chunk)
+        except Exception as error:  # pass the exception to the aggregator
+            self.errors.append(error)
+            self.stop_event.set()
+        finally:  # tell all workers that the data-set is done
+            for _ in range(self.workers):
+                self.input_queue.put(_DONE)
+
+    def _work(self, pool):
+        """Test the chunks of the input queue and put the results into the output queue (worker).
+
+        Args:
+            pool -- the pool of worker processes, None = test the chunks in this thread
+        """
+        metrics = self.stages['workers']
+        try:
+            while True:
+                start_time = time.perf_counter()
+                self.queues['input'].sample(self.input_queue.qsize())
+                chunk = self.input_queue.get()
+                wait_end_time = time.perf_counter()
+                if chunk is _DONE:  # no more chunks
+                    break
+
+                if pool is not None:  # test the chunk in a worker process
+                    chunk_result = pool.apply(self.chunk_function, (chunk,) + self.args)
+                else:  # test the chunk in this thread
+                    chunk_result = self.chunk_function(chunk, *self.args)
+                busy_end_time = time.perf_counter()
+
+                self.output_queue.put((chunk, chunk_result))
+                with self.lock:  # update the metrics of all workers
+                    metrics.wait_time += wait_end_time - start_time
+                    metrics.busy_time += busy_end_time - wait_end_time
+                    metrics.blocked_time += time.perf_counter() - busy_end_time
+                    metrics.chunks += 1
+                    metrics.tasksets += len(chunk)
+        except Exception as error:  # pass the exception to the aggregator
+            self.errors.append(error)
+            self.stop_event.set()
+        finally:  # tell the aggregator that this worker is done
+            self.output_queue.put(_DONE)
+
+    @staticmethod
+    def _drain(chunk_queue):
+        """Remove all items from a queue, so blocked threads can finish.
+
+        Args:
+            chunk_queue -- the queue
+        """
+        try:
+            while True:
+                chunk_queue.get_nowait()
+        except queue.Empty:
+            pass
@@ -0,0 +1,178 @@
+"""Trie-structured cache of analysis results of task-set prefixes.
+
+The tasks of a Taskset are sorted according to priorities, so many task-sets share the same first
+tasks. The response time and the workload of a task only depend on the task and its
+higher-priority tasks, i.e. on a prefix of the task-set. The cache stores such results in a trie:
+each node represents a prefix, its children are keyed by the parameters (C, T, D) of the next task.
+The trie is keyed by (C, T, D) only, so a result is only cached if it depends on nothing else:
+the hp-set of a task is built from the priorities and the identities of the tasks, so the RTA and
+the workload test for RM only cache results of prefixes with strictly increasing priorities, see
+get_node().
+The results of the exact tests are stored under a name per node:
+    wcrt_audsley, wcrt_buttazzo -- worst-case response time of the last task of the prefix
+                                   calculated by the RTA according to Audsley/Buttazzo
+    rm_workload -- whether the last task of the prefix passes the workload test for RM
+    het -- workload of the HET for the last task of the prefix and the state of the already
+           computed workload values after the task
+The cache is bounded: if it contains more than max_nodes nodes, the least recently used nodes are
+evicted. A node is always used more recently than its children, so only leafs are evicted.
+Every process has its own cache, see configure(). The cache is only used if a size is configured
+(--prefix_cache_size), by default no cache is used.
+"""
+import collections
+import threading
+
+# default maximal number of nodes in the cache, 0 = no cache
+MAX_NODES = 0
+
+
+class PrefixCache:
+    """Class representing a prefix cache.
+
+    The prefix cache is defined by the following attributes:
+        max_nodes -- maximal number of nodes in the cache
+    Additional attributes of a PrefixCache object are:
+        root -- the node of the empty prefix
+        nodes -- OrderedDict with all nodes except the root in order of their last use
+        hits -- number of results found in the cache
+        misses -- number of results not found in the cache
+        lock -- lock of the trie, the results and the counters, the cache can be used by several
+                threads
+    """
+
+    def __init__(self, max_nodes):
+        """Constructor of class PrefixCache."""
+        self.max_nodes = max_nodes
+        self.root = _TrieNode(None, None)
+        self.nodes = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get_nodes(self, taskset):
+        """Get the nodes of all prefixes of a task-set.
+
+        Missing nodes are created. The nodes are marked as used, the least recently used nodes
+        are evicted if the cache is full.
+
+        Args:
+            taskset -- the task-set
+        Return:
+            path -- list with the nodes of the prefixes: path[i] is the node of taskset[:i + 1]
+        """
+        with self.lock:
+            path = []
+            node = self.root
+            for task in taskset:  # follow the tasks in order of their priorities
+                key = (task.execution_time, task.period, task.deadline)
+                child = node.children.get(key)
+                if child is None:  # prefix not in the cache
+                    child = _TrieNode(node, key)
+                    node.children[key] = child
+                path.append(child)
+                node = child
+
+            # mark the nodes as used, children before their parents
+            for node in reversed(path):
+                self.nodes[node] = None
+                self.nodes.move_to_end(node)
+
+            # evict the least recently used nodes
+            while len(self.nodes) > self.max_nodes:
+                node, _ = self.nodes.popitem(last=False)
+                del node.parent.children[node.key]
+
+        return path
+
+    def get(self, node, name):
+        """Get a result of a prefix.
+
+        Args:
+            node -- the node of the prefix, see get_nodes()
+            name -- name of the result
+        Return:
+            the cached result
+            None -- no result cached
+        """
+        with self.lock:
+            value = node.values.get(name)
+            if value is None:  # cache miss
+                self.misses += 1
+            else:  # cache hit
+                self.hits += 1
+
+        return value
+
+    def put(self, node, name, value):
+        """Add a result of a prefix to the cache.
+
+        Args:
+            node -- the node of the prefix, see get_nodes()
+            name -- name of the result
+            value -- the result
+        """
+        with self.lock:
+            node.values[name] = value
+
+
+class _TrieNode:
+    """Node of the trie of a PrefixCache.
+
+    The node is defined by the following attributes:
+        parent -- the node of the prefix without the last task
+        key -- parameters (C, T, D) of the last task of the prefix
+        children -- dictionary with the nodes of the longer prefixes (key = (C, T, D))
+        values -- dictionary with the results of the prefix (key = name of the result)
+    """
+
+    __slots__ = ('parent', 'key', 'children', 'values')
+
+    def __init__(self, parent, key):
+        """Constructor of class _TrieNode."""
+        self.parent = parent
+        self.key = key
+        self.children = dict()
+        self.values = dict()
+
+
+# cache of the current process, None = no cache used
+PREFIX_CACHE = None
+
+
+def configure(max_nodes=MAX_NODES):
+    """Configure the prefix cache of the current process.
+
+    A new, empty cache is created. The method is also used as initializer of the worker processes.
+
+    Args:
+        max_nodes -- maximal number of nodes in the cache, 0 = don't use a cache
+    """
+    global PREFIX_CACHE
+    PREFIX_CACHE = PrefixCache(max_nodes) if max_nodes > 0 else None
+
+
+def get_node(path, taskset, index):
+    """Get the node of a task whose results can be cached.
+
+    The hp-set of a task is exactly the prefix taskset[:index] only if the priorities of
+    taskset[:index + 2] are strictly increasing. If the next task has the same priority, it
+    belongs to the hp-set too. If two tasks of the prefix have the same priority, they may be the
+    same task (a task-set can contain a task twice), which is excluded from its own hp-set by
+    identity. In both cases the results of the task don't only depend on (C, T, D) of the prefix
+    and are not cached.
+
+    Args:
+        path -- the nodes of the prefixes of the task-set, see PrefixCache.get_nodes()
+        taskset -- the task-set
+        index -- index of the task
+    Return:
+        node -- the node of the prefix taskset[:index + 1]
+        None -- no cache used or the results of the task can't be cached
+    """
+    if path is None:  # no cache used
+        return None
+    for position in range(min(index + 1, len(taskset) - 1)):  # check priorities
+        if taskset[position + 1].priority <= taskset[position].priority:
+            return None
+
+    return path[index]
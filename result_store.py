@@ -0,0 +1,196 @@
+"""Persistent store of the verdicts of all task-sets for the incremental analysis.
+
+The verdict of a task-set only changes if the execution time (Average_C) of one of its tasks
+changes, e.g. if the table ExecutionTime is rewritten by the benchmark. The store keeps the
+verdicts in a SQLite file next to the database with the following tables:
+    Result: Method, Set_ID, Verdict, Label
+    AnalyzedExecutionTime: Method, Task_ID, Average_C
+    TaskSetIndex: Task_ID, Set_ID
+    Summary: Number_Of_Tasksets, Max_Set_ID
+AnalyzedExecutionTime holds the execution times the stored verdicts of a method were computed
+against. TaskSetIndex is a reverse index from the tasks to the task-sets containing them (task-sets
+without tasks have Task_ID -1), it is rebuilt if the summary of the table TaskSet changes. Only the
+task-sets with a changed task or without a stored verdict must be analyzed again.
+"""
+import logging
+import os
+import sqlite3
+
+from database_interface import MAX_QUERY_PARAMETERS
+from verdict_cache import get_method_name
+
+
+class ResultStore:
+    """Class representing a result store.
+
+    The result store is defined by the following attributes:
+        store_path -- path to the store file
+    Additional attributes of a ResultStore object are:
+        db_connection -- connection to the store file
+    """
+
+    def __init__(self, db_dir, db_name):
+        """Constructor of class ResultStore.
+
+        The store file is created in the directory of the database, its name is derived from the
+        name of the database.
+        """
+        db_name = os.path.splitext(db_name)[0]  # remove file extension from the database name
+        self.store_path = os.path.join(db_dir, db_name + "_results.db")
+
+        # open store file and create the tables if they do not exist
+        self.db_connection = sqlite3.connect(self.store_path)
+        self.db_connection.executescript(
+            "CREATE TABLE IF NOT EXISTS Result ("
+            "Method TEXT, Set_ID INTEGER, Verdict INTEGER, Label INTEGER, "
+            "PRIMARY KEY(Method, Set_ID));"
+            "CREATE TABLE IF NOT EXISTS AnalyzedExecutionTime ("
+            "Method TEXT, Task_ID INTEGER, Average_C INTEGER, "
+            "PRIMARY KEY(Method, Task_ID));"
+            "CREATE TABLE IF NOT EXISTS TaskSetIndex (Task_ID INTEGER, Set_ID INTEGER);"
+            "CREATE INDEX IF NOT EXISTS TaskSetIndex_Task_Index ON TaskSetIndex (Task_ID, Set_ID);"
+            "CREATE TABLE IF NOT EXISTS Summary (Number_Of_Tasksets INTEGER, Max_Set_ID INTEGER);")
+
+    def update_index(self, database):
+        """Update the reverse index from the tasks to the task-sets.
+
+        The index is rebuilt if the summary of the table TaskSet changed. Stored verdicts of
+        task-sets that don't exist anymore are deleted.
+
+        Args:
+            database -- the Database-object of the data-set
+        """
+        # create logger
+        logger = logging.getLogger('traditional-SA.result_store.update_index')
+
+        summary = database.get_taskset_summary()
+        if self.db_connection.execute("SELECT * FROM Summary").fetchall() == [summary]:
+            return  # index is up to date
+
+        logger.info("Rebuilding the index of the task-sets...")
+        rows = database.read_table_taskset(convert=False)
+        index_rows = []
+        for row in rows:  # iterate over all task-sets
+            task_ids = set(task_id for task_id in row[2:] if task_id != -1)
+            if not task_ids:  # task-set without tasks
+                task_ids = {-1}
+            index_rows.extend((task_id, row[0]) for task_id in task_ids)
+
+        with self.db_connection:  # replace the index in one transaction
+            self.db_connection.execute("DELETE FROM TaskSetIndex")
+            self.db_connection.executemany(
+                "INSERT INTO TaskSetIndex (Task_ID, Set_ID) VALUES(?, ?)", index_rows)
+            self.db_connection.execute(
+                "DELETE FROM Result WHERE Set_ID NOT IN (SELECT Set_ID FROM TaskSetIndex)")
+            self.db_connection.execute("DELETE FROM Summary")
+            self.db_connection.execute(
+                "INSERT INTO Summary (Number_Of_Tasksets, Max_Set_ID) VALUES(?, ?)", summary)
+        logger.info("Indexed %d task-sets.", len(rows))
+
+    def get_changed_tasks(self, function, c_dict):
+        """Get the tasks whose execution time changed since the analysis with a method.
+
+        Args:
+            function -- the schedulability analysis method
+            c_dict -- dictionary with the current execution times (key = task ID,
+                      value = execution time)
+        Return:
+            changed_tasks -- set with the IDs of the tasks with a new or changed execution time
+        """
+        analyzed = dict(self.db_connection.execute(
+            "SELECT Task_ID, Average_C FROM AnalyzedExecutionTime WHERE Method = ?",
+            (get_method_name(function),)))
+
+        return set(task_id for task_id, execution_time in c_dict.items()
+                   if analyzed.get(task_id) != execution_time)
+
+    def get_tasksets_to_analyze(self, function, changed_tasks):
+        """Get the task-sets that must be analyzed with a method.
+
+        These are the task-sets with a changed task and the task-sets without a stored verdict.
+
+        Args:
+            function -- the schedulability analysis method
+            changed_tasks -- set with the IDs of the changed tasks, see get_changed_tasks()
+        Return:
+            taskset_ids -- set with the IDs of the task-sets
+        """
+        # task-sets that contain a changed task
+        taskset_ids = set()
+        changed_tasks = list(changed_tasks)
+        for start in range(0, len(changed_tasks), MAX_QUERY_PARAMETERS):  # iterate over all parts
+            part = changed_tasks[start:start + MAX_QUERY_PARAMETERS]
+            taskset_ids.update(row[0] for row in self.db_connection.execute(
+                "SELECT Set_ID FROM TaskSetIndex WHERE Task_ID IN (%s)"
+                % ", ".join("?" * len(part)), part))
+
+        # task-sets without a stored verdict
+        taskset_ids.update(row[0] for row in self.db_connection.execute(
+            "SELECT DISTINCT Set_ID FROM TaskSetIndex WHERE Set_ID NOT IN "
+            "(SELECT Set_ID FROM Result WHERE Method = ?)", (get_method_name(function),)))
+
+        return taskset_ids
+
+    def write_results(self, function, verdicts, c_dict, changed_tasks):
+        """Save the verdicts of the analyzed task-sets.
+
+        The verdicts and the execution times of the changed tasks are saved in one transaction,
+        so the stored verdicts always match the stored execution times.
+
+        Args:
+            function -- the schedulability analysis method
+            verdicts -- iterable of (task-set ID, verdict, real result) of the analyzed task-sets
+            c_dict -- dictionary with the current execution times
+            changed_tasks -- set with the IDs of the changed tasks, see get_changed_tasks()
+        """
+        method = get_method_name(function)
+        with self.db_connection:  # save everything in one transaction
+            self.db_connection.executemany(
+                "INSERT OR REPLACE INTO Result (Method, Set_ID, Verdict, Label) "
+                "VALUES(?, ?, ?, ?)",
+                ((method, taskset_id, _convert_verdict(verdict), label)
+                 for taskset_id, verdict, label in verdicts))
+            self.db_connection.executemany(
+                "INSERT OR REPLACE INTO AnalyzedExecutionTime (Method, Task_ID, Average_C) "
+                "VALUES(?, ?, ?)",
+                ((method, task_id, c_dict[task_id]) for task_id in changed_tasks))
+
+    def read_results(self, function):
+        """Read the stored results of a method.
+
+        Args:
+            function -- the schedulability analysis method
+        Return:
+            result_dict -- dictionary with the counters 'tp', 'fp', 'tn' and 'fn'
+        """
+        result_dict = {'tp': 0, 'fp': 0, 'tn': 0, 'fn': 0}
+        keys = {(1, 1): 'tp', (1, 0): 'fp', (0, 0): 'tn', (0, 1): 'fn'}
+
+        rows = self.db_connection.execute(
+            "SELECT Verdict, Label, COUNT(*) FROM Result WHERE Method = ? GROUP BY Verdict, Label",
+            (get_method_name(function),))
+        for verdict, label, number in rows:  # iterate over all combinations
+            if (verdict, label) in keys:  # valid verdict and label
+                result_dict[keys[(verdict, label)]] += number
+
+        return result_dict
+
+    def close(self):
+        """Close the store."""
+        self.db_connection.close()
+        self.db_connection = None
+
+
+def _convert_verdict(verdict):
+    """Convert a verdict for the store.
+
+    Args:
+        verdict -- result of the schedulability analysis method
+    Return:
+        1/0 -- the task-set is schedulable/not schedulable
+        None -- an error occurred
+    """
+    if verdict is True or verdict is False:
+        return int(verdict)
+
+    return None
@@ -4,23 +4,31 @@ Response Time Analysis Methods:
     rta_audsley: RTA with start value according to Audsley.
     rta_buttazzo: RTA with start value according to Buttazzo.
 The methods only differ in the starting value for response time calculation.
+Both methods are also available as batch variant (*_batch) for a TasksetBatch, which iterates the
+response times of all tasks of all task-sets at once.
 """
 import logging
 import math
 
+import numpy as np
+
+import prefix_cache
 from database_interface import Task
 from database_interface import Taskset
+from database_interface import TasksetBatch
 
 
-def rta_audsley(taskset):
+def rta_audsley(taskset, derived=None):
     """Response Time Analysis according to Audsley.
 
     Check the schedulability of a task-set with response time analysis.
     Calculate the response times of all tasks. The task-set is schedulable if and only if for all
     tasks: R_i <= D_i
+    The response times of tasks are reused from the prefix cache, see prefix_cache.py.
 
     Keyword arguments:
         taskset -- the task-set that should be tested
+        derived -- the DerivedData of the task-set, if given its hp-prefixes are used
     Return value:
         True/False -- schedulability of task-set
     """
@@ -28,10 +36,25 @@ def rta_audsley(taskset):
     if not isinstance(taskset, Taskset):  # Invalid input argument
         raise ValueError("taskset must be of type Taskset")
 
+    # Get the nodes of the prefixes of the task-set in the prefix cache
+    cache = prefix_cache.PREFIX_CACHE
+    path = cache.get_nodes(taskset) if cache is not None else None
+
     # Check schedulability of all tasks in the task-set
-    for check_task in taskset:  # Iterate over all tasks
-        # Get response time of task: start with execution time of check_task
-        response_time = _caluclate_response_time(taskset, check_task, check_task.execution_time)
+    for index, check_task in enumerate(taskset):  # Iterate over all tasks
+        # Get response time of task from the prefix cache
+        node = prefix_cache.get_node(path, taskset, index)
+        response_time = cache.get(node, 'wcrt_audsley') if node is not None else None
+
+        if response_time is None:  # response time not cached
+            # Get hp-set of task from the derived data
+            high_prio_set = _get_hp_set(derived, index, check_task)
+
+            # Get response time of task: start with execution time of check_task
+            response_time = _caluclate_response_time(taskset, check_task,
+                                                     check_task.execution_time, high_prio_set)
+            if node is not None:  # save response time in the prefix cache
+                cache.put(node, 'wcrt_audsley', response_time)
 
         # Check schedulability of task
         if response_time > check_task.deadline:
@@ -42,15 +65,17 @@ def rta_audsley(taskset):
     return True
 
 
-def rta_buttazzo(taskset):
+def rta_buttazzo(taskset, derived=None):
     """Response Time Analysis according to Buttazzo.
 
     Check the schedulability of a task-set with response time analysis.
     Calculate the response times of all tasks. The task-set is schedulable if and only if for all
     tasks: R_i <= D_i
+    The response times of tasks are reused from the prefix cache, see prefix_cache.py.
 
     Keyword arguments:
         taskset -- the task-set that should be tested
+        derived -- the DerivedData of the task-set, if given its hp-prefixes are used
     Return value:
         True/False -- schedulability of task-set
     """
@@ -58,13 +83,29 @@ def rta_buttazzo(taskset):
     if not isinstance(taskset, Taskset):  # Invalid input argument
         raise ValueError("taskset must be of type Taskset")
 
-    # Check schedulability of all tasks in the task-set
-    for check_task in taskset:  # Iterate over all tasks
-        # get start value for response time calculation
-        start_value = _get_start_value_buttazzo(taskset, check_task)
+    # Get the nodes of the prefixes of the task-set in the prefix cache
+    cache = prefix_cache.PREFIX_CACHE
+    path = cache.get_nodes(taskset) if cache is not None else None
 
-        # Get response time of task
-        response_time = _caluclate_response_time(taskset, check_task, start_value)
+    # Check schedulability of all tasks in the task-set
+    for index, check_task in enumerate(taskset):  # Iterate over all tasks
+        # Get response time of task from the prefix cache
+        node = prefix_cache.get_node(path, taskset, index)
+        response_time = cache.get(node, 'wcrt_buttazzo') if node is not None else None
+
+        if response_time is None:  # response time not cached
+            # get start value for response time calculation and hp-set of task
+            if derived is not None:  # prefix sums are shared with other analysis methods
+                start_value = derived.get_hp_execution_time(index)
+            else:
+                start_value = _get_start_value_buttazzo(taskset, check_task)
+            high_prio_set = _get_hp_set(derived, index, check_task)
+
+            # Get response time of task
+            response_time = _caluclate_response_time(taskset, check_task, start_value,
+                                                     high_prio_set)
+            if node is not None:  # save response time in the prefix cache
+                cache.put(node, 'wcrt_buttazzo', response_time)
 
         # Check schedulability of task
         if response_time > check_task.deadline:
@@ -101,7 +142,7 @@ def _get_start_value_buttazzo(taskset, check_task):
     return start_value
 
 
-def _caluclate_response_time(taskset, check_task, start_value):
+def _caluclate_response_time(taskset, check_task, start_value, high_prio_set=None):
     """Calculate the response time of a task.
 
     The response time of a task i is calculated through the iterative formula:
@@ -114,6 +155,7 @@ def _caluclate_response_time(taskset, check_task, start_value):
         taskset -- the task-set that should be checked
         check_task -- the task for which the response time should be calculated
         start_value -- the start value for the calculation (= response time 0)
+        high_prio_set -- the hp-set of check_task, None = create the hp-set
     Return value:
         r_new -- response time of check_task
     """
@@ -129,7 +171,8 @@ def _caluclate_response_time(taskset, check_task, start_value):
     logger.debug("TASK %s", str(check_task.task_id))
 
     # Create task-set with all task of higher or same priority as check_task = hp(i)
-    high_prio_set = _create_hp_set(taskset, check_task)
+    if high_prio_set is None:
+        high_prio_set = _create_hp_set(taskset, check_task)
     logger.debug("hp-set = %s", str(high_prio_set))
 
     logger.debug("R0 = %s", str(start_value))
@@ -187,3 +230,153 @@ def _create_hp_set(taskset, check_task):
 
     # return hp-set
     return high_prio_set
+
+
+def _get_hp_set(derived, index, check_task):
+    """Get the HP-set of a task from the derived data of the task-set.
+
+    The hp-set contains all tasks of the hp-prefix of the task except the task itself, like
+    _create_hp_set().
+
+    Args:
+        derived -- the DerivedData of the task-set, None = no derived data available
+        index -- index of check_task in the task-set
+        check_task -- the task, for which the hp-set should be created
+    Return:
+        high_prio_set -- list with higher- and same-priority tasks
+        None -- no derived data available, the hp-set must be created
+    """
+    if derived is None:
+        return None
+
+    return [task for task in derived.get_hp_tasks(index) if task is not check_task]
+
+
+def rta_audsley_batch(batch, wcrt=False):
+    """Response Time Analysis according to Audsley for a batch of task-sets.
+
+    Batch variant of rta_audsley(): the response times of all tasks start with their execution
+    time. A task-set is schedulable if and only if for all tasks: R_i <= D_i
+
+    Keyword arguments:
+        batch -- the TasksetBatch that should be tested
+        wcrt -- whether the response times of the tasks should be returned
+    Return value:
+        verdicts -- boolean array with the schedulability of the task-sets
+        response_times -- array with the response times of the tasks, shape (N, K), see
+                          _calculate_response_times_batch() (only if wcrt is True)
+    """
+    # Check input argument: must be a TasksetBatch
+    if not isinstance(batch, TasksetBatch):  # Invalid input argument
+        raise ValueError("batch must be of type TasksetBatch")
+
+    # Get response times of all tasks: start with execution times
+    response_times = _calculate_response_times_batch(batch, batch.execution_time)
+
+    return _get_verdicts_batch(batch, response_times, wcrt)
+
+
+def rta_buttazzo_batch(batch, wcrt=False):
+    """Response Time Analysis according to Buttazzo for a batch of task-sets.
+
+    Batch variant of rta_buttazzo(): the response time of a task starts with the sum of execution
+    times of all tasks with higher or same priority. A task-set is schedulable if and only if for
+    all tasks: R_i <= D_i
+
+    Keyword arguments:
+        batch -- the TasksetBatch that should be tested
+        wcrt -- whether the response times of the tasks should be returned
+    Return value:
+        verdicts -- boolean array with the schedulability of the task-sets
+        response_times -- array with the response times of the tasks, shape (N, K), see
+                          _calculate_response_times_batch() (only if wcrt is True)
+    """
+    # Check input argument: must be a TasksetBatch
+    if not isinstance(batch, TasksetBatch):  # Invalid input argument
+        raise ValueError("batch must be of type TasksetBatch")
+
+    # Get start values: sum of execution times of all tasks with higher or same priority
+    same_or_higher = batch.mask[:, None, :] & \
+        (batch.priority[:, None, :] <= batch.priority[:, :, None])
+    start_values = np.sum(same_or_higher * batch.execution_time[:, None, :], axis=2)
+
+    # Get response times of all tasks
+    response_times = _calculate_response_times_batch(batch, start_values)
+
+    return _get_verdicts_batch(batch, response_times, wcrt)
+
+
+def _get_verdicts_batch(batch, response_times, wcrt):
+    """Get the verdicts of a batch of task-sets from the response times of the tasks.
+
+    Keyword arguments:
+        batch -- the TasksetBatch that was tested
+        response_times -- array with the response times of the tasks, shape (N, K)
+        wcrt -- whether the response times of the tasks should be returned
+    Return value:
+        verdicts -- boolean array with the schedulability of the task-sets
+        response_times -- the response times of the tasks (only if wcrt is True)
+    """
+    # A task-set is schedulable if no valid task misses its deadline
+    verdicts = ~np.any(batch.mask & (response_times > batch.deadline), axis=1)
+
+    if wcrt:  # return the response times as well
+        return verdicts, response_times
+
+    return verdicts
+
+
+def _calculate_response_times_batch(batch, start_values):
+    """Calculate the response times of all tasks of a batch of task-sets.
+
+    Batch variant of _caluclate_response_time(): each task of each task-set is a lane of the
+    iteration
+    start:  R_0 = start_value
+    iteration:  R_(k+1) = C_i + sum( R_k / T_j * C_j)
+    stop:   R_(k+1) = R_k = R or R_(k+1) > D_i
+    The sums over j are over hp(i), i.e. all other tasks with higher or same priority than i.
+    Only the lanes that neither converged nor exceeded their deadline are iterated further. Like
+    in _caluclate_response_time(), the start value is returned for tasks with an empty hp-set or
+    a start value of 0 and the first response time greater than the deadline for tasks that miss
+    their deadline.
+
+    Keyword arguments:
+        batch -- the TasksetBatch
+        start_values -- the start values of the tasks, shape (N, K)
+    Return value:
+        response_times -- array with the response times of the tasks, shape (N, K), 0 for invalid
+                          task slots
+    """
+    number_of_slots = batch.mask.shape[1]
+
+    # hp(i) of each lane: valid tasks with higher or same priority, without task i itself
+    high_prio = batch.mask[:, None, :] & batch.mask[:, :, None] & \
+        (batch.priority[:, None, :] <= batch.priority[:, :, None]) & \
+        (batch.task_ids[:, None, :] != batch.task_ids[:, :, None])
+
+    # flatten the lanes: one row per task of each task-set
+    hp_execution_times = (high_prio * batch.execution_time[:, None, :]) \
+        .reshape(-1, number_of_slots)
+    hp_periods = np.broadcast_to(batch.period[:, None, :], high_prio.shape) \
+        .reshape(-1, number_of_slots)
+    execution_times = batch.execution_time.reshape(-1)
+    deadlines = batch.deadline.reshape(-1)
+    response_times = np.where(batch.mask, start_values, 0).astype(np.int64).reshape(-1)
+
+    # lanes that are iterated: valid tasks with a non-empty hp-set and a start value != 0
+    active = np.flatnonzero(batch.mask.reshape(-1) & np.any(high_prio, axis=2).reshape(-1) &
+                            (response_times != 0))
+
+    while active.size:  # while at least one response time changes
+        r_old = response_times[active]
+
+        # calculate response times of this iteration
+        interference = np.ceil(r_old[:, None] / hp_periods[active]).astype(np.int64) * \
+            hp_execution_times[active]
+        r_new = execution_times[active] + np.sum(interference, axis=1)
+        response_times[active] = r_new
+
+        # stop lanes that converged or missed their deadline
+        active = active[(r_new != r_old) & (r_new <= deadlines[active])]
+
+    return response_times.reshape(batch.mask.shape)
@@ -0,0 +1,158 @@
+"""Sharded execution of the schedulability analysis.
+
+The task-sets of a database can be analyzed by several independent processes, e.g. on several
+nodes or containers that share only the file system. Shard i of N (--shard i/N) analyzes the i-th
+of N ranges of Set_IDs of the table TaskSet with its own read-only connection, see
+Database.get_shard_range(). Each shard writes its results to a JSON file next to the database
+(*_shard_i_of_N.json). The merge (--merge) combines the files of all N shards into the final
+results, which are logged like the results of an analysis of the whole data-set.
+"""
+import json
+import os
+import re
+
+# version of the format of the shard files, increase to invalidate all shard files
+SHARD_VERSION = 1
+
+
+def get_suffix(shard, shards):
+    """Get the suffix of the names of the files of a shard.
+
+    Args:
+        shard -- number of the shard
+        shards -- number of shards
+    Return:
+        suffix -- suffix of the file names, e.g. "_shard_1_of_4"
+    """
+    return "_shard_%d_of_%d" % (shard, shards)
+
+
+def get_shard_path(db_dir, db_name, shard, shards):
+    """Get the path to the results file of a shard.
+
+    Args:
+        db_dir -- directory of the database
+        db_name -- name of the database
+        shard -- number of the shard
+        shards -- number of shards
+    Return:
+        shard_path -- path to the results file
+    """
+    db_name = os.path.splitext(db_name)[0]  # remove file extension from the database name
+    return os.path.join(db_dir, db_name + get_suffix(shard, shards) + ".json")
+
+
+def write_results(db_dir, db_name, shard, shards, set_id_range, summary, results):
+    """Write the results of a shard.
+
+    The file is written to a temporary file first, so the merge never reads an incomplete file.
+
+    Args:
+        db_dir -- directory of the database
+        db_name -- name of the database
+        shard -- number of the shard
+        shards -- number of shards
+        set_id_range -- range (first Set_ID, last Set_ID) of the shard
+        summary -- summary of the table TaskSet, see Database.get_taskset_summary()
+        results -- list with the name and the result dictionary of each test
+    """
+    shard_path = get_shard_path(db_dir, db_name, shard, shards)
+    temporary_path = shard_path + ".tmp"
+    with open(temporary_path, 'w') as shard_file:
+        json.dump({'key': {'version': SHARD_VERSION, 'summary': list(summary), 'shards': shards},
+                   'shard': shard, 'set_id_range': list(set_id_range),
+                   'tests': [[test_name, _get_partial_result(result_dict)]
+                             for test_name, result_dict in results]}, shard_file)
+    os.replace(temporary_path, shard_path)
+
+
+def merge_results(db_dir, db_name):
+    """Merge the results of all shards of a database.
+
+    All shards must have been run with the same number of shards, the same tests and the same
+    table TaskSet. The counters, the chunk times and the statistics of the stages and of the
+    deduplication are summed, the time of a test is the time of its slowest shard (the shards
+    run in parallel).
+
+    Args:
+        db_dir -- directory of the database
+        db_name -- name of the database
+    Return:
+        results -- list with the name and the merged result dictionary of each test
+    """
+    # read the files of all shards
+    db_name = os.path.splitext(db_name)[0]  # remove file extension from the database name
+    shard_pattern = re.compile(re.escape(db_name) + r"_shard_\d+_of_\d+\.json")
+    shard_files = dict()
+    for file_name in sorted(os.listdir(db_dir or os.curdir)):  # iterate over all files
+        if shard_pattern.fullmatch(file_name):  # results file of a shard
+            with open(os.path.join(db_dir, file_name)) as shard_file:
+                shard_data = json.load(shard_file)
+            if shard_data['shard'] in shard_files:  # files of several numbers of shards
+                raise ValueError("the results of shard %d were found twice, remove the "
+                                 "outdated shard files" % shard_data['shard'])
+            shard_files[shard_data['shard']] = shard_data
+    if not shard_files:  # no shard was run
+        raise ValueError("no results of shards found for " + db_name)
+
+    # check that the shards belong to the same analysis
+    keys = [shard_data['key'] for shard_data in shard_files.values()]
+    if any(key != keys[0] for key in keys):  # shards of different analyses
+        raise ValueError("the shards were run with a different number of shards or on different "
+                         "versions of the database, remove the outdated shard files")
+    missing_shards = sorted(set(range(1, keys[0]['shards'] + 1)) - set(shard_files))
+    if missing_shards:  # not all shards are finished
+        raise ValueError("the results of %d of %d shards are missing (shards %s)"
+                         % (len(missing_shards), keys[0]['shards'],
+                            ", ".join(str(number) for number in missing_shards[:10]) +
+                            (", ..." if len(missing_shards) > 10 else "")))
+    test_names = [[test_name for test_name, _ in shard_data['tests']]
+                  for shard_data in shard_files.values()]
+    if any(names != test_names[0] for names in test_names):  # different tests
+        raise ValueError("the shards were run with different tests")
+
+    # merge the results of each test
+    return [(test_name, _merge_result([shard_files[shard]['tests'][index][1]
+                                       for shard in sorted(shard_files)]))
+            for index, test_name in enumerate(test_names[0])]
+
+
+def _get_partial_result(result_dict):
+    """Get the part of the result dictionary of a test that is written to the shard file.
+
+    Args:
+        result_dict -- dictionary with the result of the test
+    Return:
+        partial_result -- dictionary with the counters, the times and the optional statistics
+    """
+    keys = ['tp', 'fp', 'tn', 'fn', 'time', 'chunk_times', 'stages', 'dedup']
+    return {key: result_dict[key] for key in keys if key in result_dict}
+
+
+def _merge_result(partial_results):
+    """Merge the results of a test in all shards.
+
+    Args:
+        partial_results -- list with the result dictionaries of the shards
+    Return:
+        result_dict -- dictionary with the merged result
+    """
+    result_dict = {key: sum(partial_result[key] for partial_result in partial_results)
+                   for key in ['tp', 'fp', 'tn', 'fn']}
+    result_dict['time'] = max(partial_result['time'] for partial_result in partial_results)
+    result_dict['chunk_times'] = [chunk_time for partial_result in partial_results
+                                  for chunk_time in partial_result.get('chunk_times', [])]
+
+    for partial_result in partial_results:  # sum the optional statistics
+        for stage, stage_results in partial_result.get('stages', dict()).items():  # cascade
+            merged_stage = result_dict.setdefault('stages', dict()).setdefault(
+                stage, {'decided': 0, 'undecided': 0, 'time': 0})
+            for key in merged_stage:
+                merged_stage[key] += stage_results[key]
+        if 'dedup' in partial_result:  # deduplication
+            merged_dedup = result_dict.setdefault(
+                'dedup', {'tasksets': 0, 'groups': 0, 'time_saved': 0})
+            for key in merged_dedup:
+                merged_dedup[key] += partial_result['dedup'][key]
+
+    return result_dict
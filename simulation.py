@@ -1,23 +1,50 @@
 """Simulation of a task"""
 
+import heapq
 import logging
 from functools import reduce
 
-from simso.configuration import Configuration
-from simso.core import Model
-
 from database_interface import Taskset
 
+# simulation backends
+BACKEND_NATIVE = "native"  # built-in event-driven simulator
+BACKEND_SIMSO = "simso"  # simulation with SimSo
+BACKEND_SIMSO_PREPARED = "simso_prepared"  # simulation with SimSo, reused configuration
+VALID_BACKENDS = [BACKEND_NATIVE, BACKEND_SIMSO, BACKEND_SIMSO_PREPARED]
+
+# priority value of tasks that are scheduled according to EDF, see fp_edf_scheduler
+EDF_PRIORITY = 127
+
+# types of simulation horizons
+HORIZON_HYPERPERIOD = "hyperperiod"  # simulation until the end of the hyperperiod
+HORIZON_BUSY_PERIOD = "busy period"  # simulation until the end of the first busy period
+HORIZON_LAST_JOB = "last job"  # simulation until the termination of the last job
+
 
-def simulate(taskset):
+def simulate(taskset, backend=BACKEND_NATIVE, stats=None, derived=None):
     """Simulation.
 
     This method executes the simulation of a task-set. The simulation is run over the hyperperiod,
     which is the least common mean of all task periods. The task-set is schedulable if all jobs of
-    all tasks in the hyperperiod can meet their deadlines.
+    all tasks in the hyperperiod can meet their deadlines. As all tasks are activated at t = 0, the
+    simulation is stopped early at the end of the first busy period if the FP priorities of the
+    tasks are distinct, see _get_horizon().
+    Two simulation backends are available:
+        native -- built-in event-driven simulator (default)
+        simso -- simulation with the framework SimSo, used as reference
+        simso_prepared -- simulation with SimSo, the configuration is prepared once and reused
 
     Args:
         taskset - the task-set that should be analyzed
+        backend - the simulation backend that should be used, one of VALID_BACKENDS
+        stats - dictionary, if given it is filled with information about the simulation:
+            hyperperiod - the hyperperiod of the task-set
+            horizon - the length of the simulation
+            horizon_type - the type of the horizon (HORIZON_HYPERPERIOD, HORIZON_BUSY_PERIOD or
+                           HORIZON_LAST_JOB)
+            stop_time - the simulated time at which the simulation stopped, i.e. the time of the
+                        first deadline miss or the end of the simulation
+        derived - the DerivedData of the task-set, if given its hyperperiod is used
     Return:
         True - the task-set is schedulable
         False - the task-set is not schedulable
@@ -30,63 +57,371 @@ def simulate(taskset):
     if taskset is None or not isinstance(taskset, Taskset):
         logger.error("Invalid input argument or no task-set given!")
         return -1
+    if backend not in VALID_BACKENDS:
+        logger.error("Invalid simulation backend: %s", backend)
+        return -1
 
-    # Manual configuration: the configuration class stores all the details about a system
-    configuration = Configuration()
+    # Calculate the hyperperiod of the tasks
+    if derived is not None:  # hyperperiod is shared with other analysis methods
+        hyper_period = derived.get_hyperperiod()
+    else:
+        hyper_period = get_hyperperiod(taskset)
+    logger.debug("simulation.py/simulate(): Hyperperiod H = %d", hyper_period)
 
-    # Get the periods of the tasks
-    periods = []
+    # Calculate the length of the simulation
+    horizon, horizon_type = _get_horizon(taskset, hyper_period)
+    logger.debug("simulation.py/simulate(): Horizon = %d (%s)", horizon, horizon_type)
+    if stats is not None:  # report the horizon of the simulation
+        stats['hyperperiod'] = hyper_period
+        stats['horizon'] = horizon
+        stats['horizon_type'] = horizon_type
+
+    if backend == BACKEND_SIMSO:  # simulate with SimSo
+        schedulability, stop_time = _simulate_simso(taskset, horizon)
+    elif backend == BACKEND_SIMSO_PREPARED:  # simulate with SimSo and a prepared configuration
+        schedulability, stop_time = _simulate_simso(taskset, horizon, prepared=True)
+    else:  # simulate with the native simulator
+        schedulability, stop_time = _simulate_native(taskset, horizon)
+
+    logger.debug("simulation.py/simulate(): Simulation stopped at %f", stop_time)
+    if stats is not None:  # report the end of the simulation
+        stats['stop_time'] = stop_time
+
+    return schedulability
+
+
+def simulate_simso(taskset, derived=None):
+    """Simulation with SimSo.
+
+    This method executes the simulation of a task-set with the SimSo backend. It is the reference
+    for the native simulator, see simulate(). The prepared SimSo configuration is used, so the
+    fixed cost of setting up SimSo is only paid once per process.
+
+    Args:
+        taskset - the task-set that should be analyzed
+        derived - the DerivedData of the task-set, if given its hyperperiod is used
+    Return:
+        True - the task-set is schedulable
+        False - the task-set is not schedulable
+        -1 - an error occured
+    """
+    return simulate(taskset, backend=BACKEND_SIMSO_PREPARED, derived=derived)
+
+
+def _simulate_native(taskset, horizon):
+    """Simulate a task-set with the native simulator.
+
+    The native simulator is an event-driven simulator with the same scheduling policy as
+    fp_edf_scheduler: jobs with a priority from 0 ... 126 are scheduled according to the fixed
+    priority (FP) algorithm, all jobs with priority 127 are scheduled according to the earliest
+    deadline first (EDF) algorithm. Jobs with the same priority (or the same deadline) are
+    scheduled in order of their activation. Instead of simulating every time unit, the simulator
+    jumps from event to event, i.e. to the next activation, to the termination of the running job
+    or to the next deadline of an unfinished job. The simulation is stopped at the first deadline
+    miss.
+    As with SimSo, the simulation ends at the horizon: only jobs with a deadline less than or equal
+    to the horizon are checked for deadline misses.
+
+    Args:
+        taskset - the task-set that should be simulated
+        horizon - the length of the simulation
+    Return:
+        True - the task-set is schedulable
+        False - the task-set is not schedulable
+        -1 - an error occured
+        stop_time - the simulated time at which the simulation stopped
+    """
+    # create logger
+    logger = logging.getLogger('traditional-SA.simulation._simulate_native')
+
+    # Get all activations of all tasks: list of (activation date, task)
+    activations = []
     for task in taskset:
-        if task.period not in periods:
-            periods.append(task.period)
+        # Check priority of the task
+        if not 0 <= task.priority <= EDF_PRIORITY:  # not a valid priority value
+            logger.error("%d is not a valid priority value!", task.priority)
+            return -1, 0
+
+        for activation_date in _get_activation_dates(horizon, task.period, task.number_of_jobs):
+            activations.append((activation_date, task))
+    activations.sort(key=lambda activation: activation[0])  # sort by activation date (stable)
+
+    # ready jobs as heap: (priority, absolute deadline for EDF, activation number, job)
+    # a job is a list [remaining execution time, absolute deadline]
+    ready_heap = []
+
+    # deadlines of the ready jobs as heap: (absolute deadline, activation number, job)
+    # terminated jobs are discarded when they reach the top of the heap
+    deadline_heap = []
+
+    time = 0  # current simulation time
+    next_activation = 0  # index of the next activation
+    while next_activation < len(activations) or ready_heap:
+        if not ready_heap:  # no job is ready: processor is idle until the next activation
+            time = max(time, activations[next_activation][0])
+
+        # Activate all jobs with an activation date until the current time
+        while next_activation < len(activations) and activations[next_activation][0] <= time:
+            activation_date, task = activations[next_activation]
+            absolute_deadline = activation_date + task.deadline
+            if task.priority == EDF_PRIORITY:  # schedule according to EDF
+                key = (task.priority, absolute_deadline)
+            else:  # schedule according to FP
+                key = (task.priority, 0)
+            job = [task.execution_time, absolute_deadline]
+            heapq.heappush(ready_heap, key + (next_activation, job))
+            heapq.heappush(deadline_heap, (absolute_deadline, next_activation, job))
+            next_activation += 1
+
+        # Discard terminated jobs from the deadline heap
+        while deadline_heap and deadline_heap[0][-1][0] == 0:
+            heapq.heappop(deadline_heap)
+
+        # The job with the highest priority runs until it terminates or the next job is activated
+        job = ready_heap[0][-1]
+        end_date = time + job[0]
+        if next_activation < len(activations) and activations[next_activation][0] < end_date:
+            next_date = activations[next_activation][0]  # job is preempted
+        else:
+            next_date = end_date  # job terminates
+
+        # No job can run before the running job terminates: if the next deadline is reached
+        # before, the job with this deadline misses it
+        if deadline_heap and deadline_heap[0][0] < end_date and deadline_heap[0][0] <= horizon \
+                and deadline_heap[0][0] <= next_date:
+            logger.debug("simulation.py/_simulate_native(): Deadline miss at %d",
+                         deadline_heap[0][0])
+            return False, deadline_heap[0][0]
+
+        if next_date < end_date:  # job is preempted by the next activation
+            job[0] -= next_date - time
+            time = next_date
+        elif end_date > horizon:  # simulation ends before the job terminates
+            return True, horizon
+        else:  # job terminates
+            heapq.heappop(ready_heap)
+            job[0] = 0
+            time = end_date
+
+    return True, time
+
+
+def _simulate_simso(taskset, horizon, prepared=False):
+    """Simulate a task-set with SimSo.
+
+    A SimSo configuration is created for the task-set and simulated with the custom scheduler
+    fp_edf_scheduler. The results of the simulation are checked for aborted jobs.
+    The scheduler stops the simulation as soon as a job is aborted, i.e. misses its deadline.
+    In prepared mode the configuration is not created from scratch: the prepared configuration of
+    the _SimsoTemplate is reused, only the tasks are replaced. The configuration is only checked
+    if the task-set is not well-formed, see _is_well_formed().
 
-    # Calculate the hyperperiod of the tasks
-    hyper_period = _lcm(periods)
-    logger.debug("simulation.py/simulate(): Hyperperiod H = %d", hyper_period)
+    Args:
+        taskset - the task-set that should be simulated
+        horizon - the length of the simulation
+        prepared - whether the prepared configuration should be used
+    Return:
+        True - the task-set is schedulable
+        False - the task-set is not schedulable
+        stop_time - the simulated time at which the simulation stopped
+    """
+    # import SimSo only if needed, the native simulator doesn't depend on it
+    from simso.core import Model
 
-    # Define the length of simulation (= H)
-    configuration.duration = hyper_period * configuration.cycles_per_ms
+    # create logger
+    logger = logging.getLogger('traditional-SA.simulation._simulate_simso')
 
-    # Add a property 'priority' to the task data fields
-    configuration.task_data_fields['priority'] = 'int'  # 'priority' is of type int
+    if prepared:  # reuse the prepared configuration
+        configuration = _get_simso_template().configuration
+        del configuration.task_info_list[:]  # remove the tasks of the last task-set
+    else:  # create a new configuration
+        configuration = _create_simso_configuration()
+
+    # Define the length of simulation (= horizon)
+    configuration.duration = horizon * configuration.cycles_per_ms
 
     # Add the tasks to the list of tasks
     i = 1
     for task in taskset:
         task_name = "T" + str(task.task_id)
-        activation_dates = _get_activation_dates(hyper_period, task.period, task.number_of_jobs)
+        activation_dates = _get_activation_dates(horizon, task.period, task.number_of_jobs)
         configuration.add_task(name=task_name, identifier=i, task_type="Sporadic",
                                period=task.period, activation_date=0, wcet=task.execution_time,
                                deadline=task.deadline, list_activation_dates=activation_dates,
                                data={'priority': task.priority})
         i += 1
 
-    # Add a processor to the list of processors
-    configuration.add_processor(name="CPU1", identifier=1)
-
-    # Add a scheduler:
-    configuration.scheduler_info.filename = "fp_edf_scheduler.py"  # use a custom scheduler
-
     # Check the correctness of the configuration (without simulating it) before trying to run it
-    configuration.check_all()
+    if not prepared or not _is_well_formed(taskset):
+        configuration.check_all()
 
     # Init a model from the configuration
     model = Model(configuration)
 
-    # Execute the simulation
+    # Execute the simulation: is stopped by the scheduler at the first deadline miss
     model.run_model()
+    stop_time = model.now() / configuration.cycles_per_ms
+
+    # SimSo creates no results if the simulation ends at t = 0, i.e. the horizon is 0: no job
+    # needs processor time, so no deadline can be missed
+    if model.results is None:
+        return True, stop_time
 
     # Schedulability analysis: check for deadline miss of each job of every task
     for task in model.results.tasks:
         # print(task.name + ":")
         for job in task.jobs:
             if job.aborted:  # deadline miss
-                logger.debug("simulation.py/simulate(): {0:s} Deadline miss".format(job.name))
-                return False
+                logger.debug("simulation.py/_simulate_simso(): %s Deadline miss", job.name)
+                return False, stop_time
+
+    return True, stop_time
+
+
+def _create_simso_configuration():
+    """Create a SimSo configuration without tasks.
+
+    The configuration contains the processor and the custom scheduler fp_edf_scheduler, which is
+    loaded by SimSo from the file fp_edf_scheduler.py.
+
+    Return:
+        configuration - the SimSo configuration
+    """
+    from simso.configuration import Configuration
+
+    # Manual configuration: the configuration class stores all the details about a system
+    configuration = Configuration()
+
+    # Add a property 'priority' to the task data fields
+    configuration.task_data_fields['priority'] = 'int'  # 'priority' is of type int
+
+    # Add a processor to the list of processors
+    configuration.add_processor(name="CPU1", identifier=1)
+
+    # Add a scheduler:
+    configuration.scheduler_info.filename = "fp_edf_scheduler.py"  # use a custom scheduler
+
+    return configuration
+
+
+class _SimsoTemplate:
+    """Prepared SimSo configuration.
+
+    The template is created once per process and reused for all task-sets: the processor and the
+    scheduler are set up only once. The class fp_edf_scheduler is registered as class of the
+    scheduler (SchedulerInfo.clas), so SimSo doesn't load the scheduler module from the file for
+    every simulation.
+        configuration -- the prepared SimSo configuration
+    """
+
+    def __init__(self):
+        """Constructor."""
+        import fp_edf_scheduler
+
+        self.configuration = _create_simso_configuration()
+
+        # register the scheduler class: SimSo uses the class instead of the file if it is given
+        self.configuration.scheduler_info.clas = fp_edf_scheduler.fp_edf_scheduler
+
+
+_simso_template = None  # prepared SimSo configuration, see _get_simso_template()
+
+
+def _get_simso_template():
+    """Get the prepared SimSo configuration.
+
+    The template is created with the first call.
+
+    Return:
+        the _SimsoTemplate of this process
+    """
+    global _simso_template
+    if _simso_template is None:  # no template created yet
+        _simso_template = _SimsoTemplate()
+
+    return _simso_template
+
+
+def _is_well_formed(taskset):
+    """Check if a task-set is well-formed.
+
+    A task-set is well-formed if all task attributes are valid for a SimSo configuration: positive
+    integer periods and deadlines, non-negative execution times and valid priorities. The tasks of
+    a well-formed task-set don't have to be checked by SimSo.
+
+    Args:
+        taskset - the task-set that should be checked
+    Return:
+        True/False - whether the task-set is well-formed
+    """
+    for task in taskset:
+        if not isinstance(task.period, int) or task.period <= 0:  # invalid period
+            return False
+        if not isinstance(task.deadline, int) or task.deadline <= 0:  # invalid deadline
+            return False
+        if task.execution_time < 0:  # invalid execution time
+            return False
+        if not isinstance(task.priority, int) or not 0 <= task.priority <= EDF_PRIORITY:
+            return False  # invalid priority
 
     return True
 
 
+def _get_horizon(taskset, hyper_period):
+    """Determine the length of the simulation.
+
+    All tasks are activated at t = 0, so the worst case for every task occurs in the first busy
+    period, i.e. the interval from t = 0 until the processor is idle for the first time, if the FP
+    priorities of the tasks are distinct. Then no job misses its deadline after the first busy
+    period if no job misses its deadline in it, and the simulation can be stopped at the end of the
+    first busy period or at the end of the hyperperiod, whichever comes first. Jobs with the same
+    FP priority are scheduled in order of their activation, so a later job of a task can get ahead
+    of the job of another task and miss a deadline after the first busy period: if two tasks have
+    the same FP priority, the hyperperiod is simulated. The length of the busy period is calculated
+    through the iterative formula:
+    start:  L_0 = sum(C_j)
+    iteration:  L_(k+1) = sum( min(ceil(L_k / T_j), n_j) * C_j )
+    stop:   L_(k+1) = L_k = L
+    with n_j the number of jobs of task j. If all jobs of all tasks are activated in the first busy
+    period, the simulation ends with the termination of the last job.
+
+    Args:
+        taskset - the task-set that should be simulated
+        hyper_period - the hyperperiod of the task-set
+    Return:
+        horizon - the length of the simulation
+        horizon_type - HORIZON_HYPERPERIOD, HORIZON_BUSY_PERIOD or HORIZON_LAST_JOB
+    """
+    # jobs with the same FP priority are scheduled in order of their activation
+    fp_priorities = [task.priority for task in taskset
+                     if task.priority != EDF_PRIORITY and task.number_of_jobs > 0]
+    if len(set(fp_priorities)) < len(fp_priorities):  # two tasks have the same FP priority
+        return hyper_period, HORIZON_HYPERPERIOD
+
+    # workload of all jobs of all tasks
+    total_workload = sum(max(task.number_of_jobs, 0) * task.execution_time for task in taskset)
+
+    # start value: the first job of every task is activated at t = 0
+    busy_period = sum(task.execution_time for task in taskset if task.number_of_jobs > 0)
+
+    while busy_period < hyper_period:  # the busy period is shorter than the hyperperiod
+        # calculate the workload of all jobs activated in the busy period
+        workload = 0
+        for task in taskset:
+            number_of_jobs = min(-(-busy_period // task.period), max(task.number_of_jobs, 0))
+            workload += number_of_jobs * task.execution_time
+
+        if workload == busy_period:  # busy period doesn't change anymore
+            break
+        busy_period = workload
+
+    if busy_period >= hyper_period:  # simulate the hyperperiod
+        return hyper_period, HORIZON_HYPERPERIOD
+    if busy_period == total_workload:  # all jobs are activated in the first busy period
+        return busy_period, HORIZON_LAST_JOB
+    return busy_period, HORIZON_BUSY_PERIOD
+
+
 def _get_activation_dates(hyper_period, task_period, number_of_jobs):
     """Determine all activation dates of a task.
 
@@ -99,14 +434,29 @@ def _get_activation_dates(hyper_period, task_period, number_of_jobs):
     Return:
         list of activation dates
     """
-    activation_dates = []  # create empty list
-    current_activation_date = 0  # initialize current activation date
-    while current_activation_date <= hyper_period and len(activation_dates) < number_of_jobs:
-        if current_activation_date not in activation_dates:
-            activation_dates.append(current_activation_date)
-        current_activation_date += task_period
-
-    return activation_dates
+    # activation dates are the multiples of the period until the hyperperiod
+    activation_dates = range(0, hyper_period + 1, task_period)
+
+    return list(activation_dates[:max(number_of_jobs, 0)])
+
+
+def get_hyperperiod(taskset):
+    """Calculate the hyperperiod of a task-set.
+
+    The hyperperiod is the least common multiple of the periods of all tasks.
+
+    Args:
+        taskset - the task-set
+    Return:
+        the hyperperiod of the task-set
+    """
+    # Get the periods of the tasks
+    periods = []
+    for task in taskset:
+        if task.period not in periods:
+            periods.append(task.period)
+
+    return _lcm(periods)
 
 
 def _lcm(numbers):
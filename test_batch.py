@@ -0,0 +1,90 @@
+"""Tests of the batch variants of the schedulability analysis methods."""
+import random
+
+import pytest
+
+import main
+import rta
+import utilization
+import workload
+from database_interface import Task, Taskset, create_taskset_batch
+
+# pairs of the tests for single task-sets and their batch variants
+BATCH_TESTS = [(utilization.basic_utilization_test, utilization.basic_utilization_test_batch),
+               (utilization.rm_utilization_test, utilization.rm_utilization_test_batch),
+               (utilization.hb_utilization_test, utilization.hb_utilization_test_batch),
+               (rta.rta_audsley, rta.rta_audsley_batch),
+               (rta.rta_buttazzo, rta.rta_buttazzo_batch),
+               (workload.rm_workload_test, workload.rm_workload_test_batch)]
+
+
+def _create_random_dataset(number, seed):
+    """Create random task-sets and the TasksetBatch with the same task-sets.
+
+    Args:
+        number -- number of task-sets
+        seed -- seed of the random generator
+    Return:
+        tasksets -- list of task-sets
+        batch -- the TasksetBatch
+    """
+    generator = random.Random(seed)
+    task_dict = dict()
+    for task_id in range(20):  # tasks with equal priorities and constrained deadlines
+        period = generator.choice([4, 5, 8, 10, 12, 20])
+        task_dict[task_id] = Task(task_id=task_id, priority=generator.randint(0, 10),
+                                  execution_time=generator.randint(0, 4), period=period,
+                                  deadline=generator.randint(1, period))
+
+    task_ids = [generator.sample(range(20), generator.randint(1, 5)) for _ in range(number)]
+    results = [generator.randint(0, 1) for _ in range(number)]  # random labels
+    tasksets = [Taskset(taskset_id=taskset_id, result=results[taskset_id], frozen=True,
+                        tasks=[task_dict[task_id] for task_id in ids])
+                for taskset_id, ids in enumerate(task_ids)]
+    batch = create_taskset_batch(range(number), results,
+                                 [ids + [-1] * (5 - len(ids)) for ids in task_ids], task_dict)
+
+    return tasksets, batch
+
+
+@pytest.mark.parametrize("test, batch_test", BATCH_TESTS)
+def test_batch_equals_single(test, batch_test):
+    """The batch variant gives the same verdicts as the test for single task-sets."""
+    tasksets, batch = _create_random_dataset(2000, seed=14)
+
+    assert batch_test(batch).tolist() == [test(taskset) for taskset in tasksets]
+
+
+@pytest.mark.parametrize("max_round_points", [1, 7, 100])
+def test_small_workload_rounds(monkeypatch, max_round_points):
+    """The batched workload test gives the same verdicts if the rounds are bounded."""
+    tasksets, batch = _create_random_dataset(500, seed=17)
+    monkeypatch.setattr(workload, 'MAX_ROUND_POINTS', max_round_points)
+
+    assert workload.rm_workload_test_batch(batch).tolist() == [
+        workload.rm_workload_test(taskset) for taskset in tasksets]
+
+
+def test_batch_tests_are_checked():
+    """All batch variants of the analysis are checked against their single task-set tests."""
+    assert dict(BATCH_TESTS) == main.BATCH_SA
+
+
+@pytest.mark.parametrize("test, batch_test", BATCH_TESTS)
+def test_batch_results_equal_dataset_results(test, batch_test):
+    """The counters of test_batch() equal the counters of test_dataset()."""
+    tasksets, batch = _create_random_dataset(2000, seed=1)
+    keys = ['tp', 'fp', 'tn', 'fn']
+
+    batch_results = main.test_batch(batch, batch_test)
+    dataset_results = main.test_dataset(tasksets, test)
+    assert [batch_results[key] for key in keys] == [dataset_results[key] for key in keys]
+
+
+@pytest.mark.parametrize("batch_test", [batch_test for _, batch_test in BATCH_TESTS])
+def test_invalid_input(batch_test):
+    """Invalid input of a batch variant raises a ValueError instead of returning a verdict."""
+    tasksets, _ = _create_random_dataset(1, seed=14)
+
+    with pytest.raises(ValueError):
+        batch_test(tasksets)
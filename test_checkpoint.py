@@ -0,0 +1,53 @@
+"""Tests of resuming an analysis from a checkpoint (checkpoint.py)."""
+import os
+import sqlite3
+import sys
+
+import checkpoint
+import main
+from test_dataset_cache import _create_database
+
+
+def _run_main(monkeypatch, arguments):
+    """Run the analysis and collect the logged results.
+
+    Args:
+        monkeypatch -- the monkeypatch fixture of pytest
+        arguments -- list with the command-line arguments
+    Return:
+        results -- dictionary with the logged results (key = name of the test)
+    """
+    results = dict()
+    monkeypatch.setattr(sys, 'argv', ['main.py'] + arguments)
+    monkeypatch.setattr(main.logging_config, 'log_results',
+                        lambda test_name, result_dict: results.update({test_name: result_dict}))
+    main.main()
+
+    return results
+
+
+def test_resume_with_dedup(tmp_path, monkeypatch):
+    """Resuming with --dedup and --stream logs the results of an uninterrupted run."""
+    db_name = _create_database(str(tmp_path))
+    db_path = os.path.join(str(tmp_path), db_name)
+    db_connection = sqlite3.connect(db_path)
+    db_connection.execute("INSERT INTO TaskSet VALUES (3, 1, 1, 2, -1, -1)")  # duplicate of 1
+    db_connection.commit()
+    db_connection.close()
+    arguments = [db_path, '-rta', '--stream', '--dedup']
+
+    expected = _run_main(monkeypatch, arguments)
+
+    # interrupted run: the first test is finished
+    interrupted = checkpoint.Checkpoint(str(tmp_path), db_name, {'dedup': True, 'shard': None},
+                                        interval=1)
+    interrupted.finish('rta_audsley', expected['rta_audsley'])
+    results = _run_main(monkeypatch, arguments + ['--checkpoint_interval', '1', '--resume'])
+
+    assert results['rta_audsley'] == dict(expected['rta_audsley'], last_taskset_id=None,
+                                          finished=True)
+    for test_name in ['rta_audsley', 'rta_buttazzo']:
+        for key in ['tp', 'fp', 'tn', 'fn']:
+            assert results[test_name][key] == expected[test_name][key]
+        assert results[test_name]['dedup']['groups'] == 2
+        assert results[test_name]['dedup']['tasksets'] == 3
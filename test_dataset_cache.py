@@ -0,0 +1,67 @@
+"""Tests of the memory-mapped dataset cache (dataset_cache.py)."""
+import os
+import sqlite3
+
+import pytest
+
+from database_interface import Database
+from dataset_cache import DatasetCache
+
+
+def _create_database(db_dir):
+    """Create a database with two task-sets and tasks with NULL values.
+
+    Args:
+        db_dir -- directory of the database
+    Return:
+        db_name -- name of the database
+    """
+    db_name = "test.db"
+    db_connection = sqlite3.connect(os.path.join(db_dir, db_name))
+    db_connection.executescript("""
+        CREATE TABLE TaskSet (Set_ID INTEGER PRIMARY KEY, Successful INT, TASK1_ID INT,
+                              TASK2_ID INT, TASK3_ID INT, TASK4_ID INT);
+        CREATE TABLE Task (Task_ID INTEGER PRIMARY KEY, Priority INT, Deadline INT, Quota TEXT,
+                           CAPS INT, PKG TEXT, Arg INT, CORES INT, COREOFFSET INT,
+                           CRITICALTIME INT, Period INT, Number_of_Jobs INT, OFFSET INT);
+        CREATE TABLE ExecutionTime (TASK_ID INTEGER, Average_C INTEGER, PRIMARY KEY(TASK_ID));
+        CREATE TABLE Job (Set_ID INT, Task_ID INT, Job_ID INT, Start_Date INT, End_Date INT,
+                          Exit_Value TEXT);
+        INSERT INTO Task VALUES (1, 1, 10, NULL, NULL, 'hey', 1000, 1, 0, 10, 10, 5, 0);
+        INSERT INTO Task VALUES (2, 2, 20, NULL, NULL, NULL, NULL, 1, 0, 20, 20, 3, 0);
+        INSERT INTO ExecutionTime VALUES (1, 2);
+        INSERT INTO ExecutionTime VALUES (2, 5);
+        INSERT INTO TaskSet VALUES (1, 1, 1, 2, -1, -1);
+        INSERT INTO TaskSet VALUES (2, 0, 2, -1, -1, -1);
+    """)
+    db_connection.commit()
+    db_connection.close()
+
+    return db_name
+
+
+def test_null_values_are_kept(tmp_path):
+    """The cached tasks are equal to the tasks read from the database, also NULL PKG and Arg."""
+    db_name = _create_database(str(tmp_path))
+    database = Database(db_dir=str(tmp_path), db_name=db_name, read_only=True)
+    expected = [str(taskset) for taskset in database.read_table_taskset()]
+    task_dict = database.read_table_task()
+
+    for _ in range(2):  # build the cache, then read the memory-mapped cache
+        dataset = DatasetCache(str(tmp_path), db_name).read_dataset(database)
+        assert [str(taskset) for taskset in dataset] == expected
+        for taskset in dataset:
+            for task in taskset:
+                assert (task.pkg, task.arg) == (task_dict[task.task_id].pkg,
+                                                task_dict[task.task_id].arg)
+    assert (task_dict[2].pkg, task_dict[2].arg) == (None, None)
+
+
+def test_set_id_range_is_rejected(tmp_path):
+    """The dataset cache can't be used for a range of Set_IDs."""
+    db_name = _create_database(str(tmp_path))
+    database = Database(db_dir=str(tmp_path), db_name=db_name, read_only=True,
+                        set_id_range=(2, 2))
+
+    with pytest.raises(ValueError):
+        DatasetCache(str(tmp_path), db_name).read_dataset(database)
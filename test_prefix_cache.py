@@ -0,0 +1,74 @@
+"""Tests of the prefix cache of the exact tests (prefix_cache.py)."""
+import random
+
+import prefix_cache
+import rta
+import workload
+from database_interface import Task, Taskset
+
+# size of a prefix cache that holds all prefixes of the tested task-sets
+LARGE_CACHE = 200000
+
+# exact tests that use the prefix cache
+CACHED_TESTS = [rta.rta_audsley, rta.rta_buttazzo, workload.rm_workload_test,
+                workload.het_workload_test]
+
+
+def _get_verdicts(tasksets, max_nodes):
+    """Test the task-sets with all cached tests and a fresh prefix cache.
+
+    Args:
+        tasksets -- list of task-sets
+        max_nodes -- size of the prefix cache, 0 = no cache
+    Return:
+        verdicts -- list with the verdicts of each test for each task-set
+    """
+    prefix_cache.configure(max_nodes)
+    try:
+        return [[test(taskset) for test in CACHED_TESTS] for taskset in tasksets]
+    finally:  # restore the default: no cache
+        prefix_cache.configure()
+
+
+def _create_random_tasksets(number, seed):
+    """Create random task-sets with shared prefixes, repeated tasks and equal priorities.
+
+    Args:
+        number -- number of task-sets
+        seed -- seed of the random generator
+    Return:
+        tasksets -- list of task-sets
+    """
+    generator = random.Random(seed)
+    tasks = [Task(task_id=task_id, priority=generator.choice([1, 2, 3, 5, 8]),
+                  execution_time=generator.randint(1, 4), period=generator.choice([5, 7, 10]))
+             for task_id in range(12)]
+
+    tasksets = []
+    for taskset_id in range(number):
+        tasksets.append(Taskset(taskset_id=taskset_id, frozen=True, tasks=[
+            generator.choice(tasks) for _ in range(generator.randint(1, 4))]))
+
+    return tasksets
+
+
+def test_repeated_task_is_not_reused():
+    """A response time of a task-set with a repeated task must not be reused (Set 2585)."""
+    repeated_task = Task(task_id=31, priority=7, execution_time=4, period=7, deadline=7)
+    other_task = Task(task_id=1, priority=127, execution_time=4, period=7, deadline=7)
+    tasksets = [Taskset(taskset_id=1, tasks=[repeated_task, repeated_task], frozen=True),
+                Taskset(taskset_id=2585, tasks=[repeated_task, other_task], frozen=True)]
+
+    verdicts = _get_verdicts(tasksets, LARGE_CACHE)
+
+    assert verdicts == _get_verdicts(tasksets, 0)
+    assert verdicts[1][:2] == [False, False]  # R = 8 > D = 7
+
+
+def test_cache_on_equals_cache_off():
+    """The verdicts with and without prefix cache are equal, also for tiny caches."""
+    tasksets = _create_random_tasksets(2000, seed=21)
+    reference = _get_verdicts(tasksets, 0)
+
+    for max_nodes in [1, 7, LARGE_CACHE]:
+        assert _get_verdicts(tasksets, max_nodes) == reference
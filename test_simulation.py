@@ -0,0 +1,98 @@
+"""Tests of the native simulator (simulation.py)."""
+import random
+
+import pytest
+
+import simulation
+from database_interface import Task, Taskset
+
+
+def _simulate_reference(taskset):
+    """Simulate a task-set time unit by time unit over the hyperperiod.
+
+    Reference for the native simulator with the same scheduling policy: FP for priorities
+    0 ... 126, EDF for priority 127, jobs with the same priority (or deadline) in order of their
+    activation. Only deadlines until the hyperperiod are checked.
+
+    Args:
+        taskset -- the task-set that should be simulated
+    Return:
+        True/False -- schedulability of the task-set
+    """
+    hyper_period = simulation.get_hyperperiod(taskset)
+    jobs = []  # jobs as lists [priority key, remaining execution time, absolute deadline]
+    for time in range(hyper_period + 1):
+        for task in taskset:  # activate the jobs in order of the tasks
+            number = time // task.period
+            if time % task.period == 0 and number < task.number_of_jobs:
+                deadline = time + task.deadline
+                edf_key = deadline if task.priority == simulation.EDF_PRIORITY else 0
+                jobs.append([(task.priority, edf_key, len(jobs)), task.execution_time, deadline])
+
+        if any(job[1] > 0 and job[2] <= time for job in jobs):  # deadline miss
+            return False
+
+        ready_jobs = [job for job in jobs if job[1] > 0]
+        if ready_jobs and time < hyper_period:  # run the job with the highest priority
+            min(ready_jobs, key=lambda job: job[0])[1] -= 1
+
+    return True
+
+
+def _create_random_taskset(generator):
+    """Create a random task-set with small periods, equal priorities and EDF tasks.
+
+    Args:
+        generator -- the random generator
+    Return:
+        taskset -- the task-set
+    """
+    tasks = []
+    for task_id in range(generator.randint(1, 4)):
+        period = generator.choice([2, 3, 4, 5, 6, 9, 10, 12])
+        tasks.append(Task(task_id=task_id, priority=generator.choice([0, 1, 2, 127]),
+                          execution_time=generator.randint(0, 4), period=period,
+                          deadline=generator.randint(1, 2 * period),
+                          number_of_jobs=generator.randint(0, 6)))
+
+    return Taskset(tasks=tasks, frozen=True)
+
+
+def test_equal_priorities_simulate_hyperperiod():
+    """With equal FP priorities a deadline is missed after the first busy period."""
+    taskset = Taskset(frozen=True, tasks=[
+        Task(task_id=1, priority=0, execution_time=2, period=5, deadline=5, number_of_jobs=4),
+        Task(task_id=2, priority=0, execution_time=5, period=9, deadline=16, number_of_jobs=2)])
+    stats = dict()
+
+    assert simulation.simulate(taskset, stats=stats) is False
+    assert stats['horizon_type'] == simulation.HORIZON_HYPERPERIOD
+    assert stats['stop_time'] == 15
+    assert _simulate_reference(taskset) is False
+
+
+def test_native_equals_reference():
+    """The native simulator gives the same verdicts as the reference simulation."""
+    generator = random.Random(3)
+    for _ in range(3000):
+        taskset = _create_random_taskset(generator)
+        assert simulation.simulate(taskset) == _simulate_reference(taskset), str(taskset)
+
+
+def test_simso_without_jobs():
+    """SimSo simulates a task-set without jobs, whose horizon is 0."""
+    pytest.importorskip("simso")
+    taskset = Taskset(frozen=True, tasks=[
+        Task(task_id=1, priority=1, execution_time=3, period=12, deadline=7, number_of_jobs=0)])
+
+    assert simulation.simulate(taskset, backend=simulation.BACKEND_SIMSO) is True
+
+
+def test_prepared_simso_equals_fresh_simso():
+    """SimSo gives the same verdicts with the prepared and with a fresh configuration."""
+    pytest.importorskip("simso")
+    generator = random.Random(4)
+    for _ in range(200):
+        taskset = _create_random_taskset(generator)
+        assert (simulation.simulate(taskset, backend=simulation.BACKEND_SIMSO_PREPARED) ==
+                simulation.simulate(taskset, backend=simulation.BACKEND_SIMSO)), str(taskset)
@@ -0,0 +1,43 @@
+"""Tests of the persistent verdict cache (verdict_cache.py)."""
+import rta
+from database_interface import Task, Taskset
+from verdict_cache import VerdictCache, get_taskset_key
+
+
+def _create_tasksets():
+    """Create a task-set with a repeated task and one with two equal but different tasks.
+
+    Return:
+        repeated -- task-set that contains the same task twice
+        different -- task-set with a second task with the same parameters
+    """
+    task = Task(task_id=31, priority=7, execution_time=4, period=7, deadline=7)
+    equal_task = Task(task_id=1, priority=7, execution_time=4, period=7, deadline=7)
+    repeated = Taskset(taskset_id=1, tasks=[task, task], frozen=True)
+    different = Taskset(taskset_id=2, tasks=[task, equal_task], frozen=True)
+
+    return repeated, different
+
+
+def test_repeated_task_changes_key():
+    """A task-set with a repeated task doesn't share the key of a task-set with equal tasks."""
+    repeated, different = _create_tasksets()
+
+    # the repeated task is excluded from its own hp-set, so the verdicts differ
+    assert rta.rta_audsley(repeated) is True
+    assert rta.rta_audsley(different) is False
+    assert get_taskset_key(repeated) != get_taskset_key(different)
+
+
+def test_cached_verdict_of_repeated_task(tmp_path):
+    """The cached verdict of a task-set with a repeated task is not used for other task-sets."""
+    repeated, different = _create_tasksets()
+
+    cache = VerdictCache(str(tmp_path), "test.db")
+    cache.put(rta.rta_audsley, repeated, rta.rta_audsley(repeated))
+    cache.close()
+
+    cache = VerdictCache(str(tmp_path), "test.db")
+    assert cache.get(rta.rta_audsley, repeated) is True
+    assert cache.get(rta.rta_audsley, different) is None
+    cache.close()
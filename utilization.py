@@ -1,8 +1,15 @@
-"""Utilization-based Schedulability Tests."""
+"""Utilization-based Schedulability Tests.
+
+Each test is available for a single task-set and as batch variant (*_batch) for a TasksetBatch.
+The batch variants compute the verdicts of all task-sets at once with NumPy, the tests for single
+task-sets are the reference implementations.
+"""
 
 import logging
 
-from database_interface import Taskset
+import numpy as np
+
+from database_interface import Taskset, TasksetBatch
 
 
 def basic_utilization_test(taskset):
@@ -40,7 +47,7 @@ def basic_utilization_test(taskset):
     return bool(total_utilization <= 1)
 
 
-def rm_utilization_test(taskset):
+def rm_utilization_test(taskset, derived=None):
     """Utilization-based schedulability test.
 
     This test was introduced by Liu and Layland in 1973 for the rate monothonic (RM) algorithm.
@@ -50,6 +57,7 @@ def rm_utilization_test(taskset):
     The test can also be used to test other fix priority algorithms, as the RM algorithm is optimal.
     Optimal means, that if the RM algorithm cannot create a feasible schedule, no other
     priority-based algorithm can do this.
+    If the DerivedData of the task-set is given, its utilizations are used.
 
     Return value:
     True/False -- schedulabilty of task-set
@@ -65,11 +73,14 @@ def rm_utilization_test(taskset):
 
     total_utilization = 0  # Reset total utilization
 
-    # Iterate over all tasks
-    for task in taskset:
-        # Calculate utilization-factor of task
-        task_utilization = task.execution_time / task.period
+    # Get utilization-factors of the tasks
+    if derived is not None:  # utilizations are shared with other analysis methods
+        task_utilizations = derived.utilizations
+    else:
+        task_utilizations = [task.execution_time / task.period for task in taskset]
 
+    # Iterate over all tasks
+    for task_utilization in task_utilizations:
         # Add utilization-factor of task to total utilization
         total_utilization += task_utilization
 
@@ -82,13 +93,14 @@ def rm_utilization_test(taskset):
     return bool(total_utilization <= utilization_bound)
 
 
-def hb_utilization_test(taskset):
+def hb_utilization_test(taskset, derived=None):
     """Utilization-based schedulability test.
 
     The test was introduced by Bini und Buttazzo 2001 and 2003. It is based on the RM-test of Liu
     and Layland 1973, but with another utilization bound. According to the so called hyperbolic
     bound (HB), a task-set is schedulable, if: prod(U_i + 1) <= 2. The utilization of a task is the
     fraction of processing time and period: U_i = C_i / T_i.
+    If the DerivedData of the task-set is given, its utilizations are used.
 
     Return value:
     True/False -- schedulabilty of task-set
@@ -104,15 +116,108 @@ def hb_utilization_test(taskset):
 
     total_utilization = 1  # Reset total utilization
 
-    # Iterate over all tasks
-    for task in taskset:
-        # Calculate utilization-factor of task
-        task_utilization = (task.execution_time / task.period) + 1
+    # Get utilization-factors of the tasks
+    if derived is not None:  # utilizations are shared with other analysis methods
+        task_utilizations = derived.utilizations
+    else:
+        task_utilizations = [task.execution_time / task.period for task in taskset]
 
+    # Iterate over all tasks
+    for task_utilization in task_utilizations:
         # Add utilization-factor of task to total utilization
-        total_utilization *= task_utilization
+        total_utilization *= task_utilization + 1
 
     logger.debug("Total Utilization = %f", total_utilization)
 
     # Check schedulability
     return bool(total_utilization <= 2)
+
+
+def basic_utilization_test_batch(batch):
+    """Utilization-based schedulability test for a batch of task-sets.
+
+    Batch variant of basic_utilization_test(): a task-set is schedulable, if U <= 1 with
+    U_i = C_i / min(D_i, T_i).
+
+    Return value:
+    verdicts -- boolean array with the schedulability of the task-sets
+    """
+    # Check input argument: must be a TasksetBatch
+    if not isinstance(batch, TasksetBatch):  # Invalid input argument
+        raise ValueError("batch must be of type TasksetBatch")
+
+    # Calculate utilization-factors of all tasks, invalid task slots have C = 0
+    task_utilization = batch.execution_time / np.minimum(batch.deadline, batch.period)
+
+    # Add utilization-factors in priority order (same rounding as the single task-set test)
+    total_utilization = _sum_columns(task_utilization)
+
+    # Check schedulability
+    return total_utilization <= 1
+
+
+def rm_utilization_test_batch(batch):
+    """Utilization-based schedulability test for RM for a batch of task-sets.
+
+    Batch variant of rm_utilization_test(): a task-set is schedulable, if U <= n(2^(1/n) - 1) with
+    U_i = C_i / T_i. An empty task-set is schedulable.
+
+    Return value:
+    verdicts -- boolean array with the schedulability of the task-sets
+    """
+    # Check input argument: must be a TasksetBatch
+    if not isinstance(batch, TasksetBatch):  # Invalid input argument
+        raise ValueError("batch must be of type TasksetBatch")
+
+    # Calculate total utilization, invalid task slots have C = 0
+    total_utilization = _sum_columns(batch.execution_time / batch.period)
+
+    # Calculate utilization bound for RM per number of tasks n
+    number_of_tasks = batch.mask.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):  # n = 0: bound is infinite
+        utilization_bound = number_of_tasks * (2 ** (1 / number_of_tasks) - 1)
+    utilization_bound[number_of_tasks == 0] = np.inf
+
+    # Check schedulability
+    return total_utilization <= utilization_bound
+
+
+def hb_utilization_test_batch(batch):
+    """Utilization-based schedulability test with the hyperbolic bound for a batch of task-sets.
+
+    Batch variant of hb_utilization_test(): a task-set is schedulable, if prod(U_i + 1) <= 2 with
+    U_i = C_i / T_i.
+
+    Return value:
+    verdicts -- boolean array with the schedulability of the task-sets
+    """
+    # Check input argument: must be a TasksetBatch
+    if not isinstance(batch, TasksetBatch):  # Invalid input argument
+        raise ValueError("batch must be of type TasksetBatch")
+
+    # Multiply (U_i + 1) in priority order, invalid task slots have C = 0
+    task_utilization = (batch.execution_time / batch.period) + 1
+    total_utilization = np.ones(len(batch))
+    for column in range(task_utilization.shape[1]):  # iterate over all task slots
+        total_utilization *= task_utilization[:, column]
+
+    # Check schedulability
+    return total_utilization <= 2
+
+
+def _sum_columns(values):
+    """Sum up the columns of an array.
+
+    The columns are added one after another, so the sum of each row is rounded exactly like the
+    sum of the single task-set tests.
+
+    Args:
+        values -- array with shape (N, K)
+    Return:
+        array with the sums of the rows, shape (N,)
+    """
+    total = np.zeros(len(values))
+    for column in range(values.shape[1]):  # iterate over all columns
+        total += values[:, column]
+
+    return total
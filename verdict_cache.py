@@ -0,0 +1,197 @@
+"""Persistent cache for the results of schedulability analysis methods.
+
+The verdict of a schedulability analysis method only depends on the task parameters of a task-set.
+The cache stores the verdicts in a SQLite file next to the database with the following table:
+    Verdict: Method, Taskset_Key, Verdict, Last_Used
+The key of a task-set is a hash of the parameters (C, T, D, priority, number of jobs) of its tasks
+in priority order and of the positions of repeated tasks, see get_taskset_key(). The cache is
+bounded: if it contains more than max_entries verdicts, the least recently used verdicts are
+evicted.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+
+# version of the analysis methods, increase to invalidate all cached verdicts
+CACHE_VERSION = 2
+
+# default maximal number of verdicts in the cache
+MAX_ENTRIES = 10000000
+
+
+class VerdictCache:
+    """Class representing a verdict cache.
+
+    The verdict cache is defined by the following attributes:
+        cache_path -- path to the cache file
+        max_entries -- maximal number of verdicts in the cache
+    Additional attributes of a VerdictCache object are:
+        db_connection -- connection to the cache file
+        verdicts -- verdicts of the loaded methods (key = (method, task-set key), value = verdict)
+        loaded_methods -- methods whose verdicts were read from the cache file
+        new_verdicts -- verdicts that are not yet saved to the cache file
+        used_keys -- keys of cached verdicts that were used
+    """
+
+    def __init__(self, db_dir, db_name, max_entries=MAX_ENTRIES):
+        """Constructor of class VerdictCache.
+
+        The cache file is created in the directory of the database, its name is derived from the
+        name of the database.
+        """
+        db_name = os.path.splitext(db_name)[0]  # remove file extension from the database name
+        self.cache_path = os.path.join(db_dir, db_name + "_verdicts.db")
+        self.max_entries = max_entries
+
+        self.verdicts = dict()  # verdicts of the loaded methods
+        self.loaded_methods = set()  # methods whose verdicts were read from the cache file
+        self.new_verdicts = []  # verdicts that are not yet saved
+        self.used_keys = set()  # keys of cached verdicts that were used
+
+        # open cache file and create table Verdict if it does not exist
+        self.db_connection = sqlite3.connect(self.cache_path)
+        self.db_connection.execute("CREATE TABLE IF NOT EXISTS Verdict ("
+                                   "Method TEXT, "
+                                   "Taskset_Key BLOB, "
+                                   "Verdict INTEGER, "
+                                   "Last_Used REAL, "
+                                   "PRIMARY KEY(Method, Taskset_Key)"
+                                   ");")
+
+    def get(self, function, taskset):
+        """Get the cached verdict of a task-set.
+
+        Args:
+            function -- the schedulability analysis method
+            taskset -- the task-set
+        Return:
+            True/False -- the cached verdict
+            None -- no verdict cached
+        """
+        return self.get_by_key(function, get_taskset_key(taskset))
+
+    def get_by_key(self, function, taskset_key):
+        """Get the cached verdict of a task-set by its key.
+
+        Args:
+            function -- the schedulability analysis method
+            taskset_key -- the key of the task-set, see get_taskset_key()
+        Return:
+            True/False -- the cached verdict
+            None -- no verdict cached
+        """
+        method = get_method_name(function)
+        if method not in self.loaded_methods:  # read the verdicts of the method
+            self._load(method)
+
+        key = (method, taskset_key)
+        verdict = self.verdicts.get(key)
+        if verdict is not None:  # cache hit
+            self.used_keys.add(key)
+
+        return verdict
+
+    def put(self, function, taskset, verdict):
+        """Add the verdict of a task-set to the cache.
+
+        Only valid verdicts (True/False) are cached.
+
+        Args:
+            function -- the schedulability analysis method
+            taskset -- the task-set
+            verdict -- the result of the schedulability analysis method
+        """
+        if verdict is not True and verdict is not False:  # an error occurred
+            return
+
+        key = (get_method_name(function), get_taskset_key(taskset))
+        if key not in self.verdicts:  # new verdict
+            self.verdicts[key] = verdict
+            self.new_verdicts.append(key)
+
+    def close(self):
+        """Close the cache.
+
+        The new verdicts are saved to the cache file, the usage of the cached verdicts is updated
+        and the least recently used verdicts are evicted.
+        """
+        # create logger
+        logger = logging.getLogger('traditional-SA.verdict_cache.close')
+
+        now = time.time()
+
+        # save the new verdicts and update the usage of the cached verdicts
+        self.db_connection.executemany(
+            "INSERT OR REPLACE INTO Verdict (Method, Taskset_Key, Verdict, Last_Used) "
+            "VALUES(?, ?, ?, ?)",
+            ((key[0], key[1], int(self.verdicts[key]), now) for key in self.new_verdicts))
+        self.db_connection.executemany(
+            "UPDATE Verdict SET Last_Used = ? WHERE Method = ? AND Taskset_Key = ?",
+            ((now, key[0], key[1]) for key in self.used_keys))
+
+        # evict the least recently used verdicts
+        number_of_entries = self.db_connection.execute(
+            "SELECT COUNT(*) FROM Verdict").fetchone()[0]
+        if number_of_entries > self.max_entries:
+            self.db_connection.execute(
+                "DELETE FROM Verdict WHERE rowid IN "
+                "(SELECT rowid FROM Verdict ORDER BY Last_Used ASC LIMIT ?)",
+                (number_of_entries - self.max_entries,))
+            logger.info("Evicted %d verdicts from the cache.",
+                        number_of_entries - self.max_entries)
+
+        # commit changes and close connection to the cache file
+        self.db_connection.commit()
+        self.db_connection.close()
+        self.db_connection = None
+
+    def _load(self, method):
+        """Read all cached verdicts of a method from the cache file.
+
+        Args:
+            method -- name of the schedulability analysis method
+        """
+        rows = self.db_connection.execute(
+            "SELECT Taskset_Key, Verdict FROM Verdict WHERE Method = ?", (method,))
+        for row in rows:
+            self.verdicts[(method, row[0])] = bool(row[1])
+
+        self.loaded_methods.add(method)
+
+
+def get_method_name(function):
+    """Get the name of a schedulability analysis method in the cache.
+
+    The name contains the module and the version of the analysis methods.
+
+    Args:
+        function -- the schedulability analysis method
+    Return:
+        name of the method
+    """
+    return "%s.%s-v%d" % (function.__module__, function.__name__, CACHE_VERSION)
+
+
+def get_taskset_key(taskset):
+    """Get the key of a task-set in the cache.
+
+    The key is a hash of the parameters of the tasks in priority order, so task-sets with identical
+    tasks get the same key regardless of the IDs of the task-set and its tasks. A task can be
+    contained twice in a task-set and the exact tests exclude a task from its own hp-set by
+    identity, so the verdict also depends on which tasks are the same: for each task, the position
+    of its first occurrence in the task-set is part of the key.
+
+    Args:
+        taskset -- the task-set
+    Return:
+        key of the task-set
+    """
+    tasks = list(taskset)
+    parameters = tuple((task.execution_time, task.period, task.deadline, task.priority,
+                        task.number_of_jobs,
+                        next(position for position, other in enumerate(tasks) if other is task))
+                       for task in tasks)
+
+    return hashlib.sha1(repr(parameters).encode()).digest()
@@ -1,24 +1,35 @@
 """Module workload.
 
 This module contains all workload based schedulability test.
+The RM workload test is also available as batch variant (rm_workload_test_batch) for a
+TasksetBatch.
 """
 import logging
 import math
 
+import numpy as np
+
+import prefix_cache
 from database_interface import Task
 from database_interface import Taskset
+from database_interface import TasksetBatch
+
+# maximal number of scheduling points that are evaluated at once by rm_workload_test_batch()
+MAX_ROUND_POINTS = 1000000
 
 
-def rm_workload_test(taskset):
+def rm_workload_test(taskset, derived=None):
     """Workload test.
 
     This method implements the workload test according to Lehoczky, Sha, Ding 1989 for RM scheduler
     and D = T. A task-set is schedulable if for every task tau_i: L_i <= 1.
     Lehoczky, Sha, Ding 1989: The Rate Monotonic Scheduling Algorithm: Exact Characterization And
                               Average Case Behavior
+    The results of tasks are reused from the prefix cache, see prefix_cache.py.
 
     Args:
         taskset -- the task-set that should be tested for schedulability
+        derived -- the DerivedData of the task-set, if given its hp-prefixes are used
     Return:
         True/False -- schedulability of the task-set
     """
@@ -29,33 +40,26 @@ def rm_workload_test(taskset):
     if not isinstance(taskset, Taskset):  # invalid input argument
         raise ValueError("taskset must be of type Taskset")
 
+    # Get the nodes of the prefixes of the task-set in the prefix cache
+    cache = prefix_cache.PREFIX_CACHE
+    path = cache.get_nodes(taskset) if cache is not None else None
+
     # Iterate over all tasks and check schedulability of tasks
     # The task-set is schedulable if L = max(L_i) <= 1
     # This means that if all tasks are schedulable, the task-set is also schedulable
-    for check_task in taskset:
+    for index, check_task in enumerate(taskset):
         logger.debug("TASK %d", check_task.task_id)
 
-        # Generate task-set with all higher priority tasks and check_task
-        hp_taskset = Taskset(tasks=[])
-        for task in taskset:
-            if task.priority <= check_task.priority:
-                hp_taskset.add_task(task)
-        logger.debug("hp-set = %s", hp_taskset)
-
-        # Get scheduling points
-        scheduling_points = _get_scheduling_points(hp_taskset, check_task)
-        logger.debug("Scheduling points = %s", scheduling_points)
-
-        # Iterate over all scheduling points and calculate L_i(t)
-        # A task is schedulable if L_i = min(L_i(t)) <= 1
-        # This means that if at least for one scheduling point L_i(t) <= 1 the task is schedulable
-        for t in scheduling_points:
-            l_i = _L_i(t, hp_taskset)
-            if l_i <= 1:  # task is schedulable, stop iteration and check next task in task-set
-                logger.debug("L_i(%d) <= 1 -> task schedulable", t)
-                break
-        else:  # the condition was not meet for any scheduling point:
-            # task not schedulable -> task-set not schedulable
+        # Get schedulability of task from the prefix cache
+        node = prefix_cache.get_node(path, taskset, index)
+        schedulable = cache.get(node, 'rm_workload') if node is not None else None
+
+        if schedulable is None:  # schedulability not cached
+            schedulable = _rm_workload_test_task(taskset, index, derived)
+            if node is not None:  # save schedulability in the prefix cache
+                cache.put(node, 'rm_workload', schedulable)
+
+        if not schedulable:  # task not schedulable -> task-set not schedulable
             logger.debug("Task is not schedulable -> Task-set is not schedulable")
             return False
 
@@ -64,6 +68,124 @@ def rm_workload_test(taskset):
     return True
 
 
+def _rm_workload_test_task(taskset, index, derived=None):
+    """Workload test of a single task.
+
+    A task tau_i is schedulable if L_i = min(L_i(t)) <= 1 for the scheduling points t.
+
+    Args:
+        taskset -- the task-set that is tested
+        index -- index of the task that should be checked
+        derived -- the DerivedData of the task-set, if given its hp-prefixes are used
+    Return:
+        True/False -- schedulability of the task
+    """
+    # create logger
+    logger = logging.getLogger('traditional-SA.workload._rm_workload_test_task')
+
+    check_task = taskset[index]
+
+    # Generate task-set with all higher priority tasks and check_task
+    if derived is not None:  # hp-prefixes are shared with other analysis methods
+        hp_taskset = Taskset(tasks=derived.get_hp_tasks(index), frozen=True)
+    else:
+        hp_taskset = Taskset(tasks=[])
+        for task in taskset:
+            if task.priority <= check_task.priority:
+                hp_taskset.add_task(task)
+    logger.debug("hp-set = %s", hp_taskset)
+
+    # Get scheduling points
+    scheduling_points = _get_scheduling_points(hp_taskset, check_task)
+    logger.debug("Scheduling points = %s", scheduling_points)
+
+    # Iterate over all scheduling points and calculate L_i(t)
+    # A task is schedulable if L_i = min(L_i(t)) <= 1
+    # This means that if at least for one scheduling point L_i(t) <= 1 the task is schedulable
+    for t in scheduling_points:
+        l_i = _L_i(t, hp_taskset)
+        if l_i <= 1:  # task is schedulable
+            logger.debug("L_i(%d) <= 1 -> task schedulable", t)
+            return True
+
+    # the condition was not meet for any scheduling point: task not schedulable
+    return False
+
+
+def rm_workload_test_batch(batch):
+    """Workload test for a batch of task-sets.
+
+    Batch variant of rm_workload_test(): each task of each task-set is a lane, which is
+    schedulable if L_i(t) = W_i(t) / t <= 1 for at least one of its scheduling points
+    t = k * T_j with j in hp(i) and k = 1, ..., lfloor(T_i / T_j)rfloor. The scheduling points are
+    generated and evaluated in rounds of increasing ranges of k, only for the lanes that are still
+    open: a lane is closed when it is accepted at a point with L_i(t) <= 1, when all its points
+    are evaluated or when another lane of its task-set has no point with L_i(t) <= 1. A round
+    holds at most MAX_ROUND_POINTS points (but at least one k per pair of lane and hp task), so
+    the memory doesn't depend on the ratio of the periods. A task-set is schedulable if all its
+    tasks are schedulable.
+
+    Args:
+        batch -- the TasksetBatch that should be tested for schedulability
+    Return:
+        verdicts -- boolean array with the schedulability of the task-sets
+    """
+    # Check input argument
+    if not isinstance(batch, TasksetBatch):  # invalid input argument
+        raise ValueError("batch must be of type TasksetBatch")
+
+    number_of_slots = batch.mask.shape[1]
+
+    # hp-set of each lane: all valid tasks with higher or same priority, including tau_i itself
+    high_prio = (batch.mask[:, None, :] & batch.mask[:, :, None] &
+                 (batch.priority[:, None, :] <= batch.priority[:, :, None]))
+    high_prio = high_prio.reshape(-1, number_of_slots)
+
+    # execution times and periods of the hp-sets of the lanes (0 = task not in hp-set)
+    hp_execution_times = high_prio * np.repeat(batch.execution_time, number_of_slots, axis=0)
+    hp_periods = np.repeat(batch.period, number_of_slots, axis=0)
+
+    # number of multiples k of each task j in the hp-set of lane i: lfloor(T_i / T_j)rfloor
+    k_max = np.where(high_prio, batch.period.reshape(-1, 1) // hp_periods, 0)
+    lane_k_max = k_max.max(axis=1, initial=0)  # last k of each lane
+
+    # Evaluate the scheduling points in rounds of increasing ranges of k
+    accepted = np.zeros(len(high_prio), dtype=bool)  # whether a lane is schedulable
+    rejected = np.zeros(len(batch), dtype=bool)  # whether a task-set is not schedulable
+    open_lanes = np.flatnonzero(batch.mask.reshape(-1))  # lanes that are not decided yet
+    first_k = 1
+    round_size = 1
+    while open_lanes.size:  # lanes left
+        # range of k of this round: [first_k, last_k]
+        open_k_max = k_max[open_lanes]
+        last_k = first_k + max(1, min(round_size, MAX_ROUND_POINTS // open_k_max.size)) - 1
+
+        # generate the points k * T_j of this round of all open lanes
+        counts = (np.clip(open_k_max, first_k - 1, last_k) - (first_k - 1)).reshape(-1)
+        starts = np.cumsum(counts) - counts  # first point of each (lane, task) pair
+        k = np.arange(counts.sum()) - np.repeat(starts, counts) + first_k
+        lanes = np.repeat(np.repeat(open_lanes, number_of_slots), counts)
+        t = k * np.repeat(hp_periods[open_lanes].reshape(-1), counts)
+
+        # calculate L_i(t) = W_i(t) / t
+        workload = np.sum(np.ceil(t[:, None] / hp_periods[lanes]).astype(np.int64) *
+                          hp_execution_times[lanes], axis=1)
+        accepted[lanes[workload / t <= 1]] = True
+
+        # a lane without accepted point rejects its task-set
+        exhausted = open_lanes[(lane_k_max[open_lanes] <= last_k) & ~accepted[open_lanes]]
+        rejected[exhausted // number_of_slots] = True
+        open_lanes = open_lanes[~accepted[open_lanes] &
+                                ~rejected[open_lanes // number_of_slots] &
+                                (lane_k_max[open_lanes] > last_k)]
+
+        first_k = last_k + 1
+        round_size *= 2
+
+    # A task-set is schedulable if all its valid tasks are schedulable
+    return np.all(accepted.reshape(batch.mask.shape) | ~batch.mask, axis=1)
+
+
 def _get_scheduling_points(hp_taskset, check_task):
     """Get scheduling points of a task-set.
 
@@ -171,6 +293,10 @@ def het_workload_test(taskset):
 
     A task-set is schedulable if for all tasks C_i + W_[i-1](D_i) <= T_i is fullfilled.
     Implementation according to [BB04].
+    The already computed workload values are kept in a context object of this call, so the test
+    can be called on several task-sets concurrently (e.g. from a thread pool).
+    The workload of a task and the state of the context after the task only depend on the task and
+    the tasks before it, so they are reused from the prefix cache, see prefix_cache.py.
 
     Args:
         taskset -- the task-set that should be tested for schedulability
@@ -184,17 +310,32 @@ def het_workload_test(taskset):
     if not isinstance(taskset, Taskset):  # invalid input argument
         raise ValueError("taskset must be of type Taskset")
 
-    # clear list with already computed workload values
-    global _last_psi, _last_workload
-    _last_psi = [0 for x in range(len(taskset))]
-    _last_workload = [0 for x in range(len(taskset))]
+    # create context with empty lists of already computed workload values
+    context = _HetContext(taskset)
+
+    # Get the nodes of the prefixes of the task-set in the prefix cache
+    cache = prefix_cache.PREFIX_CACHE
+    path = cache.get_nodes(taskset) if cache is not None else None
+    cached = None  # cached result of the last task: workload and state of the context
 
     # iterate over all tasks in the task-set
     for i in range(1, len(taskset) + 1):
         logger.debug("TASK %d", taskset[i - 1].task_id)
 
-        # calculate W_[i-1](T_i)
-        w = _W_i_het(i - 1, taskset[i - 1].deadline, taskset)
+        # Get result of the task from the prefix cache
+        last_cached = cached
+        cached = cache.get(path[i - 1], 'het') if path is not None else None
+
+        if cached is not None:  # use cached W_[i-1](T_i)
+            w = cached[0]
+        else:  # calculate W_[i-1](T_i)
+            if last_cached is not None:  # restore the state of the context after the last task
+                context.last_psi[:i - 1] = last_cached[1]
+                context.last_workload[:i - 1] = last_cached[2]
+            w = _W_i_het(context, i - 1, taskset[i - 1].deadline)
+            if path is not None:  # save workload and state of the context in the prefix cache
+                cache.put(path[i - 1], 'het', (w, tuple(context.last_psi[:i]),
+                                               tuple(context.last_workload[:i])))
         logger.debug("W_%d(%d) = %d", i - 1, taskset[i - 1].deadline, w)
 
         # add computation time of check_task
@@ -214,53 +355,84 @@ def het_workload_test(taskset):
     return True
 
 
-_last_psi = []
-_last_workload = []
+class _HetContext:
+    """Context of one call of the Hyperplanes Exact Test.
+
+    The context is defined by the following attributes:
+        taskset -- the task-set that is tested
+        last_psi -- per task position i: the last b for which W(i, b) was computed
+        last_workload -- per task position i: the last computed value of W(i, b)
+    """
+
+    __slots__ = ('taskset', 'last_psi', 'last_workload')
 
+    def __init__(self, taskset):
+        """Constructor of class _HetContext."""
+        self.taskset = taskset
+        self.last_psi = [0] * len(taskset)
+        self.last_workload = [0] * len(taskset)
 
-def _W_i_het(i, b, taskset):
+
+def _W_i_het(context, i, b):
     """Calculate workload.
     This method calculates the workload of a task tau_i for its deadline T_i.
     W_[i-1](T_i) = min( sum( ceil(t / T_j) * C_j ) + (T_i - t) )
     The minimum is built over all scheduling points t.
     Implementation according to [BB01].
+    The recursion W(i, b) = min(b - f * (T_i - C_i) + W(i - 1, f * T_i), c * C_i + W(i - 1, b))
+    is evaluated with an explicit stack in the same order as the recursive implementation, so the
+    already computed workload values of the context are used and updated the same way.
 
     Args:
+        context -- the _HetContext of the test
         i -- position of the check-task in the task-set
         b -- the period of the task
     Return:
         the workload of the given task-set at T_i
-        -1 -- an error occurred
     """
-    # create logger
-    logger = logging.getLogger('traditional-SA.workload._W_i_het')
-
     # Check input arguments
-    if not isinstance(i, int) or i > len(taskset):  # invalid input argument for i
+    if not isinstance(context, _HetContext):  # invalid input argument for context
+        raise ValueError("context must be of type _HetContext")
+    if not isinstance(i, int) or i > len(context.taskset):  # invalid input argument for i
         raise ValueError("i must be of type int and in taskset")
     if not isinstance(b, int):  # invalid input argument for D_i
         raise ValueError("b must be of type int")
-    if not isinstance(taskset, Taskset):  # invalid input argument for taskset
-        raise ValueError("taskset must be of type Taskset")
-
-    if i <= 0:  # W_0(T_1) = 0
-        return 0
-
-    global _last_psi, _last_workload
-    if b <= _last_psi[i]:  # if W(i, b) already computed
-        logger.debug("W(%d, %d) already computed", i, b)
-        return _last_workload[i]  # don't go further
-
-    f = math.floor(b / taskset[i - 1].period)
-    c = math.ceil(b / taskset[i - 1].period)
-    logger.debug("f = %d \t c = %d", f, c)
-
-    branch0 = b - f * (taskset[i - 1].period - taskset[i - 1].execution_time) + \
-              _W_i_het(i - 1, f * taskset[i - 1].period, taskset)
-    branch1 = c * taskset[i - 1].execution_time + _W_i_het(i - 1, b, taskset)
-    logger.debug("branch0 = %f \t branch1 = %f", branch0, branch1)
-
-    _last_psi[i] = b
-    _last_workload[i] = min(branch0, branch1)
 
-    return _last_workload[i]
+    taskset = context.taskset
+    last_psi = context.last_psi
+    last_workload = context.last_workload
+
+    # each frame is [i, b, stage, branch0], stage = number of evaluated branches
+    stack = [[i, b, 0, 0]]
+    result = 0  # result of the last finished frame
+
+    while stack:
+        frame = stack[-1]
+        i, b, stage = frame[0], frame[1], frame[2]
+
+        if stage == 0:  # new frame
+            if i <= 0:  # W_0(T_1) = 0
+                result = 0
+                stack.pop()
+            elif b <= last_psi[i]:  # if W(i, b) already computed: don't go further
+                result = last_workload[i]
+                stack.pop()
+            else:  # evaluate branch0 first: W(i - 1, f * T_i)
+                f = math.floor(b / taskset[i - 1].period)
+                frame[2] = 1
+                stack.append([i - 1, f * taskset[i - 1].period, 0, 0])
+        elif stage == 1:  # W(i - 1, f * T_i) is evaluated: calculate branch0
+            f = math.floor(b / taskset[i - 1].period)
+            frame[3] = b - f * (taskset[i - 1].period - taskset[i - 1].execution_time) + result
+            frame[2] = 2
+            stack.append([i - 1, b, 0, 0])  # evaluate W(i - 1, b)
+        else:  # W(i - 1, b) is evaluated: calculate branch1 and W(i, b)
+            c = math.ceil(b / taskset[i - 1].period)
+            branch1 = c * taskset[i - 1].execution_time + result
+
+            last_psi[i] = b
+            last_workload[i] = min(frame[3], branch1)
+            result = last_workload[i]
+            stack.pop()
+
+    return result